@@ -0,0 +1,36 @@
+# Configuración de la suite de benchmarks: la del proyecto con bases de datos
+# SQLite temporales, DEBUG desactivado (sin registro de consultas en memoria)
+# y sin servicios externos.
+import os
+import tempfile
+
+from config.settings import *  # noqa: F401,F403
+
+BENCHMARK_DB_DIR = os.getenv('BENCHMARK_DB_DIR') or tempfile.mkdtemp(prefix='benchmarks-')
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BENCHMARK_DB_DIR, 'employees.sqlite3'),
+    },
+    'microservicioB_db': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BENCHMARK_DB_DIR, 'attendance.sqlite3'),
+    },
+}
+
+DEBUG = False
+ALLOWED_HOSTS = ['testserver', 'localhost']
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_RESULT_BACKEND = 'cache+memory://'
+
+# Sin réplica de IDs: cada validación no cacheada viaja por el broker en memoria
+EMPLOYEE_ID_REPLICA = dict(EMPLOYEE_ID_REPLICA, ENABLED=False)  # noqa: F405
+CONSUMER_LOG_LEVEL = 'WARNING'
+LOGGING['loggers'] = {  # noqa: F405
+    name: dict(config, level='WARNING') for name, config in LOGGING['loggers'].items()  # noqa: F405
+}
+
+# Validación y eventos por el broker en memoria; un hilo atiende las peticiones
+# como lo haría el consumidor
+VALIDATION_TRANSPORT = dict(VALIDATION_TRANSPORT, BACKEND='inprocess', INPROCESS_WORKERS=1)  # noqa: F405
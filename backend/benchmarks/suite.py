@@ -0,0 +1,315 @@
+# Suite de benchmarks reproducible de los dos microservicios. Corre en local:
+# bases de datos SQLite temporales y el transporte de validación en memoria
+# (VALIDATION_TRANSPORT 'inprocess'), que ejecuta el validador real sin RabbitMQ.
+#
+#   python benchmarks/suite.py --output results.json
+#   python benchmarks/suite.py --quick                      # tamaños reducidos
+#   python benchmarks/suite.py --only list_latency --sizes 10000 100000 1000000
+#
+# El resultado es JSON (con el commit y el entorno) para comparar entre commits.
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+import django
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+from config.transport import InProcessBroker, get_inprocess_broker
+from employees.models import Employee
+from employees.rabbitmq_consumer import serve_in_process
+from employees.views import EmployeePagination
+from microservicioB.employee_cache import employee_cache
+from microservicioB.models import AttendanceRecord
+from microservicioB.rpc_client import InProcessValidationClient, get_validation_client
+from microservicioB.views import AttendancePagination
+
+SCENARIOS = ('employee_crud', 'validation_rtt', 'consumer_throughput', 'attendance_ingestion', 'list_latency')
+
+
+def summarize(samples):
+    """Percentiles en milisegundos de una lista de duraciones en segundos."""
+    ordered = sorted(samples)
+
+    def percentile(pct):
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        'count': len(ordered),
+        'p50_ms': round(percentile(50), 3),
+        'p95_ms': round(percentile(95), 3),
+        'p99_ms': round(percentile(99), 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def timed(samples, function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    samples.append(time.perf_counter() - start)
+    return result
+
+
+def expect(response, status_code):
+    if response.status_code != status_code:
+        raise RuntimeError(f"{response.request['PATH_INFO']}: {response.status_code} != {status_code}")
+    return response
+
+
+class BenchmarkSuite:
+
+    def __init__(self, client, operations):
+        self.client = client
+        self.operations = operations
+
+    def employee_payload(self, index, prefix='crud'):
+        return {
+            'first_name': 'Bench', 'last_name': f'Employee {index}',
+            'email': f'{prefix}{index}@bench.local', 'position': 'Developer',
+            'salary': '1000.00', 'hire_date': '2024-01-01',
+        }
+
+    def employee_crud(self):
+        phases = {'create': [], 'retrieve': [], 'update': [], 'delete': []}
+        ids = []
+        started = time.perf_counter()
+        for index in range(self.operations):
+            response = timed(phases['create'], self.client.post, reverse('employee-list'),
+                             self.employee_payload(index), content_type='application/json')
+            ids.append(expect(response, 201).json()['id'])
+        for pk in ids:
+            expect(timed(phases['retrieve'], self.client.get, reverse('employee-detail', args=[pk])), 200)
+        for index, pk in enumerate(ids):
+            payload = dict(self.employee_payload(index), position='Lead')
+            expect(timed(phases['update'], self.client.put, reverse('employee-detail', args=[pk]),
+                         payload, content_type='application/json'), 200)
+        for pk in ids:
+            expect(timed(phases['delete'], self.client.delete, reverse('employee-detail', args=[pk])), 204)
+        elapsed = time.perf_counter() - started
+
+        return {
+            'operations': 4 * self.operations,
+            'ops_per_sec': round(4 * self.operations / elapsed, 1),
+            'latency': {phase: summarize(samples) for phase, samples in phases.items()},
+        }
+
+    def validation_rtt(self):
+        employee = Employee.objects.create(**self.employee_payload(0, prefix='rtt'))
+        validation_client = get_validation_client()
+
+        rpc = []
+        for _ in range(self.operations):
+            timed(rpc, validation_client.validate, employee.id)
+
+        # Petición completa sin caché: vista + validación por el broker + INSERT
+        end_to_end = []
+        punch = {'employee_id': employee.id, 'type': 'entry', 'date': '2024-01-15', 'time': '08:00:00'}
+        for _ in range(self.operations):
+            employee_cache.clear()
+            expect(timed(end_to_end, self.client.post, reverse('attendance-create'), punch,
+                         content_type='application/json'), 201)
+
+        return {'rpc': summarize(rpc), 'attendance_uncached': summarize(end_to_end)}
+
+    def consumer_throughput(self, worker_threads=(1, 2, 4), concurrency=32):
+        """
+        Validaciones por segundo del validador real con 1, 2 y 4 hilos
+        consumidores en el broker en memoria (los hilos de un worker de
+        ConsumerRunner) y `concurrency` peticiones en vuelo.
+        """
+        employee_ids = [
+            Employee.objects.create(**self.employee_payload(index, prefix='throughput')).id
+            for index in range(50)
+        ]
+        requests = [employee_ids[index % len(employee_ids)] for index in range(self.operations * 10)]
+
+        results = {}
+        for threads in worker_threads:
+            broker = InProcessBroker(workers=threads)
+            serve_in_process(broker)
+            client = InProcessValidationClient(broker)
+            latencies = []
+            try:
+                started = time.perf_counter()
+                with ThreadPoolExecutor(concurrency) as pool:
+                    valid = list(pool.map(lambda pk: timed(latencies, client.validate, pk), requests))
+                elapsed = time.perf_counter() - started
+            finally:
+                broker.close()
+            if not all(valid):
+                raise RuntimeError("El validador rechazó empleados existentes")
+            results[str(threads)] = {
+                'validations_per_sec': round(len(requests) / elapsed, 1),
+                'latency': summarize(latencies),
+            }
+
+        return {'concurrency': concurrency, 'requests': len(requests), 'threads': results}
+
+    def attendance_ingestion(self, bulk_batch=500):
+        employee_ids = [
+            Employee.objects.create(**self.employee_payload(index, prefix='ingest')).id
+            for index in range(50)
+        ]
+        employee_cache.clear()
+
+        single = []
+        started = time.perf_counter()
+        for index in range(self.operations):
+            punch = {'employee_id': employee_ids[index % len(employee_ids)], 'type': 'entry',
+                     'date': '2024-02-01', 'time': '08:00:00'}
+            expect(timed(single, self.client.post, reverse('attendance-create'), punch,
+                         content_type='application/json'), 201)
+        single_rate = self.operations / (time.perf_counter() - started)
+
+        records = self.operations * 10
+        batches = []
+        started = time.perf_counter()
+        for offset in range(0, records, bulk_batch):
+            items = [
+                {'employee_id': employee_ids[i % len(employee_ids)], 'type': 'exit',
+                 'date': '2024-02-02', 'time': '17:00:00'}
+                for i in range(offset, min(offset + bulk_batch, records))
+            ]
+            expect(timed(batches, self.client.post, reverse('attendance-bulk'), items,
+                         content_type='application/json'), 201)
+        bulk_rate = records / (time.perf_counter() - started)
+
+        return {
+            'single': {'records_per_sec': round(single_rate, 1), 'latency': summarize(single)},
+            'bulk': {'records_per_sec': round(bulk_rate, 1), 'batch_size': bulk_batch,
+                     'latency': summarize(batches)},
+        }
+
+    def list_latency(self, sizes, samples=20, page_size=100):
+        results = {}
+        for size in sorted(sizes):
+            fill_employees(size)
+            fill_attendance(size)
+
+            endpoints = {
+                'employees_first_page': reverse('employee-list') + f'?page_size={page_size}',
+                'employees_deep_page': deep_page_url(reverse('employee-list'), EmployeePagination(),
+                                                     Employee.objects, size, page_size),
+                'attendance_first_page': reverse('attendance-list') + f'?page_size={page_size}',
+                'attendance_deep_page': deep_page_url(reverse('attendance-list'), AttendancePagination(),
+                                                      AttendanceRecord.objects, size, page_size),
+            }
+            results[str(size)] = {}
+            for name, url in endpoints.items():
+                expect(self.client.get(url), 200)  # calentamiento
+                latencies = []
+                for _ in range(samples):
+                    expect(timed(latencies, self.client.get, url), 200)
+                results[str(size)][name] = summarize(latencies)
+            print(f"  {size} filas: {json.dumps(results[str(size)])}", file=sys.stderr)
+        return results
+
+
+def fill_employees(size, batch=10000):
+    """Completa la tabla de empleados hasta `size` filas."""
+    existing = Employee.objects.count()
+    for offset in range(existing, size, batch):
+        Employee.objects.bulk_create([
+            Employee(first_name='Fill', last_name=str(i), email=f'fill{i}@bench.local', hire_date=date(2024, 1, 1))
+            for i in range(offset, min(offset + batch, size))
+        ], batch_size=batch)
+
+
+def fill_attendance(size, batch=10000):
+    existing = AttendanceRecord.objects.count()
+    start_day = date(2020, 1, 1)
+    for offset in range(existing, size, batch):
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(
+                employee_id=i % 1000 + 1,
+                type='entry' if i % 2 == 0 else 'exit',
+                date=start_day + timedelta(days=i // 1000),
+                time=(datetime(2000, 1, 1, 8) + timedelta(seconds=i % 1000 * 30)).time(),
+            )
+            for i in range(offset, min(offset + batch, size))
+        ], batch_size=batch)
+
+
+def deep_page_url(url, paginator, manager, size, page_size):
+    """URL de una de las últimas páginas, como la alcanzaría un cliente siguiendo "next"."""
+    position = max(0, min(size, manager.count()) - page_size - 1)
+    row = manager.order_by(*paginator.ordering)[position]
+    return f'{url}?page_size={page_size}&cursor={paginator.encode_cursor(row)}'
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de los microservicios A y B')
+    parser.add_argument('--output', help='Archivo JSON de resultados (por defecto, salida estándar)')
+    parser.add_argument('--only', nargs='+', choices=SCENARIOS, help='Escenarios a ejecutar')
+    parser.add_argument('--operations', type=int, default=500, help='Operaciones por escenario')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='Filas de las tablas para list_latency')
+    parser.add_argument('--quick', action='store_true', help='Tamaños reducidos para una prueba rápida')
+    args = parser.parse_args()
+    if args.quick:
+        args.operations, args.sizes = 50, [1000, 10000]
+
+    for database in settings.DATABASES:
+        call_command('migrate', database=database, verbosity=0)
+
+    suite = BenchmarkSuite(Client(), args.operations)
+    results = {}
+    try:
+        for scenario in args.only or SCENARIOS:
+            print(f"⏱️ {scenario}...", file=sys.stderr)
+            if scenario == 'list_latency':
+                results[scenario] = suite.list_latency(args.sizes)
+            else:
+                results[scenario] = getattr(suite, scenario)()
+    finally:
+        get_inprocess_broker().close()
+        if not os.getenv('BENCHMARK_DB_DIR'):
+            shutil.rmtree(settings.BENCHMARK_DB_DIR, ignore_errors=True)
+
+    report = {
+        'environment': environment(),
+        'parameters': {'operations': args.operations, 'sizes': args.sizes},
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"✅ Resultados guardados en {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
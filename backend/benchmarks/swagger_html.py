@@ -0,0 +1,72 @@
+# Benchmark de la generación del HTML de la documentación PDF con specs
+# sintéticos de tamaño creciente (no necesita base de datos ni RabbitMQ)
+#
+#   python benchmarks/swagger_html.py --endpoints 250 500 1000 2000
+#
+# Con la construcción por fragmentos el tiempo por endpoint se mantiene
+# constante al crecer el spec (escalado lineal).
+import argparse
+import io
+import os
+import sys
+import time
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from employees.swagger_to_pdf import SwaggerToPDFConverter
+
+
+def synthetic_spec(endpoints):
+    """Spec con `endpoints` operaciones (GET/POST por ruta) y un esquema por ruta."""
+    paths, schemas = {}, {}
+    for index in range(endpoints // 2):
+        responses = {
+            '200': {'description': f'Recurso {index}'},
+            '400': {'description': 'Datos inválidos'},
+            '404': {'description': 'No encontrado'},
+        }
+        paths[f'/api/resources{index}/'] = {
+            'get': {'description': f'Lista de recursos {index}', 'responses': responses},
+            'post': {'description': f'Crea un recurso {index}', 'responses': responses},
+        }
+        schemas[f'Resource{index}'] = {'description': f'Recurso sintético {index}'}
+    return {
+        'info': {'title': 'Benchmark API', 'version': '1.0.0'},
+        'paths': paths,
+        'components': {'schemas': schemas},
+    }
+
+
+def measure(spec, repeat):
+    converter = SwaggerToPDFConverter(spec=spec)
+    best_join = best_write = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        html = converter.generate_html_content()
+        best_join = min(best_join, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        converter.write_html(io.StringIO())
+        best_write = min(best_write, time.perf_counter() - start)
+    return best_join, best_write, len(html)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de generación del HTML de la documentación PDF')
+    parser.add_argument('--endpoints', type=int, nargs='+', default=[250, 500, 1000, 2000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'endpoints':>10} {'join ms':>10} {'write ms':>10} {'µs/endpoint':>12} {'html KB':>10}")
+    for endpoints in args.endpoints:
+        join_time, write_time, size = measure(synthetic_spec(endpoints), args.repeat)
+        print(f"{endpoints:>10} {join_time * 1000:>10.2f} {write_time * 1000:>10.2f} "
+              f"{join_time / endpoints * 1e6:>12.2f} {size / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
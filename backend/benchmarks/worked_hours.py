@@ -0,0 +1,118 @@
+# Benchmark del cálculo de horas trabajadas (microservicioB/worked_hours.py).
+#
+#   python benchmarks/worked_hours.py --punches 1000000 10000000 20000000
+#   python benchmarks/worked_hours.py --punches 20000000 --load-rows 500000
+#
+# Mide por separado el emparejamiento en NumPy con marcaciones sintéticas
+# (jornadas de 4 marcaciones: entrada, salida, entrada, salida y alguna salida
+# olvidada) y, con --load-rows, la lectura por values_list desde una base
+# SQLite temporal, que es la parte que crece con el coste por fila del ORM.
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import date, timedelta
+
+import django
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+
+from microservicioB.models import AttendanceRecord
+from microservicioB.worked_hours import load_punches, pair_punches, totals_by_employee
+
+EMPLOYEES = 5000
+
+
+def synthetic_punches(count, seed=1):
+    """`count` marcaciones de EMPLOYEES empleados, en orden aleatorio."""
+    rng = np.random.default_rng(seed)
+    days = count // 4 // EMPLOYEES + 1
+    slot = np.arange(count)
+    employee_id = (slot // 4 % EMPLOYEES + 1).astype(np.int64)
+    day = (slot // 4 // EMPLOYEES % days).astype(np.int32)
+    base = np.array([8 * 3600, 12 * 3600, 13 * 3600, 17 * 3600], dtype=np.int32)
+    seconds = base[slot % 4] + rng.integers(0, 1800, count, dtype=np.int32)
+    is_entry = slot % 4 % 2 == 0
+    # ~1% de jornadas sin la última salida: se convierte en una entrada tardía
+    forgotten = (slot % 4 == 3) & (rng.random(count) < 0.01)
+    is_entry[forgotten] = True
+    order = rng.permutation(count)
+    return employee_id[order], day[order], seconds[order], is_entry[order]
+
+
+def bench_pairing(count):
+    employee_id, day, seconds, is_entry = synthetic_punches(count)
+    start = time.perf_counter()
+    days = pair_punches(employee_id, day, seconds, is_entry)
+    paired = time.perf_counter() - start
+    totals = totals_by_employee(days)
+    total = time.perf_counter() - start
+    return {
+        'punches': count,
+        'employee_days': len(days['employee_id']),
+        'pair_seconds': round(paired, 3),
+        'total_seconds': round(total, 3),
+        'punches_per_sec': round(count / total),
+        'missing_exit_days': sum(row['missing_exit_days'] for row in totals),
+    }
+
+
+def bench_load(rows):
+    for database in settings.DATABASES:
+        call_command('migrate', database=database, verbosity=0)
+    first_day = date(2024, 1, 1)
+    batch = []
+    for index in range(rows):
+        batch.append(AttendanceRecord(
+            employee_id=index // 4 % EMPLOYEES + 1,
+            date=first_day + timedelta(days=index // 4 // EMPLOYEES),
+            time=f'{8 + index % 4 * 3:02d}:00:00',
+            type='entry' if index % 2 == 0 else 'exit',
+        ))
+        if len(batch) == 5000:
+            AttendanceRecord.objects.bulk_create(batch)
+            batch = []
+    AttendanceRecord.objects.bulk_create(batch)
+
+    start = time.perf_counter()
+    punches = load_punches(first_day, first_day + timedelta(days=rows))
+    loaded = time.perf_counter() - start
+    return {
+        'rows': len(punches['employee_id']),
+        'load_seconds': round(loaded, 3),
+        'rows_per_sec': round(rows / loaded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del cálculo de horas trabajadas')
+    parser.add_argument('--punches', type=int, nargs='+', default=[1000000, 10000000, 20000000],
+                        help='Marcaciones sintéticas a emparejar')
+    parser.add_argument('--load-rows', type=int, default=0,
+                        help='Filas a leer desde SQLite con values_list (0 lo omite)')
+    args = parser.parse_args()
+
+    results = {'pairing': []}
+    for count in args.punches:
+        print(f"⏱️ emparejando {count} marcaciones...", file=sys.stderr)
+        results['pairing'].append(bench_pairing(count))
+    try:
+        if args.load_rows:
+            print(f"⏱️ leyendo {args.load_rows} filas...", file=sys.stderr)
+            results['load'] = bench_load(args.load_rows)
+    finally:
+        if not os.getenv('BENCHMARK_DB_DIR'):
+            shutil.rmtree(settings.BENCHMARK_DB_DIR, ignore_errors=True)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+from django.conf import settings
+from django.db import models, router
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, inline_serializer
+from rest_framework import serializers
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+
+
+class AbstractChangeLogEntry(models.Model):
+    """
+    Registro de cambios de una tabla: cada alta, modificación o baja añade una
+    fila en la misma transacción que los datos (quien escribe abre la
+    transacción; post_save se envía después del INSERT/UPDATE). La PK autoincremental es el
+    token de secuencia que usan los clientes en `?since=`; el log no se poda,
+    así que la PK nunca se reutiliza y el token solo crece. Con SQLite las
+    escrituras se serializan y las PK se confirman en orden; con una base con
+    escrituras concurrentes una transacción lenta podría confirmar una PK menor
+    que la de un token ya entregado. Cada app define su modelo concreto en su
+    propia base de datos.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    table = models.CharField(max_length=100)
+    row_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['table', 'id'], name='%(app_label)s_changelog_tid'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {DELETE if self.deleted else UPSERT} {self.table}:{self.row_id}"
+
+
+def record_changes(log_model, table, row_ids, deleted=False):
+    """Añade al log un cambio por fila; debe llamarse en la transacción de la escritura."""
+    entries = [log_model(table=table, row_id=row_id, deleted=deleted) for row_id in row_ids]
+    if entries:
+        log_model.objects.db_manager(router.db_for_write(log_model)).bulk_create(entries, batch_size=500)
+
+
+def current_seq(log_model, table):
+    """Último token del log de `table` (0 si está vacío): punto de partida de una copia parcial."""
+    return log_model.objects.filter(table=table).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def read_changes(log_model, queryset, serializer_class, since=0, page_size=None):
+    """
+    Cambios de la tabla de `queryset` posteriores al token `since`, en orden de
+    secuencia: una consulta al log por el índice (table, id) y otra por PK para
+    las filas vigentes, así que el coste crece con los cambios y no con la tabla.
+
+    Si una fila cambia varias veces en la página se devuelve solo su último
+    cambio. Las bajas llegan como tombstones (`op: delete`, sin datos); un alta
+    cuya fila ya no existe se omite porque su baja viene más adelante en el log.
+    """
+    config = get_config()
+    page_size = min(page_size or config['PAGE_SIZE'], config['MAX_PAGE_SIZE'])
+    table = queryset.model._meta.db_table
+    entries = list(
+        log_model.objects.filter(table=table, id__gt=since)
+        .order_by('id')
+        .values_list('id', 'row_id', 'deleted')[:page_size + 1]
+    )
+    has_more = len(entries) > page_size
+    entries = entries[:page_size]
+
+    latest = {}
+    for seq, row_id, deleted in entries:
+        latest.pop(row_id, None)
+        latest[row_id] = (seq, deleted)
+
+    upserts = [row_id for row_id, (_, deleted) in latest.items() if not deleted]
+    rows = {row.pk: row for row in queryset.filter(pk__in=upserts)} if upserts else {}
+    data = {row_id: item for row_id, item in zip(rows, serializer_class(list(rows.values()), many=True).data)}
+
+    results = []
+    for row_id, (seq, deleted) in latest.items():
+        if deleted:
+            results.append({'seq': seq, 'op': DELETE, 'id': row_id, 'data': None})
+        elif row_id in data:
+            results.append({'seq': seq, 'op': UPSERT, 'id': row_id, 'data': data[row_id]})
+
+    return {
+        'next_since': entries[-1][0] if entries else since,
+        'has_more': has_more,
+        'results': results,
+    }
+
+
+def get_config():
+    config = getattr(settings, 'CHANGE_FEED', {})
+    return {
+        'PAGE_SIZE': config.get('PAGE_SIZE', 500),
+        'MAX_PAGE_SIZE': config.get('MAX_PAGE_SIZE', 5000),
+    }
+
+
+class ChangeFeedFilterSerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, required=False, default=0)
+    page_size = serializers.IntegerField(min_value=1, required=False)
+
+
+CHANGE_FEED_PARAMETERS = [
+    OpenApiParameter(
+        name='since',
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY,
+        description='Token "next_since" de la sincronización anterior (0 o vacío para empezar desde el principio)'
+    ),
+    OpenApiParameter(
+        name='page_size',
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY,
+        description='Número máximo de cambios por respuesta'
+    ),
+]
+
+
+def change_feed_response(serializer_class, name):
+    """Esquema OpenAPI de una respuesta {next_since, has_more, results} del registro de cambios."""
+    return inline_serializer(
+        name=name,
+        fields={
+            'next_since': serializers.IntegerField(),
+            'has_more': serializers.BooleanField(),
+            'results': inline_serializer(
+                name=f'{name}Entry',
+                many=True,
+                fields={
+                    'seq': serializers.IntegerField(),
+                    'op': serializers.ChoiceField(choices=[UPSERT, DELETE]),
+                    'id': serializers.IntegerField(),
+                    'data': serializer_class(allow_null=True),
+                }
+            ),
+        }
+    )
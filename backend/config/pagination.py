@@ -0,0 +1,141 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from drf_spectacular.utils import OpenApiParameter, inline_serializer
+from drf_spectacular.types import OpenApiTypes
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre un orden total de la tabla.
+
+    El cursor codifica los valores de `ordering` de la última fila entregada y la
+    página siguiente se obtiene con un WHERE sobre esos valores en lugar de un
+    OFFSET, así el coste por página no crece con el tamaño de la tabla y las
+    páginas no se desplazan cuando se insertan filas nuevas. El último campo de
+    `ordering` debe ser único (normalmente la PK) para que el orden sea total.
+    """
+
+    ordering = ('id',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def __init__(self):
+        config = getattr(settings, 'KEYSET_PAGINATION', {})
+        self.page_size = config.get('PAGE_SIZE', 100)
+        self.max_page_size = config.get('MAX_PAGE_SIZE', 1000)
+        self.next_cursor = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, page_size = self.page_queryset(queryset, request)
+        return self.build_page(list(queryset), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Igual que `paginate_queryset` pero leyendo con el ORM asíncrono."""
+        queryset, page_size = self.page_queryset(queryset, request)
+        return self.build_page([row async for row in queryset], page_size)
+
+    def page_queryset(self, queryset, request):
+        """Consulta de la página pedida, con una fila extra para saber si hay otra."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+        return queryset[:page_size + 1], page_size
+
+    def build_page(self, rows, page_size):
+        has_next = len(rows) > page_size
+        page = rows[:page_size]
+        self.next_cursor = self.encode_cursor(page[-1]) if has_next else None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def position_filter(self, position):
+        """(a, b, c) > (x, y, z) respetando la dirección de cada campo del orden."""
+        condition = Q()
+        equal_prefix = Q()
+        for ordering_field, value in zip(self.ordering, position):
+            field = ordering_field.lstrip('-')
+            lookup = 'lt' if ordering_field.startswith('-') else 'gt'
+            condition |= equal_prefix & Q(**{f'{field}__{lookup}': value})
+            equal_prefix &= Q(**{field: value})
+        return condition
+
+    def encode_cursor(self, instance):
+        values = []
+        for ordering_field in self.ordering:
+            value = getattr(instance, ordering_field.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(ordering_field.lstrip('-')).to_python(value)
+                for ordering_field, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+
+KEYSET_PAGINATION_PARAMETERS = [
+    OpenApiParameter(
+        name='cursor',
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description='Cursor opaco devuelto en el campo "next" de la página anterior'
+    ),
+    OpenApiParameter(
+        name='page_size',
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY,
+        description='Número de registros por página'
+    ),
+]
+
+
+def paginated_response(serializer_class, name, extra_fields=None):
+    """Esquema OpenAPI de una página {next, results} para vistas APIView."""
+    return inline_serializer(
+        name=name,
+        fields={
+            'next': serializers.URLField(allow_null=True),
+            **(extra_fields or {}),
+            'results': serializer_class(many=True),
+        }
+    )
@@ -49,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero para medir la petición completa (Server-Timing y /api/metrics/)
+    'config.timing.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -59,6 +61,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Redes (CIDR) que pueden leer /api/metrics/; por defecto solo la propia máquina
+METRICS_ALLOWED_NETWORKS = [
+    network.strip()
+    for network in os.getenv('METRICS_ALLOWED_NETWORKS', '127.0.0.1/32,::1/128').split(',')
+    if network.strip()
+]
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -142,6 +151,96 @@ RABBITMQ = {
     'PORT': os.getenv('RABBITMQ_PORT', 5672),
     'USER': os.getenv('RABBITMQ_USER', 'guest'),
     'PASSWORD': os.getenv('RABBITMQ_PASSWORD', 'guest'),
+    # Tiempo máximo de espera de una validación RPC (segundos)
+    'RPC_TIMEOUT': float(os.getenv('RABBITMQ_RPC_TIMEOUT', 5)),
+    # Responder en la cola compartida validate_employee_response (protocolo antiguo)
+    'LEGACY_RESPONSE_QUEUE': os.getenv('RABBITMQ_LEGACY_RESPONSE_QUEUE', 'False') == 'True',
+    # Validación por lotes en el consumidor (BATCH_SIZE=1 procesa mensaje a mensaje)
+    'BATCH_SIZE': int(os.getenv('RABBITMQ_BATCH_SIZE', 1)),
+    'BATCH_WINDOW_MS': float(os.getenv('RABBITMQ_BATCH_WINDOW_MS', 20)),
+    # Procesos consumidores y consumidores concurrentes por proceso (start_rabbitmq_consumer)
+    'CONSUMER_WORKERS': int(os.getenv('RABBITMQ_CONSUMER_WORKERS', 1)),
+    'CONSUMER_THREADS': int(os.getenv('RABBITMQ_CONSUMER_THREADS', 1)),
+    # Puerto local de las métricas Prometheus del consumidor (worker N usa puerto + N; 0 desactiva)
+    'CONSUMER_METRICS_PORT': int(os.getenv('RABBITMQ_CONSUMER_METRICS_PORT', 9101)),
+}
+
+# Transporte de la validación RPC y de los eventos de empleados: 'amqp' (RabbitMQ)
+# o 'inprocess' (broker en memoria en el propio proceso web, sin consumidor aparte;
+# para desarrollo, tests y benchmarks)
+VALIDATION_TRANSPORT = {
+    'BACKEND': os.getenv('VALIDATION_TRANSPORT', 'amqp'),
+    # Hilos que atienden las validaciones en memoria (0: en el hilo que valida)
+    'INPROCESS_WORKERS': int(os.getenv('VALIDATION_TRANSPORT_WORKERS', 0)),
+    'INPROCESS_SERVER': 'employees.rabbitmq_consumer.serve_in_process',
+}
+
+# Logs del consumidor RabbitMQ: el detalle por mensaje es DEBUG; con WARNING
+# solo se registran errores
+CONSUMER_LOG_LEVEL = os.getenv('CONSUMER_LOG_LEVEL', 'INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'consumer': {
+            'format': '%(asctime)s %(levelname)s [%(processName)s/%(threadName)s] %(message)s',
+        },
+    },
+    'handlers': {
+        'consumer_console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'consumer',
+        },
+    },
+    'loggers': {
+        'employees.rabbitmq_consumer': {
+            'handlers': ['consumer_console'],
+            'level': CONSUMER_LOG_LEVEL,
+            'propagate': False,
+        },
+        'employees.consumer_runner': {
+            'handlers': ['consumer_console'],
+            'level': CONSUMER_LOG_LEVEL,
+            'propagate': False,
+        },
+        'employees.consumer_metrics': {
+            'handlers': ['consumer_console'],
+            'level': CONSUMER_LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
+
+# Caché local de validación de empleados en el microservicio B (segundos)
+EMPLOYEE_ID_CACHE = {
+    'MAX_SIZE': int(os.getenv('EMPLOYEE_ID_CACHE_MAX_SIZE', 10000)),
+    'TTL': float(os.getenv('EMPLOYEE_ID_CACHE_TTL', 300)),
+    'NEGATIVE_TTL': float(os.getenv('EMPLOYEE_ID_CACHE_NEGATIVE_TTL', 30)),
+}
+
+# Máximo de filas por importación en employees/bulk/
+BULK_EMPLOYEE_MAX_ROWS = int(os.getenv('BULK_EMPLOYEE_MAX_ROWS', 10000))
+
+# Máximo de registros por petición a attendance/bulk/
+BULK_ATTENDANCE_MAX_ITEMS = int(os.getenv('BULK_ATTENDANCE_MAX_ITEMS', 5000))
+
+# Cálculo de horas trabajadas (attendance/worked-hours/)
+WORKED_HOURS = {
+    # Jornada diaria; los minutos por encima cuentan como horas extra
+    'DAILY_MINUTES': int(os.getenv('WORKED_HOURS_DAILY_MINUTES', 480)),
+    # Rango máximo de fechas por petición a la API (el comando no tiene límite)
+    'MAX_RANGE_DAYS': int(os.getenv('WORKED_HOURS_MAX_RANGE_DAYS', 366)),
+    # Filas leídas por viaje a la base de datos
+    'CHUNK_SIZE': 100000,
+}
+
+# Réplica en memoria de IDs de empleados (snapshots + deltas por RabbitMQ)
+EMPLOYEE_ID_REPLICA = {
+    'ENABLED': os.getenv('EMPLOYEE_ID_REPLICA_ENABLED', 'True') == 'True',
+    # Segundos entre snapshots periódicos publicados por el consumidor
+    'SNAPSHOT_INTERVAL': float(os.getenv('EMPLOYEE_SNAPSHOT_INTERVAL', 300)),
+    'SNAPSHOT_MIN_INTERVAL': 1,
 }
 
 # Configuración de Celery para RabbitMQ
@@ -151,6 +250,11 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+# Sin broker (desarrollo/tests) las tareas se ejecutan en el proceso y su resultado
+# se guarda igualmente en django-db para que los endpoints de estado funcionen
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TASK_STORE_EAGER_RESULT = True
+CELERY_TASK_TRACK_STARTED = True
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:8001",
@@ -161,6 +265,45 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Paginación por cursor de los listados de empleados y asistencias
+KEYSET_PAGINATION = {
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', 100)),
+    'MAX_PAGE_SIZE': 1000,
+}
+
+# Sincronización incremental (employees/changes/ y attendance/changes/)
+CHANGE_FEED = {
+    # Cambios por respuesta si el cliente no indica page_size
+    'PAGE_SIZE': int(os.getenv('CHANGE_FEED_PAGE_SIZE', 500)),
+    'MAX_PAGE_SIZE': 5000,
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Respuestas del listado y detalle de empleados; en local cada proceso tiene
+    # su copia y con un backend compartido (p. ej. Redis) los workers comparten entradas
+    'employees': {
+        'BACKEND': os.getenv('EMPLOYEE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('EMPLOYEE_CACHE_LOCATION', 'employee-responses'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+EMPLOYEE_RESPONSE_CACHE = {
+    'ENABLED': os.getenv('EMPLOYEE_RESPONSE_CACHE_ENABLED', 'True') == 'True',
+    'ALIAS': 'employees',
+    # Segundos que vive una entrada aunque no haya escrituras
+    'TIMEOUT': int(os.getenv('EMPLOYEE_RESPONSE_CACHE_TIMEOUT', 300)),
+}
+
+# Documentación PDF: schema de origen y caché en disco (un PDF por versión del schema)
+# Por defecto el PDF se genera con el schema de drf-spectacular construido en el
+# proceso; API_DOCS_SCHEMA_FILE permite usar en su lugar un schema.yml/.json exportado
+API_DOCS_SCHEMA_FILE = os.getenv('API_DOCS_SCHEMA_FILE') or None
+API_DOCS_PDF_CACHE_DIR = BASE_DIR / 'cache' / 'api_docs'
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Employee & Attendance Management API',
     'DESCRIPTION': 'API completa para gestión de empleados y asistencias - Sistema de Microservicios',
@@ -0,0 +1,176 @@
+import contextvars
+import ipaddress
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+from config.metrics import CONTENT_TYPE, MetricsRegistry
+
+# Métricas por petición HTTP del proceso web (cada proceso de gunicorn/uvicorn tiene las suyas)
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds',
+    'Duración de la petición hasta devolver la respuesta (sin el envío del streaming)',
+    labelnames=('route', 'method', 'status'),
+)
+DB_QUERIES = registry.counter(
+    'http_db_queries_total',
+    'Consultas SQL ejecutadas por las peticiones',
+    labelnames=('route', 'alias'),
+)
+DB_SECONDS = registry.histogram(
+    'http_db_duration_seconds',
+    'Tiempo total en la base de datos por petición',
+    labelnames=('route', 'alias'),
+)
+VALIDATION_SECONDS = registry.histogram(
+    'http_employee_validation_duration_seconds',
+    'Tiempo por petición esperando la validación RPC de empleados en RabbitMQ',
+    labelnames=('route',),
+)
+
+_current = contextvars.ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Tiempos acumulados de una petición (base de datos por alias y validación RPC)."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db = {}
+        self.validation_seconds = 0.0
+        self.validation_calls = 0
+
+    def add_query(self, alias, seconds):
+        count, total = self.db.get(alias, (0, 0.0))
+        self.db[alias] = (count + 1, total + seconds)
+
+    def server_timing(self, total):
+        entries = [f'app;dur={total * 1000:.1f}']
+        for alias, (count, seconds) in sorted(self.db.items()):
+            entries.append(f'db-{alias};dur={seconds * 1000:.1f};desc="{count} queries"')
+        if self.validation_calls:
+            entries.append(f'rabbitmq;dur={self.validation_seconds * 1000:.1f};'
+                           f'desc="{self.validation_calls} validations"')
+        return ', '.join(entries)
+
+
+@contextmanager
+def track_validation():
+    """Suma al tiempo de la petición en curso la espera de una validación RPC."""
+    timing = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timing is not None:
+            timing.validation_seconds += time.perf_counter() - start
+            timing.validation_calls += 1
+
+
+def _time_query(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(context['connection'].alias, time.perf_counter() - start)
+
+
+def _install_query_timer(connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+# Las conexiones nuevas (en cualquier hilo) se instrumentan al abrirse; el
+# temporizador no hace nada fuera de una petición
+connection_created.connect(_install_query_timer)
+
+
+class RequestTimingMiddleware:
+    """
+    Mide cada petición: latencia por ruta, consultas y tiempo de base de datos
+    por alias (también microservicioB_db) y espera de la validación en RabbitMQ.
+
+    Los tiempos se devuelven en la cabecera Server-Timing y se acumulan en
+    histogramas que sirve metrics_view. El estado de la petición vive en un
+    contextvar, así que también se atribuyen las consultas que las vistas
+    asíncronas ejecutan en otros hilos con sync_to_async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = self._begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing = _current.get()
+            _current.reset(token)
+        return self._finish(request, response, timing)
+
+    async def __acall__(self, request):
+        token = self._begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing = _current.get()
+            _current.reset(token)
+        return self._finish(request, response, timing)
+
+    def _begin(self):
+        # Conexiones abiertas antes de cargar el middleware
+        for connection in connections.all(initialized_only=True):
+            _install_query_timer(connection)
+        return _current.set(RequestTiming())
+
+    def _finish(self, request, response, timing):
+        total = time.perf_counter() - timing.start
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match is not None else 'unmatched'
+
+        REQUEST_SECONDS.labels(route=route, method=request.method, status=response.status_code).observe(total)
+        for alias, (count, seconds) in timing.db.items():
+            DB_QUERIES.labels(route=route, alias=alias).inc(count)
+            DB_SECONDS.labels(route=route, alias=alias).observe(seconds)
+        if timing.validation_calls:
+            VALIDATION_SECONDS.labels(route=route).observe(timing.validation_seconds)
+
+        response['Server-Timing'] = timing.server_timing(total)
+        return response
+
+
+def metrics_view(request):
+    """
+    Métricas de las peticiones de este proceso en formato de texto de Prometheus.
+    Solo para las redes de METRICS_ALLOWED_NETWORKS (rutas y tiempos internos).
+    """
+    if not is_metrics_client(request.META.get('REMOTE_ADDR')):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
+
+
+def is_metrics_client(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False)
+               for network in getattr(settings, 'METRICS_ALLOWED_NETWORKS', ()))
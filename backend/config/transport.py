@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import queue
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+AMQP = 'amqp'
+INPROCESS = 'inprocess'
+
+# Exchange fanout donde el microservicio A publica altas y bajas de empleados
+EMPLOYEE_EVENTS_EXCHANGE = 'employee_events'
+# Exchange fanout por el que el microservicio A replica el conjunto de IDs de empleados
+EMPLOYEE_SNAPSHOTS_EXCHANGE = 'employee_snapshots'
+# Cola donde las réplicas piden un snapshot completo al detectar deltas perdidos
+SNAPSHOT_REQUEST_QUEUE = 'employee_snapshot_request'
+SNAPSHOT_ENCODING = 'bitmap+zlib+base64'
+
+
+def as_employee_id(value):
+    """ID de empleado de un mensaje como entero positivo, o None si no es válido."""
+    try:
+        employee_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return employee_id if employee_id > 0 else None
+
+
+def get_transport_backend():
+    """Transporte configurado para el RPC de validación y los eventos de empleados."""
+    return getattr(settings, 'VALIDATION_TRANSPORT', {}).get('BACKEND', AMQP)
+
+
+class PendingReply:
+    """Respuesta RPC esperada por un hilo (event) o por una corrutina (future)."""
+
+    __slots__ = ('event', 'response', 'error', 'future')
+
+    def __init__(self, future=None):
+        self.event = threading.Event()
+        self.response = None
+        self.error = None
+        # Petición asyncio: quien responde resuelve el future en el loop del llamador
+        self.future = future
+
+    def resolve(self, response=None, error=None):
+        self.response = response
+        self.error = error
+        self.event.set()
+        if self.future is not None:
+            try:
+                self.future.get_loop().call_soon_threadsafe(self._set_future)
+            except RuntimeError:
+                # El loop del llamador ya se cerró
+                pass
+
+    def _set_future(self):
+        if self.future.done():
+            return
+        if self.error is not None:
+            self.future.set_exception(self.error)
+        else:
+            self.future.set_result(self.response)
+
+
+class InProcessBroker:
+    """
+    Sustituto en memoria de RabbitMQ con la semántica que usan los microservicios:
+    colas RPC con respuesta por petición, colas sin respuesta y exchanges fanout.
+
+    Los mensajes se serializan a JSON como en el broker real. Con `workers=0`
+    cada petición se atiende en el hilo que la hace, de forma determinista (tests);
+    con `workers=N` la atienden N hilos consumidores, como procesos que compiten
+    por una cola.
+    """
+
+    def __init__(self, workers=0):
+        self.workers = workers
+        self.pid = os.getpid()
+        self._handlers = {}
+        self._consumers = defaultdict(list)
+        self._subscribers = defaultdict(list)
+        self._requests = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lado servidor
+    # ------------------------------------------------------------------
+    def serve(self, queue_name, handler):
+        """Atiende las peticiones RPC de `queue_name` con `handler(message) -> response`."""
+        self._handlers[queue_name] = handler
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._consume, name=f'inprocess-broker-{len(self._threads)}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def consume(self, queue_name, callback):
+        """Recibe los mensajes sin respuesta enviados a `queue_name`."""
+        self._consumers[queue_name].append(callback)
+
+    # ------------------------------------------------------------------
+    # Lado cliente
+    # ------------------------------------------------------------------
+    def request(self, queue_name, message, timeout):
+        body = json.dumps(message)
+        if not self.workers:
+            return self._handle(queue_name, body)
+
+        pending = PendingReply()
+        self._requests.put((queue_name, body, pending))
+        if not pending.event.wait(timeout):
+            raise TimeoutError(f"Sin respuesta de validación en {timeout}s")
+        if pending.error is not None:
+            raise pending.error
+        return pending.response
+
+    async def arequest(self, queue_name, message, timeout):
+        body = json.dumps(message)
+        if not self.workers:
+            # El manejador usa el ORM síncrono
+            return await sync_to_async(self._handle)(queue_name, body)
+
+        pending = PendingReply(asyncio.get_running_loop().create_future())
+        self._requests.put((queue_name, body, pending))
+        try:
+            return await asyncio.wait_for(pending.future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Sin respuesta de validación en {timeout}s")
+
+    def send(self, queue_name, message):
+        body = json.dumps(message)
+        for callback in self._consumers.get(queue_name, []):
+            callback(json.loads(body))
+        return True
+
+    def subscribe(self, exchange, callback):
+        self._subscribers[exchange].append(callback)
+
+    def publish(self, exchange, message):
+        body = json.dumps(message)
+        for callback in self._subscribers.get(exchange, []):
+            callback(json.loads(body))
+
+    def close(self):
+        for _ in self._threads:
+            self._requests.put(None)
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def _handle(self, queue_name, body):
+        handler = self._handlers.get(queue_name)
+        if handler is None:
+            raise ConnectionError(f"Nadie atiende la cola {queue_name}")
+        # Ida y vuelta por JSON, como en el broker
+        return json.loads(json.dumps(handler(json.loads(body))))
+
+    def _consume(self):
+        while (request := self._requests.get()) is not None:
+            queue_name, body, pending = request
+            try:
+                pending.resolve(response=self._handle(queue_name, body))
+            except Exception as e:
+                pending.resolve(error=e)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_inprocess_broker():
+    """Broker en memoria del proceso, con el servidor de validación ya registrado."""
+    global _broker
+    with _broker_lock:
+        if _broker is None or _broker.pid != os.getpid():
+            config = getattr(settings, 'VALIDATION_TRANSPORT', {})
+            _broker = InProcessBroker(workers=config.get('INPROCESS_WORKERS', 0))
+            server = config.get('INPROCESS_SERVER')
+            if server:
+                import_string(server)(_broker)
+        return _broker
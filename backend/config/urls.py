@@ -4,8 +4,30 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
-from employees.views import EmployeeListView, EmployeeDetailView, SwaggerPDFView
-from microservicioB.views import AttendanceView, AttendanceListView
+from employees.views import (
+    EmployeeListView,
+    EmployeeBulkView,
+    EmployeeDetailView,
+    EmployeeChangesView,
+    EmployeeResponseCacheStatsView,
+    SwaggerPDFView,
+    SwaggerPDFJobView,
+    SwaggerPDFJobStatusView,
+    SwaggerPDFJobDownloadView,
+)
+from microservicioB.views import (
+    AttendanceView,
+    AttendanceBulkView,
+    AttendanceListView,
+    AttendanceChangesView,
+    AttendanceExportView,
+    DailyAttendanceSummaryView,
+    MonthlyAttendanceSummaryView,
+    WorkedHoursView,
+    EmployeeCacheStatsView,
+)
+from config.timing import metrics_view
+from microservicioB.async_views import AsyncAttendanceView, AsyncAttendanceListView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -25,18 +47,40 @@ urlpatterns = [
 
     #URLS PARA MICROSERVICIO A
     path('employees/', EmployeeListView.as_view(), name='employee-list'),
+    path('employees/bulk/', EmployeeBulkView.as_view(), name='employee-bulk'),
     path('employees/<int:pk>/', EmployeeDetailView.as_view(), name='employee-detail'),
+    path('employees/changes/', EmployeeChangesView.as_view(), name='employee-changes'),
+    path('employees/cache/stats/', EmployeeResponseCacheStatsView.as_view(), name='employee-cache-stats'),
 
     #URLS PARA SWAGGER
+    path('api/metrics/', metrics_view, name='api-metrics'),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 
     #URLS MICROSERVICIO B
     path('attendance/', AttendanceView.as_view(), name='attendance-create'),
+    path('attendance/bulk/', AttendanceBulkView.as_view(), name='attendance-bulk'),
     path('attendance/list/', AttendanceListView.as_view(), name='attendance-list'),
+    path('attendance/changes/', AttendanceChangesView.as_view(), name='attendance-changes'),
+    path('attendance/export/ndjson/', AttendanceExportView.as_view(), {'export_format': 'ndjson'},
+         name='attendance-export-ndjson'),
+    path('attendance/export/csv/', AttendanceExportView.as_view(), {'export_format': 'csv'},
+         name='attendance-export-csv'),
+    path('attendance/summary/daily/', DailyAttendanceSummaryView.as_view(), name='attendance-summary-daily'),
+    path('attendance/summary/monthly/', MonthlyAttendanceSummaryView.as_view(), name='attendance-summary-monthly'),
+    path('attendance/worked-hours/', WorkedHoursView.as_view(), name='attendance-worked-hours'),
+    # Versiones asíncronas para despliegues ASGI
+    path('attendance/async/', AsyncAttendanceView.as_view(), name='attendance-async-create'),
+    path('attendance/async/list/', AsyncAttendanceListView.as_view(), name='attendance-async-list'),
+    path('attendance/cache/stats/', EmployeeCacheStatsView.as_view(), name='attendance-cache-stats'),
 
     #URLS PARA DESCARGAR SWAGGER EN PDF
     path('api/docs/pdf/', SwaggerPDFView.as_view(), name='api-docs-pdf'),
+    path('api/docs/pdf/jobs/', SwaggerPDFJobView.as_view(), name='api-docs-pdf-job'),
+    path('api/docs/pdf/jobs/<str:task_id>/', SwaggerPDFJobStatusView.as_view(),
+         name='api-docs-pdf-job-status'),
+    path('api/docs/pdf/jobs/<str:task_id>/download/', SwaggerPDFJobDownloadView.as_view(),
+         name='api-docs-pdf-job-download'),
 
 ]
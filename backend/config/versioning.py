@@ -0,0 +1,85 @@
+import hashlib
+
+from django.db import models, router
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class AbstractTableVersion(models.Model):
+    """
+    Contador de versión por tabla: cada escritura lo incrementa en la misma
+    transacción que los datos. Los listados derivan de él su ETag y su
+    Last-Modified con una lectura de una fila, sin consultar ni serializar
+    los datos. Cada app define su modelo concreto en su propia base de datos.
+    """
+
+    table = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
+
+
+def bump_version(version_model, table):
+    """
+    Incrementa la versión de `table`. Debe llamarse después de escribir los
+    datos (o en su misma transacción): así un lector nunca ve la versión nueva
+    con los datos viejos.
+    """
+    manager = version_model.objects.db_manager(router.db_for_write(version_model))
+    values = {'version': F('version') + 1, 'updated_at': timezone.now()}
+    if not manager.filter(table=table).update(**values):
+        _, created = manager.get_or_create(table=table, defaults={'version': 1})
+        if not created:
+            manager.filter(table=table).update(**values)
+
+
+def get_version(version_model, table):
+    """(versión, updated_at) de `table`; (0, None) si todavía no hubo escrituras."""
+    row = version_model.objects.filter(table=table).values_list('version', 'updated_at').first()
+    return row or (0, None)
+
+
+async def aget_version(version_model, table):
+    row = await version_model.objects.filter(table=table).values_list('version', 'updated_at').afirst()
+    return row or (0, None)
+
+
+def list_etag(table, version, request):
+    """ETag de una página de listado: versión de la tabla y URL (cursor, tamaño y host de los enlaces)."""
+    digest = hashlib.sha1(f'{table}:{version}:{request.build_absolute_uri()}'.encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+def row_etag(table, pk, updated_at):
+    return f'"{table}-{pk}-{int(updated_at.timestamp() * 1000000)}"'
+
+
+def is_conditional(request):
+    """La petición revalida una copia del cliente (If-None-Match / If-Modified-Since)."""
+    return 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META
+
+
+def not_modified(request, etag, last_modified=None):
+    """Respuesta 304 si el cliente ya tiene esta versión (If-None-Match / If-Modified-Since)."""
+    response = get_conditional_response(request, etag=etag, last_modified=_timestamp(last_modified))
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(_timestamp(last_modified))
+    return response
+
+
+def _timestamp(value):
+    return int(value.timestamp()) if value is not None else None
@@ -0,0 +1,24 @@
+import functools
+import hashlib
+import json
+
+from drf_spectacular.generators import SchemaGenerator
+
+
+@functools.lru_cache(maxsize=1)
+def get_api_spec():
+    """
+    Spec OpenAPI de la API generado en el propio proceso por drf-spectacular.
+
+    Las rutas y serializers no cambian mientras el proceso está vivo, así que se
+    genera una sola vez; evita depender de un schema.yml generado a mano que
+    puede estar desactualizado y el coste de parsear el YAML en cada petición.
+    """
+    return SchemaGenerator().get_schema(request=None, public=True)
+
+
+@functools.lru_cache(maxsize=1)
+def get_api_spec_digest():
+    """Hash del JSON canónico del spec (claves ordenadas), usado como versión del PDF."""
+    canonical = json.dumps(get_api_spec(), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
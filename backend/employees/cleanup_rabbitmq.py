@@ -1,12 +1,22 @@
 # cleanup_rabbitmq.py
+import os
+
 import pika
 
 
 def cleanup_queues():
     """Eliminar y recrear las colas con la configuración correcta"""
     try:
+        # Mismas variables de entorno que la configuración RABBITMQ de Django
         connection = pika.BlockingConnection(
-            pika.ConnectionParameters('localhost')
+            pika.ConnectionParameters(
+                host=os.getenv('RABBITMQ_HOST', 'localhost'),
+                port=int(os.getenv('RABBITMQ_PORT', 5672)),
+                credentials=pika.PlainCredentials(
+                    os.getenv('RABBITMQ_USER', 'guest'),
+                    os.getenv('RABBITMQ_PASSWORD', 'guest'),
+                ),
+            )
         )
         channel = connection.channel()
 
@@ -28,4 +38,4 @@ def cleanup_queues():
 
 
 if __name__ == '__main__':
-    cleanup_queues()
\ No newline at end of file
+    cleanup_queues()
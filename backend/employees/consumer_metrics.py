@@ -0,0 +1,61 @@
+import logging
+
+from config.metrics import MetricsRegistry, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+# Métricas del consumidor de validación de empleados (una instancia por proceso;
+# con varios workers cada uno las expone en su propio puerto)
+registry = MetricsRegistry()
+
+MESSAGES = registry.counter(
+    'employee_consumer_messages_total',
+    'Solicitudes de validación recibidas',
+    labelnames=('kind',),
+)
+ACKS = registry.counter(
+    'employee_consumer_acks_total',
+    'Mensajes confirmados (basic_ack); un ack múltiple cuenta todos sus mensajes',
+)
+NACKS = registry.counter(
+    'employee_consumer_nacks_total',
+    'Mensajes rechazados (basic_nack)',
+)
+DB_LOOKUP_SECONDS = registry.histogram(
+    'employee_consumer_db_lookup_seconds',
+    'Duración de la consulta de existencia de empleados',
+)
+BATCH_SIZE = registry.histogram(
+    'employee_consumer_batch_size',
+    'Mensajes resueltos por cada lote',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+QUEUE_LAG_SECONDS = registry.histogram(
+    'employee_consumer_queue_lag_seconds',
+    'Tiempo entre la publicación de la solicitud y su procesamiento',
+)
+QUEUE_DEPTH = registry.gauge(
+    'employee_consumer_queue_depth',
+    'Mensajes pendientes en validate_employee_request',
+)
+CONNECTS = registry.counter(
+    'employee_consumer_connects_total',
+    'Conexiones establecidas con RabbitMQ (más de una implica reconexiones)',
+)
+CONNECTION_ERRORS = registry.counter(
+    'employee_consumer_connection_errors_total',
+    'Intentos de conexión fallidos o conexiones perdidas',
+)
+
+
+def start_server(port, host='127.0.0.1'):
+    """Expone las métricas en http://host:port/metrics; un puerto vacío o 0 lo desactiva."""
+    if not port:
+        return None
+    try:
+        server = start_metrics_server(registry, int(port), host)
+    except OSError as e:
+        logger.error("❌ No se pudo abrir el puerto de métricas %s: %s", port, e)
+        return None
+    logger.info("📈 Métricas del consumidor en http://%s:%s/metrics", host, port)
+    return server
@@ -0,0 +1,178 @@
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+
+from django.db import connections
+
+from employees import consumer_metrics as metrics
+from employees.rabbitmq_consumer import SimpleEmployeeValidator
+
+logger = logging.getLogger(__name__)
+
+
+class ConsumerWorker:
+    """
+    Un proceso del consumidor con `threads` consumidores concurrentes.
+
+    pika no es thread-safe, así que cada hilo tiene su propia conexión y su propio
+    canal; Django abre una conexión a la base de datos por hilo y cada hilo cierra
+    la suya al terminar. Solo el consumidor principal publica los snapshots de IDs
+    para no multiplicar los envíos periódicos. Si un consumidor pierde la conexión
+    se vuelve a conectar tras `retry_interval` segundos.
+    """
+
+    def __init__(self, index=0, threads=1, batch_size=None, batch_window_ms=None,
+                 metrics_port=None, consumer_class=SimpleEmployeeValidator, retry_interval=5):
+        self.index = index
+        self.threads = max(1, int(threads))
+        self.batch_size = batch_size
+        self.batch_window_ms = batch_window_ms
+        self.metrics_port = metrics_port
+        self.consumer_class = consumer_class
+        self.retry_interval = retry_interval
+        self.consumers = []
+        self._stopped = threading.Event()
+
+    def run(self):
+        self._install_signal_handlers()
+        # Cada proceso expone sus métricas en su propio puerto (base + índice)
+        metrics.start_server(self.metrics_port and self.metrics_port + self.index)
+
+        threads = []
+        for thread_index in range(self.threads):
+            consumer = self.consumer_class(
+                batch_size=self.batch_size,
+                batch_window_ms=self.batch_window_ms,
+                # None: lo decide la configuración de la réplica
+                snapshots_enabled=None if self.index == 0 and thread_index == 0 else False,
+            )
+            self.consumers.append(consumer)
+            thread = threading.Thread(
+                target=self._consume, args=(consumer,),
+                name=f'employee-consumer-{self.index}-{thread_index}'
+            )
+            thread.start()
+            threads.append(thread)
+
+        # El hilo principal solo espera, con timeout para seguir atendiendo señales
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+
+        connections.close_all()
+        logger.info("🛑 Worker %s detenido", self.index)
+
+    def stop(self, *args):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        logger.info("🛑 Deteniendo worker %s...", self.index)
+        for consumer in self.consumers:
+            consumer.stop()
+
+    def _consume(self, consumer):
+        try:
+            while not self._stopped.is_set():
+                consumer.start_consuming()
+                if self._stopped.wait(self.retry_interval):
+                    break
+                logger.warning("🔁 Reconectando consumidor %s", threading.current_thread().name)
+        finally:
+            # Las conexiones de Django son por hilo: se cierran en el hilo que las abrió
+            connections.close_all()
+
+    def _install_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+
+def _run_worker(index, threads, batch_size, batch_window_ms, metrics_port):
+    ConsumerWorker(index, threads, batch_size, batch_window_ms, metrics_port).run()
+
+
+class ConsumerRunner:
+    """
+    Lanza `workers` procesos consumidores de validate_employee_request.
+
+    Los procesos compiten por la misma cola (RabbitMQ reparte los mensajes entre
+    consumidores), así que el rendimiento escala con el número de núcleos hasta
+    que el cuello de botella pasa a ser la base de datos o el broker. SIGTERM o
+    SIGINT en el proceso principal se reenvían a los workers, que terminan los
+    lotes en curso, cierran sus conexiones y salen.
+    """
+
+    def __init__(self, workers=1, threads=1, batch_size=None, batch_window_ms=None,
+                 metrics_port=None, shutdown_timeout=30):
+        self.workers = max(1, int(workers))
+        self.threads = max(1, int(threads))
+        self.batch_size = batch_size
+        self.batch_window_ms = batch_window_ms
+        self.metrics_port = metrics_port
+        self.shutdown_timeout = shutdown_timeout
+        self.processes = []
+        self._stopping = False
+        self._pid = os.getpid()
+
+    def run(self):
+        if self.workers == 1:
+            # Un solo worker: se ejecuta en este proceso
+            ConsumerWorker(0, self.threads, self.batch_size, self.batch_window_ms, self.metrics_port).run()
+            return
+
+        # Manejadores antes de arrancar: una señal durante el arranque no deja huérfanos
+        self._pid = os.getpid()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        # Los procesos hijos no deben heredar conexiones abiertas a la base de datos
+        connections.close_all()
+        for index in range(self.workers):
+            if self._stopping:
+                break
+            process = multiprocessing.Process(
+                target=_run_worker,
+                args=(index, self.threads, self.batch_size, self.batch_window_ms, self.metrics_port),
+                name=f'employee-consumer-{index}',
+            )
+            process.start()
+            self.processes.append(process)
+            if self._stopping:
+                # La señal llegó entre start() y append(): stop() no vio este proceso
+                process.terminate()
+                break
+        else:
+            logger.info("🚀 %s workers x %s hilos consumiendo", self.workers, self.threads)
+
+        for process in self.processes:
+            while process.is_alive():
+                process.join(timeout=0.5)
+
+    def stop(self, signum=None, frame=None):
+        if signum is not None and os.getpid() != self._pid:
+            # Hijo recién creado con fork que aún tiene el manejador del runner:
+            # la señal hace lo que haría por defecto
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+            return
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.info("🛑 Deteniendo workers...")
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+
+        # Si algún worker no termina a tiempo se fuerza su salida
+        timer = threading.Timer(self.shutdown_timeout, self._kill_remaining)
+        timer.daemon = True
+        timer.start()
+
+    def _kill_remaining(self):
+        for process in self.processes:
+            if process.is_alive():
+                logger.warning("⚠️ Worker %s no terminó a tiempo, forzando salida", process.name)
+                process.kill()
@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+import pika
+from django.conf import settings
+from django.db import transaction
+
+from config.transport import EMPLOYEE_EVENTS_EXCHANGE, INPROCESS, get_inprocess_broker, get_transport_backend
+
+EMPLOYEE_CREATED = 'created'
+EMPLOYEE_DELETED = 'deleted'
+
+
+class EmployeeEventPublisher:
+    """
+    Publicador persistente (por proceso) de eventos de empleados.
+
+    La publicación es best-effort: si RabbitMQ no está disponible se registra el
+    error y se espera `retry_interval` segundos antes de volver a intentarlo, para
+    no penalizar cada escritura de la API mientras el broker está caído.
+
+    Cada evento lleva (source, seq): la secuencia avanza aunque la publicación
+    falle, así las réplicas detectan el hueco y piden un snapshot completo.
+    """
+
+    def __init__(self, host='localhost', port=5672, username='guest', password='guest',
+                 retry_interval=10):
+        # Sin heartbeats: la conexión pasa la mayor parte del tiempo inactiva y un
+        # publicador bloqueante no los atiende; los fallos se detectan al publicar.
+        self.parameters = pika.ConnectionParameters(
+            host=host,
+            port=port,
+            credentials=pika.PlainCredentials(username, password),
+            heartbeat=0,
+            connection_attempts=1,
+            socket_timeout=2,
+        )
+        self.retry_interval = retry_interval
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._channel = None
+        self._retry_after = 0
+        self.source = uuid.uuid4().hex
+        self._seq = 0
+
+    def publish(self, event, employee_id):
+        with self._lock:
+            self._seq += 1
+            body = json.dumps({
+                'event': event,
+                'employee_id': employee_id,
+                'source': self.source,
+                'seq': self._seq,
+            })
+
+            if time.monotonic() < self._retry_after:
+                return False
+            # Un reintento por si la conexión ociosa fue cerrada por el broker
+            for _ in range(2):
+                try:
+                    if self._channel is None or self._channel.is_closed:
+                        self._connect()
+                    self._channel.basic_publish(
+                        exchange=EMPLOYEE_EVENTS_EXCHANGE,
+                        routing_key='',
+                        body=body
+                    )
+                    return True
+                except Exception as e:
+                    error = e
+                    self._disconnect()
+
+            print(f"❌ No se pudo publicar el evento '{event}' del empleado {employee_id}: {error}")
+            self._retry_after = time.monotonic() + self.retry_interval
+            return False
+
+    def _connect(self):
+        self._connection = pika.BlockingConnection(self.parameters)
+        self._channel = self._connection.channel()
+        self._channel.exchange_declare(
+            exchange=EMPLOYEE_EVENTS_EXCHANGE, exchange_type='fanout', durable=True
+        )
+
+    def _disconnect(self):
+        connection, self._connection, self._channel = self._connection, None, None
+        if connection is not None and connection.is_open:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+class InProcessEventPublisher:
+    """Publicador de eventos sobre el broker en memoria (VALIDATION_TRANSPORT 'inprocess')."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self.source = uuid.uuid4().hex
+        self._seq = 0
+
+    def publish(self, event, employee_id):
+        with self._lock:
+            self._seq += 1
+            message = {
+                'event': event,
+                'employee_id': employee_id,
+                'source': self.source,
+                'seq': self._seq,
+            }
+        self.broker.publish(EMPLOYEE_EVENTS_EXCHANGE, message)
+        return True
+
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def get_event_publisher():
+    global _publisher
+    inprocess = get_transport_backend() == INPROCESS
+    with _publisher_lock:
+        if (_publisher is None or _publisher.pid != os.getpid()
+                or isinstance(_publisher, InProcessEventPublisher) != inprocess):
+            if inprocess:
+                _publisher = InProcessEventPublisher(get_inprocess_broker())
+            else:
+                config = settings.RABBITMQ
+                _publisher = EmployeeEventPublisher(
+                    host=config['HOST'],
+                    port=int(config['PORT']),
+                    username=config['USER'],
+                    password=config['PASSWORD'],
+                )
+        return _publisher
+
+
+def publish_employee_event(event, employee_id):
+    """Publica el evento cuando la transacción actual se confirma."""
+    transaction.on_commit(lambda: get_event_publisher().publish(event, employee_id))
@@ -1,7 +1,6 @@
 from django.core.management.base import BaseCommand
-from django.conf import settings
-import os
 
+from employees.api_schema import get_api_spec
 from employees.swagger_to_pdf import convert_swagger_to_pdf
 
 
@@ -15,14 +14,23 @@ class Command(BaseCommand):
             default='api_documentation.pdf',
             help='Nombre del archivo PDF de salida'
         )
+        parser.add_argument(
+            '--schema-file',
+            type=str,
+            default=None,
+            help='Schema OpenAPI (.yml/.json) a usar en lugar del generado por drf-spectacular'
+        )
 
     def handle(self, *args, **options):
-        swagger_file = os.path.join(settings.BASE_DIR, 'schema.yml')
+        swagger_file = options['schema_file']
         output_file = options['output']
 
         self.stdout.write('Generando documentación PDF con xhtml2pdf...')
 
-        result = convert_swagger_to_pdf(swagger_file, output_file)
+        if swagger_file:
+            result = convert_swagger_to_pdf(swagger_file, output_file)
+        else:
+            result = convert_swagger_to_pdf(output_file=output_file, spec=get_api_spec())
 
         if result:
             self.stdout.write(
@@ -31,4 +39,4 @@ class Command(BaseCommand):
         else:
             self.stdout.write(
                 self.style.ERROR('❌ Error generando PDF')
-            )
\ No newline at end of file
+            )
@@ -1,12 +1,53 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from employees.rabbitmq_consumer import start_consumer
+
+from employees.consumer_runner import ConsumerRunner
 
 
 class Command(BaseCommand):
     help = 'Inicia el consumidor RabbitMQ para validación de empleados'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.RABBITMQ.get('CONSUMER_WORKERS', 1),
+            help='Número de procesos consumidores'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=settings.RABBITMQ.get('CONSUMER_THREADS', 1),
+            help='Consumidores concurrentes por proceso (una conexión cada uno)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Mensajes por lote (1 desactiva el modo por lotes)'
+        )
+        parser.add_argument(
+            '--batch-window-ms',
+            type=float,
+            help='Espera máxima para completar un lote'
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            default=settings.RABBITMQ.get('CONSUMER_METRICS_PORT'),
+            help='Puerto local de las métricas Prometheus del primer worker (0 las desactiva)'
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(
-            self.style.SUCCESS('Iniciando consumidor RabbitMQ...')
+            self.style.SUCCESS(
+                f"Iniciando consumidor RabbitMQ ({options['workers']} workers x "
+                f"{options['threads']} hilos)..."
+            )
         )
-        start_consumer()
\ No newline at end of file
+        ConsumerRunner(
+            workers=options['workers'],
+            threads=options['threads'],
+            batch_size=options['batch_size'],
+            batch_window_ms=options['batch_window_ms'],
+            metrics_port=options['metrics_port'],
+        ).run()
@@ -2,6 +2,9 @@
 from django.db import models
 from django.utils.timezone import now
 
+from config.changefeed import AbstractChangeLogEntry
+from config.versioning import AbstractTableVersion
+
 class Employee(models.Model):
     first_name = models.CharField(max_length=100, default="Unknown")
     last_name = models.CharField(max_length=100, default="Unknown")
@@ -10,6 +13,15 @@ class Employee(models.Model):
     position = models.CharField(max_length=100, default="Employee")
     salary = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     hire_date = models.DateField(default=now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.first_name} {self.last_name}"
\ No newline at end of file
+        return f"{self.first_name} {self.last_name}"
+
+
+class TableVersion(AbstractTableVersion):
+    """Versión de las tablas del microservicio A (ETag de los listados)."""
+
+
+class ChangeLogEntry(AbstractChangeLogEntry):
+    """Registro de cambios de los empleados (GET /employees/changes/?since=)."""
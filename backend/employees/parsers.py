@@ -0,0 +1,27 @@
+import codecs
+import csv
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def read_csv_rows(stream, encoding='utf-8-sig'):
+    """Filas de un CSV con cabecera como diccionarios; las celdas vacías se omiten."""
+    try:
+        reader = csv.DictReader(codecs.iterdecode(stream, encoding))
+        return [
+            {key.strip(): value.strip() for key, value in row.items()
+             if key and value is not None and value.strip() != ''}
+            for row in reader
+        ]
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ParseError(f"CSV inválido: {e}")
+
+
+class CSVParser(BaseParser):
+    """Cuerpo text/csv con cabecera como lista de diccionarios."""
+
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return read_csv_rows(stream)
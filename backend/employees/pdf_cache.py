@@ -0,0 +1,173 @@
+import glob
+import hashlib
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from employees.api_schema import get_api_spec, get_api_spec_digest
+from employees.swagger_to_pdf import convert_swagger_to_pdf
+
+PDF_PREFIX = 'api_documentation-'
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def schema_file_digest(schema_path):
+    with open(schema_path, 'rb') as f:
+        return content_digest(f.read())
+
+
+class PDFCache:
+    """
+    PDFs de la documentación guardados en disco, uno por versión del schema.
+
+    Cada versión se identifica por el hash del contenido del schema, que también
+    sirve como ETag. Un lock por hilo y un archivo de lock (O_EXCL, válido entre
+    procesos y en Windows) garantizan que una misma versión se renderiza una sola
+    vez aunque lleguen varias peticiones a la vez.
+    """
+
+    def __init__(self, cache_dir, lock_timeout=120):
+        self.cache_dir = str(cache_dir)
+        self.lock_timeout = lock_timeout
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def path_for(self, digest):
+        return os.path.join(self.cache_dir, f'{PDF_PREFIX}{digest}.pdf')
+
+    def get(self, digest):
+        path = self.path_for(digest)
+        return path if os.path.exists(path) else None
+
+    def get_or_render(self, digest, render):
+        """Ruta del PDF de la versión `digest`; `render()` solo se llama si no existe."""
+        path = self.get(digest)
+        if path:
+            return path
+
+        with self._thread_lock(digest):
+            with self._file_lock(digest):
+                path = self.get(digest)
+                if path:
+                    return path
+
+                pdf_data = render()
+                if not pdf_data:
+                    return None
+
+                path = self.path_for(digest)
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(pdf_data)
+                os.replace(tmp_path, path)
+                self._remove_old_versions(keep=path)
+                return path
+
+    def _thread_lock(self, digest):
+        with self._locks_guard:
+            return self._locks.setdefault(digest, threading.Lock())
+
+    def _file_lock(self, digest):
+        return _FileLock(self.path_for(digest) + '.lock', self.lock_timeout)
+
+    def _remove_old_versions(self, keep):
+        for old_path in glob.glob(os.path.join(self.cache_dir, f'{PDF_PREFIX}*.pdf')):
+            if old_path != keep:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    # Puede estar sirviéndose todavía (Windows); se limpia en la próxima versión
+                    pass
+
+
+class _FileLock:
+    """
+    Lock entre procesos con un archivo O_EXCL. Mientras se tiene, un hilo
+    renueva su mtime cada `timeout / 4` segundos: un lock cuyo mtime supera
+    `timeout` es de un proceso que murió, no de un render largo.
+    """
+
+    def __init__(self, path, timeout):
+        self.path = path
+        self.timeout = timeout
+        self._released = threading.Event()
+        self._heartbeat = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                self._start_heartbeat()
+                return self
+            except FileExistsError:
+                if self._is_stale():
+                    self._release()
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"No se pudo obtener el lock {self.path}")
+                time.sleep(0.1)
+
+    def __exit__(self, *exc_info):
+        self._released.set()
+        self._heartbeat.join()
+        self._release()
+
+    def _start_heartbeat(self):
+        self._released.clear()
+        self._heartbeat = threading.Thread(target=self._touch, name='pdf-lock-heartbeat', daemon=True)
+        self._heartbeat.start()
+
+    def _touch(self):
+        while not self._released.wait(self.timeout / 4):
+            try:
+                os.utime(self.path)
+            except OSError:
+                return
+
+    def _is_stale(self):
+        # Lock abandonado por un proceso que murió mientras renderizaba
+        try:
+            return time.time() - os.path.getmtime(self.path) > self.timeout
+        except OSError:
+            return False
+
+    def _release(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+_caches = {}
+_caches_guard = threading.Lock()
+
+
+def get_pdf_cache():
+    """Una instancia por directorio: los locks por versión se comparten entre peticiones."""
+    cache_dir = str(settings.API_DOCS_PDF_CACHE_DIR)
+    with _caches_guard:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = PDFCache(cache_dir)
+        return _caches[cache_dir]
+
+
+def current_schema_digest():
+    if settings.API_DOCS_SCHEMA_FILE:
+        return schema_file_digest(str(settings.API_DOCS_SCHEMA_FILE))
+    return get_api_spec_digest()
+
+
+def render_api_pdf(digest):
+    """Ruta del PDF de la versión `digest` del schema, renderizándolo si hace falta."""
+    if settings.API_DOCS_SCHEMA_FILE:
+        swagger_file = str(settings.API_DOCS_SCHEMA_FILE)
+        return get_pdf_cache().get_or_render(digest, lambda: convert_swagger_to_pdf(swagger_file))
+
+    return get_pdf_cache().get_or_render(digest, lambda: convert_swagger_to_pdf(spec=get_api_spec()))
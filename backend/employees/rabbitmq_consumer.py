@@ -1,5 +1,7 @@
 
+import argparse
 import json
+import logging
 import time
 import os
 import sys
@@ -10,42 +12,96 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
+from django.conf import settings
+
+from config.transport import (
+    EMPLOYEE_EVENTS_EXCHANGE, EMPLOYEE_SNAPSHOTS_EXCHANGE, SNAPSHOT_REQUEST_QUEUE, as_employee_id,
+)
+from employees import consumer_metrics as metrics
 from employees.models import Employee
+from employees.snapshot import EventPositions, build_snapshot
+
+
+REQUEST_QUEUE = 'validate_employee_request'
+# Cola compartida del protocolo antiguo; solo se usa en modo legacy
+RESPONSE_QUEUE = 'validate_employee_response'
+
+logger = logging.getLogger(__name__)
 
 
 class SimpleEmployeeValidator:
-    def __init__(self):
+    def __init__(self, legacy_response_queue=None, batch_size=None, batch_window_ms=None,
+                 snapshots_enabled=None):
         self.connection = None
         self.channel = None
+        self._stopping = False
+        if legacy_response_queue is None:
+            legacy_response_queue = settings.RABBITMQ.get('LEGACY_RESPONSE_QUEUE', False)
+        self.legacy_response_queue = legacy_response_queue
+
+        # Modo por lotes: se acumulan hasta batch_size mensajes o batch_window_ms
+        # milisegundos y se resuelven con una sola consulta id__in
+        if batch_size is None:
+            batch_size = settings.RABBITMQ.get('BATCH_SIZE', 1)
+        if batch_window_ms is None:
+            batch_window_ms = settings.RABBITMQ.get('BATCH_WINDOW_MS', 20)
+        self.batch_size = max(1, int(batch_size))
+        self.batch_window_ms = batch_window_ms
+        self._batch = []
+        self._flush_timer = None
+
+        # Réplica de IDs en el microservicio B: snapshot al arrancar, bajo
+        # petición (con un mínimo entre envíos) y periódicamente como red de seguridad
+        replica_config = getattr(settings, 'EMPLOYEE_ID_REPLICA', {})
+        if snapshots_enabled is None:
+            snapshots_enabled = replica_config.get('ENABLED', True)
+        self.snapshots_enabled = snapshots_enabled
+        self.snapshot_interval = replica_config.get('SNAPSHOT_INTERVAL', 300)
+        self.snapshot_min_interval = replica_config.get('SNAPSHOT_MIN_INTERVAL', 1)
+        self._last_snapshot_at = None
+        self._snapshot_timer = None
+        # Secuencias de employee_events ya incluidas en los snapshots que se publican
+        self.event_positions = EventPositions()
+
+        # Cada cuánto se consulta la profundidad de la cola para las métricas (segundos)
+        self.queue_depth_interval = 5
+        self._queue_depth_timer = None
 
     def connect(self, max_retries=5, retry_interval=5):
         for attempt in range(max_retries):
+            if self._stopping:
+                return False
             try:
-                print(f"🔌 Intentando conectar a RabbitMQ (intento {attempt + 1}/{max_retries})...")
+                logger.info("🔌 Intentando conectar a RabbitMQ (intento %s/%s)...", attempt + 1, max_retries)
 
+                config = settings.RABBITMQ
                 self.connection = pika.BlockingConnection(
                     pika.ConnectionParameters(
-                        host='localhost',
-                        port=5672,
+                        host=config['HOST'],
+                        port=int(config['PORT']),
+                        credentials=pika.PlainCredentials(config['USER'], config['PASSWORD']),
                         connection_attempts=3,
                         retry_delay=3
                     )
                 )
                 self.channel = self.connection.channel()
 
-                self.channel.queue_declare(queue='validate_employee_request', durable=True)
-                self.channel.queue_declare(queue='validate_employee_response', durable=True)
+                self.channel.queue_declare(queue=REQUEST_QUEUE, durable=True)
+                if self.legacy_response_queue:
+                    self.channel.queue_declare(queue=RESPONSE_QUEUE, durable=True)
 
-                print("✅ Conectado a RabbitMQ exitosamente!")
+                logger.info("✅ Conectado a RabbitMQ exitosamente!")
+                metrics.CONNECTS.inc()
                 return True
 
             except Exception as e:
-                print(f"❌ Error en intento {attempt + 1}: {e}")
+                metrics.CONNECTION_ERRORS.inc()
+                logger.warning("❌ Error en intento %s: %s", attempt + 1, e)
                 if attempt < max_retries - 1:
-                    print(f"⏳ Reintentando en {retry_interval} segundos...")
+                    logger.info("⏳ Reintentando en %s segundos...", retry_interval)
                     time.sleep(retry_interval)
                 else:
-                    print("🚫 No se pudo conectar después de varios intentos")
+                    logger.error("🚫 No se pudo conectar después de varios intentos")
                     return False
         return False
 
@@ -54,83 +110,354 @@ class SimpleEmployeeValidator:
         try:
 
             message = json.loads(body)
-            employee_id = message.get('employee_id')
+            self.record_received(message, properties)
+            self.send_response(properties, self.handle_message(message))
 
-            print(f"📨 Validando empleado ID: {employee_id}")
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+            metrics.ACKS.inc()
 
-            try:
-                exists = Employee.objects.filter(id=employee_id).exists()
-                response = {
-                    'valid': exists,
-                    'employee_id': employee_id,
-                    'message': 'Empleado válido' if exists else 'Empleado no encontrado'
-                }
-            except Exception as db_error:
-                print(f"❌ Error de base de datos: {db_error}")
-                response = {
-                    'valid': False,
-                    'employee_id': employee_id,
-                    'message': 'Error interno del servidor'
-                }
+        except json.JSONDecodeError:
+            logger.warning("❌ Error: Mensaje JSON inválido")
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            metrics.NACKS.inc()
+        except Exception as e:
+            logger.error("❌ Error procesando mensaje: %s", e)
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            metrics.NACKS.inc()
 
+    def handle_message(self, message):
+        """Respuesta a una solicitud de validación ya decodificada (cualquier transporte)."""
+        if 'employee_ids' in message:
+            # Validación de varios empleados en un solo viaje (ingesta masiva)
+            logger.debug("📨 Validando %s empleados", len(message['employee_ids'] or []))
+            return self.build_many_response(message['employee_ids'])
+        employee_id = message.get('employee_id')
+        logger.debug("📨 Validando empleado ID: %s", employee_id)
+        return self.build_response(employee_id)
 
-            self.channel.basic_publish(
-                exchange='',
-                routing_key='validate_employee_response',
-                body=json.dumps(response),
-                properties=pika.BasicProperties(
-                    delivery_mode=2,
-                )
-            )
+    def record_received(self, message, properties):
+        kind = 'many' if 'employee_ids' in message else 'single'
+        metrics.MESSAGES.labels(kind=kind).inc()
+        # El cliente RPC marca cada petición con la hora de publicación
+        sent_at = (getattr(properties, 'headers', None) or {}).get('sent_at')
+        if sent_at is not None:
+            metrics.QUEUE_LAG_SECONDS.observe(max(0.0, time.time() - float(sent_at)))
 
-            print(f"✅ Respuesta enviada: {response}")
+    def build_response(self, employee_id, existing_ids=None):
+        try:
+            if existing_ids is None:
+                with metrics.DB_LOOKUP_SECONDS.time():
+                    exists = Employee.objects.filter(id=employee_id).exists()
+            else:
+                exists = as_employee_id(employee_id) in existing_ids
+            return {
+                'valid': exists,
+                'employee_id': employee_id,
+                'message': 'Empleado válido' if exists else 'Empleado no encontrado'
+            }
+        except Exception as db_error:
+            logger.error("❌ Error de base de datos: %s", db_error)
+            return self.error_response(employee_id)
 
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+    def build_many_response(self, employee_ids, existing_ids=None):
+        employee_ids = list(employee_ids or [])
+        try:
+            if existing_ids is None:
+                existing_ids = _existing_ids(employee_ids)
+            return {
+                'valid_ids': [i for i in employee_ids if as_employee_id(i) in existing_ids],
+                'message': 'Validación completada'
+            }
+        except Exception as db_error:
+            logger.error("❌ Error de base de datos: %s", db_error)
+            return self.error_response(None)
+
+    def response_for(self, message, existing_ids):
+        if existing_ids is None:
+            return self.error_response(message.get('employee_id'))
+        if 'employee_ids' in message:
+            return self.build_many_response(message['employee_ids'], existing_ids)
+        return self.build_response(message.get('employee_id'), existing_ids)
+
+    def error_response(self, employee_id):
+        return {
+            'valid': False,
+            'employee_id': employee_id,
+            'message': 'Error interno del servidor'
+        }
 
+    def batch_callback(self, ch, method, properties, body):
+        try:
+            message = json.loads(body)
         except json.JSONDecodeError:
-            print("❌ Error: Mensaje JSON inválido")
+            logger.warning("❌ Error: Mensaje JSON inválido")
             ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            metrics.NACKS.inc()
+            return
+
+        self.record_received(message, properties)
+        self._batch.append((method.delivery_tag, properties, message))
+
+        if len(self._batch) >= self.batch_size:
+            self.flush_batch()
+        elif self._flush_timer is None:
+            self._flush_timer = self.connection.call_later(
+                self.batch_window_ms / 1000, self._on_flush_timer
+            )
+
+    def _on_flush_timer(self):
+        self._flush_timer = None
+        self.flush_batch()
+
+    def flush_batch(self):
+        if self._flush_timer is not None:
+            self.connection.remove_timeout(self._flush_timer)
+            self._flush_timer = None
+
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+
+        ids = []
+        for _, _, message in batch:
+            ids.extend(message.get('employee_ids') or [message.get('employee_id')])
+        try:
+            existing_ids = _existing_ids(ids)
+        except Exception as db_error:
+            logger.error("❌ Error de base de datos: %s", db_error)
+            existing_ids = None
+
+        for _, properties, message in batch:
+            self.send_response(properties, self.response_for(message, existing_ids))
+
+        # Un solo ack confirma todas las entregas pendientes hasta la última del lote
+        self.channel.basic_ack(delivery_tag=batch[-1][0], multiple=True)
+        metrics.ACKS.inc(len(batch))
+        metrics.BATCH_SIZE.observe(len(batch))
+        logger.debug("📦 Lote de %s validaciones resuelto", len(batch))
+
+    def send_response(self, properties, response):
+        """
+        Responde en la cola reply_to del solicitante con su correlation_id.
+        La cola compartida validate_employee_response solo se usa en modo legacy.
+        """
+        if self.legacy_response_queue:
+            routing_key = RESPONSE_QUEUE
+            delivery_mode = 2
+        elif properties.reply_to:
+            # Las colas de respuesta son exclusivas y efímeras: no hace falta persistir
+            routing_key = properties.reply_to
+            delivery_mode = 1
+        else:
+            logger.warning("⚠️ Solicitud sin reply_to, se descarta la respuesta: %s", response)
+            return
+
+        self.channel.basic_publish(
+            exchange='',
+            routing_key=routing_key,
+            body=json.dumps(response),
+            properties=pika.BasicProperties(
+                correlation_id=properties.correlation_id,
+                delivery_mode=delivery_mode,
+            )
+        )
+
+        logger.debug("✅ Respuesta enviada: %s", response)
+
+    def setup_snapshots(self):
+        self.channel.exchange_declare(
+            exchange=EMPLOYEE_SNAPSHOTS_EXCHANGE, exchange_type='fanout', durable=True
+        )
+        self.channel.queue_declare(queue=SNAPSHOT_REQUEST_QUEUE, durable=True)
+        self.channel.basic_consume(
+            queue=SNAPSHOT_REQUEST_QUEUE,
+            on_message_callback=self.snapshot_request_callback,
+            auto_ack=True
+        )
+        # Cola propia y efímera sobre employee_events para saber qué secuencias
+        # cubre cada snapshot
+        self.channel.exchange_declare(
+            exchange=EMPLOYEE_EVENTS_EXCHANGE, exchange_type='fanout', durable=True
+        )
+        events_queue = self.channel.queue_declare(queue='', exclusive=True).method.queue
+        self.channel.queue_bind(exchange=EMPLOYEE_EVENTS_EXCHANGE, queue=events_queue)
+        self.channel.basic_consume(
+            queue=events_queue,
+            on_message_callback=self.event_callback,
+            auto_ack=True
+        )
+        self.publish_snapshot()
+
+    def publish_snapshot(self):
+        if self._snapshot_timer is not None:
+            self.connection.remove_timeout(self._snapshot_timer)
+
+        try:
+            snapshot = build_snapshot(self.event_positions)
+            self.channel.basic_publish(
+                exchange=EMPLOYEE_SNAPSHOTS_EXCHANGE,
+                routing_key='',
+                body=json.dumps(snapshot)
+            )
+            logger.info("🗺️ Snapshot de empleados publicado: %s IDs", snapshot['count'])
         except Exception as e:
-            print(f"❌ Error procesando mensaje: {e}")
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            logger.error("❌ Error publicando snapshot de empleados: %s", e)
+
+        self._last_snapshot_at = time.monotonic()
+        self._snapshot_timer = self.connection.call_later(
+            self.snapshot_interval, self._on_snapshot_timer
+        )
+
+    def _on_snapshot_timer(self):
+        self._snapshot_timer = None
+        self.publish_snapshot()
+
+    def event_callback(self, ch, method, properties, body):
+        try:
+            self.event_positions.observe(json.loads(body))
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            logger.warning("❌ Error: Evento de empleado inválido")
+
+    def snapshot_request_callback(self, ch, method, properties, body):
+        # Varias réplicas pueden pedir resync a la vez: se agrupan en un solo envío
+        elapsed = time.monotonic() - (self._last_snapshot_at or 0)
+        if elapsed >= self.snapshot_min_interval:
+            self.publish_snapshot()
+        elif self._snapshot_timer is not None:
+            self.connection.remove_timeout(self._snapshot_timer)
+            self._snapshot_timer = self.connection.call_later(
+                self.snapshot_min_interval - elapsed, self._on_snapshot_timer
+            )
+
+    def update_queue_depth(self):
+        self._queue_depth_timer = None
+        try:
+            declared = self.channel.queue_declare(queue=REQUEST_QUEUE, durable=True, passive=True)
+            metrics.QUEUE_DEPTH.set(declared.method.message_count)
+        except Exception as e:
+            logger.warning("⚠️ No se pudo leer la profundidad de la cola: %s", e)
+            return
+        self._queue_depth_timer = self.connection.call_later(
+            self.queue_depth_interval, self.update_queue_depth
+        )
+
+    def stop(self):
+        """
+        Detiene el consumo de forma ordenada; se puede llamar desde cualquier hilo.
+        Los mensajes de un lote en curso se responden y confirman antes de salir.
+        """
+        self._stopping = True
+        connection = self.connection
+        if connection is None or connection.is_closed:
+            return
+        try:
+            connection.add_callback_threadsafe(self._stop_consuming)
+        except Exception as e:
+            logger.error("❌ Error deteniendo consumidor: %s", e)
+
+    def _stop_consuming(self):
+        self.flush_batch()
+        self.channel.stop_consuming()
+
+    def reset_connection_state(self):
+        """
+        Olvida el estado ligado a la conexión anterior antes de reconectar: los
+        timers son de esa conexión y las entregas sin confirmar de un canal
+        cerrado las reenvía el broker (sus delivery tags no valen en el nuevo).
+        """
+        self._batch = []
+        self._flush_timer = None
+        self._snapshot_timer = None
+        self._queue_depth_timer = None
 
     def start_consuming(self):
 
+        self.reset_connection_state()
         if not self.connect():
             return
+        if self._stopping:
+            self.connection.close()
+            return
 
         try:
-            self.channel.basic_qos(prefetch_count=1)
+            self.channel.basic_qos(prefetch_count=self.batch_size)
+            if self.batch_size > 1:
+                on_message_callback = self.batch_callback
+                logger.info("📦 Modo por lotes: %s mensajes / %s ms", self.batch_size, self.batch_window_ms)
+            else:
+                on_message_callback = self.validate_callback
             self.channel.basic_consume(
-                queue='validate_employee_request',
-                on_message_callback=self.validate_callback,
+                queue=REQUEST_QUEUE,
+                on_message_callback=on_message_callback,
                 auto_ack=False
             )
+            if self.snapshots_enabled:
+                self.setup_snapshots()
+            self.update_queue_depth()
 
-            print("🔄 Iniciando consumo de mensajes...")
-            print("📋 Esperando solicitudes de validación...")
-            print("💡 Presiona CTRL+C para detener")
+            logger.info("🔄 Iniciando consumo de mensajes...")
+            logger.info("📋 Esperando solicitudes de validación...")
+            logger.info("💡 Presiona CTRL+C para detener")
 
             self.channel.start_consuming()
 
         except KeyboardInterrupt:
-            print("\n🛑 Deteniendo consumidor...")
+            logger.info("🛑 Deteniendo consumidor...")
         except Exception as e:
-            print(f"❌ Error en consumo: {e}")
+            metrics.CONNECTION_ERRORS.inc()
+            logger.error("❌ Error en consumo: %s", e)
         finally:
             if self.connection and not self.connection.is_closed:
                 self.connection.close()
-                print("🔌 Conexión cerrada")
+                logger.info("🔌 Conexión cerrada")
+
+
+def _existing_ids(employee_ids):
+    """IDs de la lista que existen, resueltos con una sola consulta id__in."""
+    ids = {as_employee_id(employee_id) for employee_id in employee_ids} - {None}
+    if not ids:
+        return set()
+    with metrics.DB_LOOKUP_SECONDS.time():
+        return set(Employee.objects.filter(id__in=ids).values_list('id', flat=True))
+
+
+def serve_in_process(broker):
+    """
+    Registra el validador en el broker en memoria (VALIDATION_TRANSPORT
+    'inprocess'): atiende las validaciones y las peticiones de snapshot de
+    la réplica sin RabbitMQ.
+    """
+    validator = SimpleEmployeeValidator(snapshots_enabled=False)
 
+    def handle(message):
+        metrics.MESSAGES.labels(kind='many' if 'employee_ids' in message else 'single').inc()
+        return validator.handle_message(message)
 
-def start_simple_consumer():
-    print("=" * 50)
-    print(" INICIANDO CONSUMIDOR RABBITMQ")
-    print("=" * 50)
+    def publish_snapshot(message):
+        broker.publish(EMPLOYEE_SNAPSHOTS_EXCHANGE, build_snapshot(validator.event_positions))
 
-    consumer = SimpleEmployeeValidator()
+    broker.serve(REQUEST_QUEUE, handle)
+    if getattr(settings, 'EMPLOYEE_ID_REPLICA', {}).get('ENABLED', True):
+        broker.subscribe(EMPLOYEE_EVENTS_EXCHANGE, validator.event_positions.observe)
+        broker.consume(SNAPSHOT_REQUEST_QUEUE, publish_snapshot)
+    return validator
+
+
+def start_simple_consumer(batch_size=None, batch_window_ms=None, metrics_port=None):
+    logger.info("🚀 INICIANDO CONSUMIDOR RABBITMQ")
+    metrics.start_server(metrics_port)
+
+    consumer = SimpleEmployeeValidator(batch_size=batch_size, batch_window_ms=batch_window_ms)
     consumer.start_consuming()
 
 
 if __name__ == '__main__':
-    start_simple_consumer()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Consumidor de validación de empleados')
+    parser.add_argument('--batch-size', type=int, help='Mensajes por lote (1 desactiva el modo por lotes)')
+    parser.add_argument('--batch-window-ms', type=float, help='Espera máxima para completar un lote')
+    parser.add_argument('--metrics-port', type=int, default=settings.RABBITMQ.get('CONSUMER_METRICS_PORT'),
+                        help='Puerto local de las métricas Prometheus (0 las desactiva)')
+    args = parser.parse_args()
+
+    start_simple_consumer(batch_size=args.batch_size, batch_window_ms=args.batch_window_ms,
+                          metrics_port=args.metrics_port)
\ No newline at end of file
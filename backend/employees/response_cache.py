@@ -0,0 +1,96 @@
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+LIST = 'list'
+DETAIL = 'detail'
+
+
+class EmployeeResponseCache:
+    """
+    Caché de lectura de las representaciones de empleados (páginas del listado
+    y detalle), sobre el framework de caché de Django.
+
+    Las claves llevan el validador que la vista ya lee de la base de datos: el
+    ETag del listado (versión de la tabla y URL) o el del detalle (updated_at
+    del empleado). Una escritura cambia esa versión en la base compartida, así
+    que ningún worker vuelve a leer las entradas anteriores (expiran solas) y
+    no hace falta invalidar nada, sea cual sea el backend de caché.
+    """
+
+    def __init__(self, alias='employees', timeout=None, enabled=True, prefix='employees'):
+        self.alias = alias
+        self.timeout = timeout
+        self.enabled = enabled
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stats = {LIST: [0, 0], DETAIL: [0, 0]}
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_list(self, etag, build):
+        """Datos de la página del listado con ETag `etag`; `build()` solo se llama si no está en caché."""
+        return self._get_or_build(LIST, f'{self.prefix}:list:{_digest(etag)}', build)
+
+    def get_detail(self, pk, etag, build):
+        """Datos del empleado `pk` en la versión `etag`; `build()` solo se llama si no está en caché."""
+        return self._get_or_build(DETAIL, f'{self.prefix}:detail:{pk}:{_digest(etag)}', build)
+
+    def clear(self):
+        self.cache.clear()
+        with self._lock:
+            self._stats = {LIST: [0, 0], DETAIL: [0, 0]}
+
+    def stats(self):
+        with self._lock:
+            stats = {kind: {'hits': hits, 'misses': misses, 'hit_ratio': _ratio(hits, misses)}
+                     for kind, (hits, misses) in self._stats.items()}
+            hits = sum(hits for hits, _ in self._stats.values())
+            misses = sum(misses for _, misses in self._stats.values())
+            stats.update({
+                'enabled': self.enabled,
+                'backend': settings.CACHES[self.alias]['BACKEND'],
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': _ratio(hits, misses),
+            })
+        return stats
+
+    def _get_or_build(self, kind, key, build):
+        if not self.enabled:
+            return build()
+        data = self.cache.get(key)
+        hit = data is not None
+        with self._lock:
+            self._stats[kind][0 if hit else 1] += 1
+        if hit:
+            return data
+        data = build()
+        if data is not None:
+            self.cache.set(key, data, self.timeout)
+        return data
+
+
+def _digest(etag):
+    return hashlib.sha1(etag.encode('utf-8')).hexdigest()
+
+
+def _ratio(hits, misses):
+    total = hits + misses
+    return round(hits / total, 4) if total else None
+
+
+def _build_cache():
+    config = getattr(settings, 'EMPLOYEE_RESPONSE_CACHE', {})
+    return EmployeeResponseCache(
+        alias=config.get('ALIAS', 'employees'),
+        timeout=config.get('TIMEOUT', 300),
+        enabled=config.get('ENABLED', True),
+    )
+
+
+employee_response_cache = _build_cache()
@@ -38,4 +38,16 @@ class EmployeeSerializer(serializers.ModelSerializer):
     def validate_salary(self, value):
         if value < 0:
             raise serializers.ValidationError("El salario no puede ser negativo")
-        return value
\ No newline at end of file
+        return value
+
+class EmployeeBulkSerializer(EmployeeSerializer):
+    """
+    Fila de una importación masiva. La unicidad del email no se valida fila a
+    fila: la importación resuelve todo el lote con una sola consulta email__in.
+    """
+
+    class Meta(EmployeeSerializer.Meta):
+        extra_kwargs = {'email': {'validators': []}}
+
+    def validate_email(self, value):
+        return value
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.changefeed import record_changes
+from config.versioning import bump_version
+from employees.models import ChangeLogEntry, Employee, TableVersion
+
+
+# Cualquier save()/delete() de un empleado (vistas, admin, shell) avanza la
+# versión de la tabla, que también deja atrás las respuestas cacheadas, y queda
+# en el registro de cambios; bulk_create y update() no emiten señales y lo hace
+# quien los llama.
+# post_save llega después del INSERT/UPDATE: solo es atómico con la escritura si
+# el save() corre dentro de transaction.atomic() (las vistas y el admin lo hacen;
+# delete() ya envía post_delete dentro de su propia transacción)
+@receiver(post_save, sender=Employee, dispatch_uid='employee_response_cache_save')
+@receiver(post_delete, sender=Employee, dispatch_uid='employee_response_cache_delete')
+def invalidate_employee_responses(sender, instance, signal, **kwargs):
+    record_changes(ChangeLogEntry, Employee._meta.db_table, [instance.pk], deleted=signal is post_delete)
+    bump_version(TableVersion, Employee._meta.db_table)
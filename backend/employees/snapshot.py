@@ -0,0 +1,56 @@
+import base64
+import threading
+import time
+import zlib
+
+from config.transport import SNAPSHOT_ENCODING
+from employees.models import Employee
+
+
+def encode_bitmap(ids):
+    """Bitmap comprimido donde el bit N indica que existe el empleado N."""
+    ids = list(ids)
+    bitmap = bytearray(max(ids, default=0) // 8 + 1)
+    for employee_id in ids:
+        bitmap[employee_id >> 3] |= 1 << (employee_id & 7)
+    return base64.b64encode(zlib.compress(bytes(bitmap))).decode('ascii')
+
+
+class EventPositions:
+    """
+    Última secuencia vista de cada publicador de employee_events. Los eventos se
+    publican al confirmarse la transacción, así que todo lo visto aquí antes de
+    leer los IDs ya está en el snapshot; las réplicas reaplican el resto.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seqs = {}
+
+    def observe(self, message):
+        source, seq = message.get('source'), message.get('seq')
+        if source is None or seq is None:
+            return
+        with self._lock:
+            if seq > self._seqs.get(source, 0):
+                self._seqs[source] = seq
+
+    def seqs(self):
+        with self._lock:
+            return dict(self._seqs)
+
+
+def build_snapshot(positions=None):
+    generated_at = time.time()
+    # Las posiciones se toman antes de leer los IDs, nunca después
+    seqs = positions.seqs() if positions is not None else {}
+    ids = list(Employee.objects.values_list('id', flat=True).iterator(chunk_size=10000))
+    return {
+        'type': 'snapshot',
+        'encoding': SNAPSHOT_ENCODING,
+        'generated_at': generated_at,
+        'seqs': seqs,
+        'count': len(ids),
+        'max_id': max(ids, default=0),
+        'bitmap': encode_bitmap(ids),
+    }
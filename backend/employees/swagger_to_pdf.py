@@ -1,6 +1,7 @@
 import yaml
 import json
 import os
+import tempfile
 from io import BytesIO
 
 from rest_framework import status
@@ -8,16 +9,20 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from xhtml2pdf import pisa
 from django.http import HttpResponse
-from django.conf import settings
+
+from employees.api_schema import get_api_spec
 
 
 class SwaggerToPDFConverter:
-    def __init__(self, swagger_file_path):
+    def __init__(self, swagger_file_path=None, spec=None):
+        # El spec puede venir ya en memoria (generado por drf-spectacular) o de un archivo
         self.swagger_file_path = swagger_file_path
-        self.spec = None
+        self.spec = spec
 
     def load_swagger_spec(self):
 
+        if self.spec is not None:
+            return True
         try:
             with open(self.swagger_file_path, 'r', encoding='utf-8') as f:
                 if self.swagger_file_path.endswith('.json'):
@@ -34,11 +39,21 @@ class SwaggerToPDFConverter:
         if not self.spec:
             return None
 
+        return ''.join(self.iter_html())
+
+    def iter_html(self):
+        """
+        Genera el documento HTML como una secuencia de fragmentos.
+
+        El documento se arma con join/escritura directa en lugar de concatenar
+        strings dentro de los bucles, así el coste crece linealmente con el
+        número de endpoints y esquemas.
+        """
         info = self.spec.get('info', {})
         paths = self.spec.get('paths', {})
         components = self.spec.get('components', {})
 
-        html_content = f"""
+        yield f"""
         <!DOCTYPE html>
         <html lang="es">
         <head>
@@ -52,14 +67,22 @@ class SwaggerToPDFConverter:
         <body>
             <div class="container">
                 {self.generate_header(info)}
-                {self.generate_paths_section(paths)}
-                {self.generate_components_section(components)}
+        """
+        yield from self.iter_paths_section(paths)
+        yield from self.iter_components_section(components)
+        yield """
             </div>
         </body>
         </html>
         """
 
-        return html_content
+    def write_html(self, output):
+        """Escribe el HTML fragmento a fragmento en un objeto tipo archivo."""
+        if not self.spec:
+            return False
+        for fragment in self.iter_html():
+            output.write(fragment)
+        return True
 
     def get_css_styles(self):
 
@@ -116,15 +139,17 @@ class SwaggerToPDFConverter:
         """
 
     def generate_paths_section(self, paths):
-        paths_html = "<div class='section'><h2>Endpoints</h2>"
+        return ''.join(self.iter_paths_section(paths))
+
+    def iter_paths_section(self, paths):
+        yield "<div class='section'><h2>Endpoints</h2>"
 
         for path, methods in paths.items():
             for method, details in methods.items():
                 if method.upper() in ['GET', 'POST', 'PUT', 'DELETE', 'PATCH']:
-                    paths_html += self.generate_endpoint_html(path, method.upper(), details)
+                    yield self.generate_endpoint_html(path, method.upper(), details)
 
-        paths_html += "</div>"
-        return paths_html
+        yield "</div>"
 
     def generate_endpoint_html(self, path, method, details):
         method_class = f"method method-{method.lower()}"
@@ -144,9 +169,10 @@ class SwaggerToPDFConverter:
         if not responses:
             return ""
 
-        rows = ""
-        for code, response in responses.items():
-            rows += f"<tr><td>{code}</td><td>{response.get('description', '')}</td></tr>"
+        rows = ''.join(
+            f"<tr><td>{code}</td><td>{response.get('description', '')}</td></tr>"
+            for code, response in responses.items()
+        )
 
         return f"""
         <div class="responses">
@@ -159,26 +185,27 @@ class SwaggerToPDFConverter:
         """
 
     def generate_components_section(self, components):
-        if not components:
-            return ""
+        return ''.join(self.iter_components_section(components))
 
-        schemas_html = ""
-        schemas = components.get('schemas', {})
+    def iter_components_section(self, components):
+        schemas = (components or {}).get('schemas', {})
+        if not schemas:
+            return
 
+        yield """
+        <div class="section">
+            <h2>Esquemas</h2>
+        """
         for schema_name, schema_def in schemas.items():
-            schemas_html += f"""
+            yield f"""
             <div class="endpoint">
                 <h3>{schema_name}</h3>
                 <div class="description">{schema_def.get('description', '')}</div>
             </div>
             """
-
-        return f"""
-        <div class="section">
-            <h2>Esquemas</h2>
-            {schemas_html}
+        yield """
         </div>
-        """ if schemas_html else ""
+        """
 
     def convert_to_pdf(self, output_file=None):
         """Convierte el Swagger a PDF usando xhtml2pdf"""
@@ -186,13 +213,16 @@ class SwaggerToPDFConverter:
             if not self.load_swagger_spec():
                 return None
 
-            html_content = self.generate_html_content()
-            if not html_content:
-                return None
+            # El HTML se escribe en un archivo temporal y xhtml2pdf lo lee por bloques:
+            # ni el documento unido ni su copia codificada pasan por memoria
+            with tempfile.TemporaryFile('w+', encoding='utf-8') as html_file:
+                if not self.write_html(html_file):
+                    return None
+                html_file.seek(0)
 
-            # Crear PDF
-            pdf_buffer = BytesIO()
-            pisa_status = pisa.CreatePDF(html_content, dest=pdf_buffer)
+                # Crear PDF
+                pdf_buffer = BytesIO()
+                pisa_status = pisa.CreatePDF(html_file, dest=pdf_buffer)
 
             if pisa_status.err:
                 print("❌ Error creando PDF")
@@ -201,8 +231,10 @@ class SwaggerToPDFConverter:
             pdf_data = pdf_buffer.getvalue()
             pdf_buffer.close()
 
-            # Guardar archivo si se especifica
-            if output_file:
+            # Guardar archivo si se especifica (ruta u objeto tipo archivo)
+            if hasattr(output_file, 'write'):
+                output_file.write(pdf_data)
+            elif output_file:
                 output_dir = os.path.dirname(output_file)
                 if output_dir and not os.path.exists(output_dir):
                     os.makedirs(output_dir)
@@ -218,18 +250,16 @@ class SwaggerToPDFConverter:
             return None
 
 
-def convert_swagger_to_pdf(swagger_file, output_file=None):
+def convert_swagger_to_pdf(swagger_file=None, output_file=None, spec=None):
 
-    converter = SwaggerToPDFConverter(swagger_file)
+    converter = SwaggerToPDFConverter(swagger_file, spec=spec)
     return converter.convert_to_pdf(output_file)
 
 
 class SwaggerPDFView(APIView):
 
     def get(self, request):
-        swagger_file = os.path.join(settings.BASE_DIR, 'schema.yml')
-
-        pdf_data = convert_swagger_to_pdf(swagger_file)
+        pdf_data = convert_swagger_to_pdf(spec=get_api_spec())
 
         if pdf_data:
             response = HttpResponse(pdf_data, content_type='application/pdf')
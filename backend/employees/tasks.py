@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from employees.pdf_cache import current_schema_digest, render_api_pdf
+
+
+@shared_task
+def generate_api_pdf():
+    """Genera el PDF de la documentación fuera del ciclo de la petición HTTP."""
+    digest = current_schema_digest()
+    if not render_api_pdf(digest):
+        raise RuntimeError("Error generando documentación PDF")
+    return {'digest': digest}
@@ -1,7 +1,32 @@
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import urllib.request
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import Employee
+from xhtml2pdf import pisa
+from config.celery import app as celery_app
+from .models import Employee, TableVersion
+from config.metrics import start_metrics_server
+from config.versioning import bump_version
+from . import consumer_metrics
+from .consumer_runner import ConsumerRunner, ConsumerWorker
+from .api_schema import get_api_spec, get_api_spec_digest
+from .pdf_cache import PDFCache, get_pdf_cache
+from .response_cache import employee_response_cache
+from .swagger_to_pdf import SwaggerToPDFConverter, convert_swagger_to_pdf
 from .serializers import EmployeeSerializer
 from django.utils.timezone import now
 
@@ -9,6 +34,7 @@ from django.utils.timezone import now
 class EmployeeTests(APITestCase):
 
     def setUp(self):
+        employee_response_cache.clear()
         self.employee_data = {
             'first_name': 'John',
             'last_name': 'Doe',
@@ -26,7 +52,25 @@ class EmployeeTests(APITestCase):
         employees = Employee.objects.all()
         serializer = EmployeeSerializer(employees, many=True)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['results'], serializer.data)
+        self.assertIsNone(response.data['next'])
+
+    def test_employee_list_is_paginated_by_cursor(self):
+        for i in range(4):
+            Employee.objects.create(email=f'extra{i}@example.com')
+        url = reverse('employee-list')
+
+        first = self.client.get(url, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        third = self.client.get(second.data['next'])
+
+        ids = [e['id'] for page in (first, second, third) for e in page.data['results']]
+        self.assertEqual(ids, list(Employee.objects.order_by('id').values_list('id', flat=True)))
+        self.assertIsNone(third.data['next'])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('employee-list'), {'cursor': 'basura'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_create_employee(self):
         url = reverse('employee-list')
@@ -71,4 +115,990 @@ class EmployeeTests(APITestCase):
         url = reverse('employee-detail', kwargs={'pk': self.employee.pk})
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(Employee.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(Employee.objects.count(), 0)
+
+    @mock.patch('employees.events.get_event_publisher')
+    def test_create_and_delete_publish_employee_events(self, get_publisher):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('employee-list'), {
+                'first_name': 'Jane',
+                'last_name': 'Smith',
+                'email': 'jane@example.com',
+                'hire_date': '2024-01-15',
+            }, format='json')
+        created_id = response.data['id']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('employee-detail', kwargs={'pk': created_id}))
+
+        self.assertEqual(get_publisher.return_value.publish.call_args_list,
+                         [mock.call('created', created_id), mock.call('deleted', created_id)])
+
+
+class EmployeeBulkImportTests(APITestCase):
+
+    def setUp(self):
+        self.existing = Employee.objects.create(first_name='Ana', email='ana@example.com',
+                                                hire_date='2020-01-01')
+        self.url = reverse('employee-bulk')
+
+    def _row(self, email, **extra):
+        return dict({'first_name': 'Luis', 'last_name': 'Mora', 'email': email,
+                     'position': 'Analista', 'salary': '1000.00', 'hire_date': '2024-01-15'}, **extra)
+
+    def test_json_import_upserts_on_email(self):
+        rows = [self._row('ana@example.com', first_name='Ana María'), self._row('luis@example.com')]
+
+        response = self.client.post(self.url, rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        self.assertEqual([r['status'] for r in response.data['results']], ['updated', 'created'])
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.first_name, 'Ana María')
+        self.assertEqual(Employee.objects.count(), 2)
+
+    def test_email_uniqueness_is_checked_once_per_batch(self):
+        rows = [self._row(f'user{i}@example.com') for i in range(20)]
+
+        # email__in + upsert + lectura de IDs nuevos + registro de cambios + versión de la tabla
+        # (+ savepoint de la transacción)
+        with self.assertNumQueries(7):
+            self.client.post(self.url, rows, format='json')
+
+        self.assertEqual(Employee.objects.count(), 21)
+
+    def test_duplicates_and_invalid_rows_are_reported(self):
+        rows = [self._row('luis@example.com'), self._row('luis@example.com'),
+                self._row('no-es-email'), self._row('neg@example.com', salary='-5')]
+
+        response = self.client.post(self.url, rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        statuses = [r['status'] for r in response.data['results']]
+        self.assertEqual(statuses, ['created', 'error', 'error', 'error'])
+        self.assertIn('email', response.data['results'][1]['errors'])
+        self.assertIn('salary', response.data['results'][3]['errors'])
+
+    def test_csv_upload_is_imported(self):
+        csv_content = (
+            'first_name,last_name,email,position,salary,hire_date\n'
+            'Luis,Mora,luis@example.com,Analista,1000.00,2024-01-15\n'
+            'Eva,Ruiz,eva@example.com,Gerente,2000.00,\n'
+        )
+        upload = SimpleUploadedFile('empleados.csv', csv_content.encode(), content_type='text/csv')
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertTrue(Employee.objects.filter(email='eva@example.com').exists())
+
+
+    @mock.patch('employees.events.get_event_publisher')
+    def test_row_deleted_before_the_upsert_is_reported_as_created(self, get_publisher):
+        bulk_create = Employee.objects.bulk_create
+
+        def delete_then_upsert(*args, **kwargs):
+            # Borrado concurrente entre la lectura de emails y el upsert
+            Employee.objects.filter(pk=self.existing.pk).delete()
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(Employee.objects, 'bulk_create', side_effect=delete_then_upsert), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, [self._row('ana@example.com')], format='json')
+
+        result = response.data['results'][0]
+        self.assertEqual(result['status'], 'created')
+        self.assertNotEqual(result['id'], self.existing.pk)
+        self.assertEqual(result['id'], Employee.objects.get(email='ana@example.com').pk)
+        get_publisher.return_value.publish.assert_called_once_with('created', result['id'])
+
+    def test_missing_columns_keep_their_current_values(self):
+        csv_content = 'email,salary\nana@example.com,2500.00\n'
+        upload = SimpleUploadedFile('salarios.csv', csv_content.encode(), content_type='text/csv')
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.data['updated'], 1)
+        self.existing.refresh_from_db()
+        self.assertEqual(str(self.existing.salary), '2500.00')
+        self.assertEqual(self.existing.first_name, 'Ana')
+        self.assertEqual(str(self.existing.hire_date), '2020-01-01')
+
+    def test_rows_with_different_columns_are_upserted_separately(self):
+        rows = [{'email': 'ana@example.com', 'position': 'Gerente'}, self._row('luis@example.com')]
+
+        response = self.client.post(self.url, rows, format='json')
+
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.first_name, self.existing.position), ('Ana', 'Gerente'))
+        self.assertEqual(Employee.objects.get(email='luis@example.com').first_name, 'Luis')
+
+
+class EmployeeResponseCacheTests(APITestCase):
+
+    def setUp(self):
+        employee_response_cache.clear()
+        self.employee = Employee.objects.create(first_name='Ana', email='ana@example.com',
+                                                hire_date='2020-01-01')
+        self.detail_url = reverse('employee-detail', kwargs={'pk': self.employee.pk})
+
+    def _payload(self, **extra):
+        return dict({'first_name': 'Ana', 'last_name': 'Mora', 'email': 'ana@example.com',
+                     'position': 'Analista', 'salary': '1000.00', 'hire_date': '2020-01-01'}, **extra)
+
+    def test_repeated_reads_only_read_the_version(self):
+        first_list = self.client.get(reverse('employee-list'))
+        first_detail = self.client.get(self.detail_url)
+
+        # Una lectura de la versión de la tabla y otra de updated_at: ni empleados ni serialización
+        with self.assertNumQueries(2):
+            second_list = self.client.get(reverse('employee-list'))
+            second_detail = self.client.get(self.detail_url)
+
+        self.assertEqual(second_list.data, first_list.data)
+        self.assertEqual(second_detail.data, first_detail.data)
+        stats = employee_response_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (2, 2, 0.5))
+
+    def test_pages_are_cached_separately(self):
+        Employee.objects.create(email='luis@example.com')
+        first = self.client.get(reverse('employee-list'), {'page_size': 1})
+
+        second = self.client.get(first.data['next'])
+
+        self.assertNotEqual(first.data['results'], second.data['results'])
+
+    def test_writes_invalidate_list_and_detail(self):
+        self.client.get(reverse('employee-list'))
+        self.client.get(self.detail_url)
+
+        self.client.put(self.detail_url, self._payload(first_name='Ana María'), format='json')
+        self.assertEqual(self.client.get(self.detail_url).data['first_name'], 'Ana María')
+        self.assertEqual(self.client.get(reverse('employee-list')).data['results'][0]['first_name'], 'Ana María')
+
+        self.client.post(reverse('employee-list'), self._payload(email='luis@example.com'), format='json')
+        self.assertEqual(len(self.client.get(reverse('employee-list')).data['results']), 2)
+
+        self.client.delete(self.detail_url)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(len(self.client.get(reverse('employee-list')).data['results']), 1)
+
+    def test_writes_outside_the_api_invalidate_through_signals(self):
+        self.client.get(self.detail_url)
+
+        self.employee.position = 'Gerente'
+        self.employee.save()
+
+        self.assertEqual(self.client.get(self.detail_url).data['position'], 'Gerente')
+
+    def test_writes_from_another_worker_are_seen(self):
+        self.client.get(reverse('employee-list'))
+        self.client.get(self.detail_url)
+
+        # Otro proceso escribe: su caché local no es esta, pero la versión está en la base
+        Employee.objects.filter(pk=self.employee.pk).update(position='Gerente', updated_at=now())
+        bump_version(TableVersion, Employee._meta.db_table)
+
+        self.assertEqual(self.client.get(self.detail_url).data['position'], 'Gerente')
+        self.assertEqual(self.client.get(reverse('employee-list')).data['results'][0]['position'], 'Gerente')
+
+    def test_bulk_upsert_invalidates_updated_employees(self):
+        self.client.get(self.detail_url)
+
+        self.client.post(reverse('employee-bulk'), [self._payload(position='Gerente')], format='json')
+
+        self.assertEqual(self.client.get(self.detail_url).data['position'], 'Gerente')
+
+    def test_missing_employees_are_not_cached(self):
+        missing_url = reverse('employee-detail', kwargs={'pk': self.employee.pk + 1})
+        self.assertEqual(self.client.get(missing_url).status_code, status.HTTP_404_NOT_FOUND)
+
+        Employee.objects.create(pk=self.employee.pk + 1, email='luis@example.com')
+
+        self.assertEqual(self.client.get(missing_url).status_code, status.HTTP_200_OK)
+
+    def test_stats_endpoint(self):
+        self.client.get(self.detail_url)
+        self.client.get(self.detail_url)
+
+        response = self.client.get(reverse('employee-cache-stats'))
+
+        self.assertEqual(response.data['detail'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+        self.assertTrue(response.data['enabled'])
+
+
+
+class EmployeeConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        employee_response_cache.clear()
+        self.employee = Employee.objects.create(first_name='Ana', email='ana@example.com',
+                                                hire_date='2020-01-01')
+        self.list_url = reverse('employee-list')
+        self.detail_url = reverse('employee-detail', kwargs={'pk': self.employee.pk})
+
+    def test_list_revalidation_returns_304_with_one_query(self):
+        first = self.client.get(self.list_url)
+        self.assertTrue(first['ETag'])
+        self.assertIn('Last-Modified', first)
+
+        # Solo la versión de la tabla: ni empleados ni serialización
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], first['ETag'])
+        self.assertFalse(response.content)
+
+    def test_list_etag_changes_after_a_write(self):
+        first = self.client.get(self.list_url)
+
+        Employee.objects.create(email='luis@example.com')
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_list_pages_have_their_own_etag(self):
+        Employee.objects.create(email='luis@example.com')
+        first = self.client.get(self.list_url, {'page_size': 1})
+
+        second = self.client.get(first.data['next'], HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_bulk_upsert_changes_the_list_etag(self):
+        first = self.client.get(self.list_url)
+
+        self.client.post(reverse('employee-bulk'), [{
+            'first_name': 'Ana', 'last_name': 'Mora', 'email': 'ana@example.com',
+            'position': 'Gerente', 'salary': '1000.00', 'hire_date': '2020-01-01',
+        }], format='json')
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['position'], 'Gerente')
+
+    def test_detail_revalidation(self):
+        first = self.client.get(self.detail_url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.employee.position = 'Gerente'
+        self.employee.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['position'], 'Gerente')
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_revalidation_miss_serves_the_body_of_the_new_etag(self):
+        first_list = self.client.get(self.list_url)
+        first_detail = self.client.get(self.detail_url)
+
+        # Escritura sin señales (otro worker, update()): solo cambian los validadores en la base
+        Employee.objects.filter(pk=self.employee.pk).update(position='Gerente', updated_at=now())
+        bump_version(TableVersion, Employee._meta.db_table)
+
+        list_response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first_list['ETag'])
+        detail_response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first_detail['ETag'])
+
+        self.assertEqual(list_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list_response.data['results'][0]['position'], 'Gerente')
+        self.assertEqual(detail_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(detail_response.data['position'], 'Gerente')
+        # El ETag nuevo revalida esa misma representación
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_response['ETag']).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_employee_is_not_revalidated(self):
+        first = self.client.get(self.detail_url)
+        self.employee.delete()
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EmployeeChangesTests(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('employee-changes')
+        self.ana = Employee.objects.create(first_name='Ana', email='ana@example.com')
+        self.luis = Employee.objects.create(first_name='Luis', email='luis@example.com')
+
+    def _sync(self, since=0, **params):
+        response = self.client.get(self.url, dict(params, since=since))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_since_zero_returns_every_employee(self):
+        changes = self._sync()
+
+        self.assertEqual([(c['op'], c['id']) for c in changes['results']],
+                         [('upsert', self.ana.pk), ('upsert', self.luis.pk)])
+        self.assertEqual(changes['results'][0]['data']['first_name'], 'Ana')
+        self.assertFalse(changes['has_more'])
+
+    def test_only_changes_after_the_token_with_tombstones(self):
+        since = self._sync()['next_since']
+        self.ana.position = 'Gerente'
+        self.ana.save()
+        self.client.delete(reverse('employee-detail', kwargs={'pk': self.luis.pk}))
+
+        with self.assertNumQueries(2):
+            changes = self._sync(since)
+
+        self.assertEqual([(c['op'], c['id']) for c in changes['results']],
+                         [('upsert', self.ana.pk), ('delete', self.luis.pk)])
+        self.assertEqual(changes['results'][0]['data']['position'], 'Gerente')
+        self.assertIsNone(changes['results'][1]['data'])
+        self.assertGreater(changes['next_since'], since)
+        self.assertEqual(self._sync(changes['next_since'])['results'], [])
+
+    def test_repeated_changes_collapse_to_the_latest(self):
+        since = self._sync()['next_since']
+        for position in ('Gerente', 'Director'):
+            self.ana.position = position
+            self.ana.save()
+
+        results = self._sync(since)['results']
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['data']['position'], 'Director')
+
+    def test_pages_follow_next_since(self):
+        Employee.objects.create(email='eva@example.com')
+
+        first = self._sync(page_size=2)
+        second = self._sync(first['next_since'], page_size=2)
+
+        self.assertTrue(first['has_more'])
+        self.assertFalse(second['has_more'])
+        self.assertEqual(len(first['results']) + len(second['results']), 3)
+
+    def test_bulk_upsert_is_recorded(self):
+        since = self._sync()['next_since']
+
+        self.client.post(reverse('employee-bulk'), [
+            {'first_name': 'Ana', 'last_name': 'Mora', 'email': 'ana@example.com', 'position': 'Gerente',
+             'salary': '1000.00', 'hire_date': '2020-01-01'},
+            {'first_name': 'Eva', 'last_name': 'Ruiz', 'email': 'eva@example.com', 'position': 'Analista',
+             'salary': '1000.00', 'hire_date': '2020-01-01'},
+        ], format='json')
+
+        results = self._sync(since)['results']
+        self.assertEqual({c['data']['email'] for c in results}, {'ana@example.com', 'eva@example.com'})
+
+    def test_failed_log_write_rolls_back_the_employee_write(self):
+        payload = {'first_name': 'Ana María', 'last_name': 'Mora', 'email': 'ana@example.com',
+                   'position': 'Gerente', 'salary': '1000.00', 'hire_date': '2020-01-01'}
+
+        with mock.patch('employees.signals.record_changes', side_effect=RuntimeError('log no disponible')):
+            with self.assertRaises(RuntimeError):
+                self.client.put(reverse('employee-detail', kwargs={'pk': self.ana.pk}), payload, format='json')
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('employee-list'), dict(payload, email='eva@example.com'), format='json')
+
+        self.ana.refresh_from_db()
+        self.assertEqual(self.ana.first_name, 'Ana')
+        self.assertFalse(Employee.objects.filter(email='eva@example.com').exists())
+
+    def test_invalid_token(self):
+        response = self.client.get(self.url, {'since': -1})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class SwaggerPDFTestMixin:
+    """Schema temporal en disco y conversión a PDF simulada, sin tests propios."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.schema_file = os.path.join(self.tmp_dir, 'schema.yml')
+        self._write_schema('v1')
+        overrides = override_settings(
+            API_DOCS_SCHEMA_FILE=self.schema_file,
+            API_DOCS_PDF_CACHE_DIR=os.path.join(self.tmp_dir, 'cache'),
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        patcher = mock.patch('employees.pdf_cache.convert_swagger_to_pdf', return_value=b'%PDF-1.4 fake')
+        self.convert = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse('api-docs-pdf')
+
+    def _write_schema(self, version):
+        with open(self.schema_file, 'w') as f:
+            f.write(f'openapi: 3.0.3\ninfo:\n  version: {version}\n')
+
+    def _download(self, **headers):
+        response = self.client.get(self.url, **headers)
+        if hasattr(response, 'streaming_content'):
+            response.content_bytes = b''.join(response.streaming_content)
+            response.close()
+        return response
+
+
+class SwaggerPDFViewTests(SwaggerPDFTestMixin, APITestCase):
+
+    def test_pdf_is_rendered_once_per_schema_version(self):
+        first = self._download()
+        second = self._download()
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content_bytes, b'%PDF-1.4 fake')
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(self.convert.call_count, 1)
+
+    def test_matching_etag_returns_304(self):
+        etag = self._download()['ETag']
+
+        response = self._download(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.convert.call_count, 1)
+
+    def test_unchanged_since_last_modified_returns_304(self):
+        last_modified = self._download()['Last-Modified']
+
+        response = self._download(HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_pdf_removed_after_the_cache_check_is_a_miss(self):
+        last_modified = self._download()['Last-Modified']
+
+        with mock.patch('employees.views.os.path.getmtime', side_effect=FileNotFoundError):
+            response = self._download(HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content_bytes, b'%PDF-1.4 fake')
+
+    def test_schema_change_invalidates_the_pdf(self):
+        etag = self._download()['ETag']
+        self._write_schema('v2')
+
+        response = self._download(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.convert.call_count, 2)
+
+    def test_concurrent_requests_render_a_version_once(self):
+        cache = PDFCache(os.path.join(self.tmp_dir, 'cache'))
+        def slow_render():
+            threading.Event().wait(0.2)
+            return b'%PDF'
+
+        render = mock.Mock(side_effect=slow_render)
+        threads = [threading.Thread(target=cache.get_or_render, args=('abc', render)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(render.call_count, 1)
+        self.assertTrue(os.path.exists(cache.path_for('abc')))
+
+    def test_lock_held_longer_than_its_timeout_is_not_stale(self):
+        cache = PDFCache(os.path.join(self.tmp_dir, 'cache'), lock_timeout=0.4)
+        outcome = []
+
+        def acquire():
+            try:
+                with cache._file_lock('abc'):
+                    outcome.append('acquired')
+            except TimeoutError:
+                outcome.append('timeout')
+
+        # Un render más largo que el timeout: sin renovar el mtime el otro lo daría por abandonado
+        with cache._file_lock('abc'):
+            waiter = threading.Thread(target=acquire)
+            waiter.start()
+            waiter.join()
+
+        self.assertEqual(outcome, ['timeout'])
+
+    def test_requests_share_one_cache_per_directory(self):
+        cache = get_pdf_cache()
+
+        self.assertIs(get_pdf_cache(), cache)
+        self.assertIs(cache._thread_lock('abc'), get_pdf_cache()._thread_lock('abc'))
+        with override_settings(API_DOCS_PDF_CACHE_DIR=os.path.join(self.tmp_dir, 'other')):
+            self.assertIsNot(get_pdf_cache(), cache)
+
+
+class InProcessSchemaTests(APITestCase):
+    """PDF generado a partir del schema de drf-spectacular, sin schema.yml en disco."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        overrides = override_settings(
+            API_DOCS_SCHEMA_FILE=None,
+            API_DOCS_PDF_CACHE_DIR=os.path.join(self.tmp_dir, 'cache'),
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        patcher = mock.patch('employees.pdf_cache.convert_swagger_to_pdf', return_value=b'%PDF-1.4 fake')
+        self.convert = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_spec_is_generated_once_per_process(self):
+        get_api_spec.cache_clear()
+        get_api_spec_digest.cache_clear()
+        self.addCleanup(get_api_spec.cache_clear)
+        self.addCleanup(get_api_spec_digest.cache_clear)
+
+        with mock.patch('employees.api_schema.SchemaGenerator') as generator:
+            generator.return_value.get_schema.return_value = {'openapi': '3.0.3', 'paths': {}}
+            first = get_api_spec_digest()
+            second = get_api_spec_digest()
+            get_api_spec()
+
+        self.assertEqual(first, second)
+        self.assertEqual(generator.return_value.get_schema.call_count, 1)
+
+    def test_pdf_is_rendered_from_the_in_memory_spec(self):
+        response = self.client.get(reverse('api-docs-pdf'))
+        b''.join(response.streaming_content)
+        response.close()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], f'"{get_api_spec_digest()}"')
+        spec = self.convert.call_args.kwargs['spec']
+        self.assertIn('/api/employees/', spec['paths'])
+
+    def test_converter_accepts_a_spec_dict(self):
+        converter = SwaggerToPDFConverter(spec=get_api_spec())
+
+        self.assertTrue(converter.load_swagger_spec())
+        self.assertIn('/api/employees/', converter.generate_html_content())
+
+
+class SwaggerToPDFConverterTests(SimpleTestCase):
+
+    spec = {
+        'info': {'title': 'API de prueba'},
+        'paths': {
+            '/api/employees/': {
+                'get': {'description': 'Lista', 'responses': {'200': {'description': 'OK'}}},
+                'parameters': [],
+            },
+        },
+        'components': {'schemas': {'Employee': {'description': 'Empleado'}}},
+    }
+
+    def test_streamed_html_matches_joined_document(self):
+        converter = SwaggerToPDFConverter(spec=self.spec)
+        output = io.StringIO()
+
+        self.assertTrue(converter.write_html(output))
+
+        html = converter.generate_html_content()
+        self.assertEqual(output.getvalue(), html)
+        self.assertIn('/api/employees/', html)
+        self.assertIn('<h3>Employee</h3>', html)
+        self.assertNotIn('PARAMETERS', html)
+
+    def test_pdf_is_written_to_a_file_object(self):
+        output = io.BytesIO()
+
+        pdf_data = convert_swagger_to_pdf(output_file=output, spec=self.spec)
+
+        self.assertTrue(pdf_data.startswith(b'%PDF'))
+        self.assertEqual(output.getvalue(), pdf_data)
+
+    def test_html_reaches_xhtml2pdf_as_a_stream(self):
+        sources = []
+        create_pdf = pisa.CreatePDF
+
+        def capture(src, **kwargs):
+            sources.append(src.read())
+            src.seek(0)
+            return create_pdf(src, **kwargs)
+
+        with mock.patch('employees.swagger_to_pdf.pisa.CreatePDF', side_effect=capture):
+            SwaggerToPDFConverter(spec=self.spec).convert_to_pdf()
+
+        self.assertEqual(sources, [SwaggerToPDFConverter(spec=self.spec).generate_html_content()])
+
+
+class SwaggerPDFJobTests(SwaggerPDFTestMixin, APITestCase):
+    """Generación del PDF en Celery, ejecutada en modo eager (sin broker)."""
+
+    def setUp(self):
+        super().setUp()
+        # Celery lee la configuración de Django con el prefijo CELERY_
+        eager = {'CELERY_TASK_ALWAYS_EAGER': True, 'CELERY_TASK_STORE_EAGER_RESULT': True}
+        previous = {key: celery_app.conf.get(key) for key in eager}
+        celery_app.conf.update(eager)
+        self.addCleanup(celery_app.conf.update, previous)
+
+    def test_enqueue_poll_and_download(self):
+        enqueued = self.client.post(reverse('api-docs-pdf-job'))
+        self.assertEqual(enqueued.status_code, status.HTTP_202_ACCEPTED)
+
+        job = self.client.get(enqueued.data['status_url'])
+        self.assertEqual(job.data['status'], 'SUCCESS')
+
+        download = self._download_url(job.data['download_url'])
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        self.assertEqual(download.content_bytes, b'%PDF-1.4 fake')
+        self.assertEqual(self.convert.call_count, 1)
+
+    def test_failed_render_is_reported(self):
+        self.convert.return_value = None
+
+        enqueued = self.client.post(reverse('api-docs-pdf-job'))
+        job = self.client.get(enqueued.data['status_url'])
+
+        self.assertEqual(job.data['status'], 'FAILURE')
+        self.assertIn('error', job.data)
+
+    def test_unknown_task_is_not_downloadable(self):
+        url = reverse('api-docs-pdf-job-download', kwargs={'task_id': 'desconocida'})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_409_CONFLICT)
+
+    def _download_url(self, url):
+        response = self.client.get(url)
+        response.content_bytes = b''.join(response.streaming_content)
+        response.close()
+        return response
+
+
+class FakeChannel:
+    def __init__(self):
+        self.published = []
+        self.acked = []
+        self.nacked = []
+
+    def basic_publish(self, exchange, routing_key, body, properties=None):
+        self.published.append((routing_key, json.loads(body), properties))
+
+    def basic_ack(self, delivery_tag, multiple=False):
+        self.acked.append((delivery_tag, multiple))
+
+    def basic_nack(self, delivery_tag, multiple=False, requeue=True):
+        self.nacked.append(delivery_tag)
+
+    def stop_consuming(self):
+        self.stopped = True
+
+
+class EmployeeValidatorTests(APITestCase):
+
+    def setUp(self):
+        from .rabbitmq_consumer import SimpleEmployeeValidator
+
+        self.employee = Employee.objects.create(email='ana@example.com')
+        self.channel = FakeChannel()
+        self.validator = SimpleEmployeeValidator(legacy_response_queue=False)
+        self.validator.channel = self.channel
+        self.properties = SimpleNamespace(reply_to='amq.gen-abc', correlation_id='corr-1')
+
+    def _deliver(self, body, delivery_tag=1):
+        method = SimpleNamespace(delivery_tag=delivery_tag)
+        self.validator.validate_callback(self.channel, method, self.properties, body)
+
+    def test_replies_on_reply_to_with_correlation_id(self):
+        self._deliver(json.dumps({'employee_id': self.employee.id}))
+
+        routing_key, response, properties = self.channel.published[0]
+        self.assertEqual(routing_key, 'amq.gen-abc')
+        self.assertEqual(properties.correlation_id, 'corr-1')
+        self.assertTrue(response['valid'])
+        self.assertEqual(self.channel.acked, [(1, False)])
+
+    def test_legacy_mode_replies_on_shared_queue(self):
+        self.validator.legacy_response_queue = True
+        self._deliver(json.dumps({'employee_id': 999}))
+
+        routing_key, response, _ = self.channel.published[0]
+        self.assertEqual(routing_key, 'validate_employee_response')
+        self.assertFalse(response['valid'])
+
+    def test_many_ids_are_validated_with_one_query(self):
+        with self.assertNumQueries(1):
+            self._deliver(json.dumps({'employee_ids': [self.employee.id, 999]}))
+
+        _, response, _ = self.channel.published[0]
+        self.assertEqual(response['valid_ids'], [self.employee.id])
+
+    def test_invalid_json_is_rejected(self):
+        self._deliver('no-json')
+
+        self.assertEqual(self.channel.published, [])
+        self.assertEqual(self.channel.nacked, [1])
+
+
+class ConsumerMetricsTests(APITestCase):
+
+    def setUp(self):
+        from .rabbitmq_consumer import SimpleEmployeeValidator
+
+        self.employee = Employee.objects.create(email='ana@example.com')
+        self.channel = FakeChannel()
+        self.validator = SimpleEmployeeValidator(legacy_response_queue=False)
+        self.validator.channel = self.channel
+
+    def _deliver(self, body, sent_at=None):
+        properties = SimpleNamespace(reply_to='amq.gen-abc', correlation_id='corr-1',
+                                     headers={'sent_at': sent_at} if sent_at else None)
+        self.validator.validate_callback(self.channel, SimpleNamespace(delivery_tag=1), properties, body)
+
+    def _sample(self, name):
+        for line in consumer_metrics.registry.render().splitlines():
+            if line.startswith(name + ' '):
+                return float(line.split()[-1])
+        return 0.0
+
+    def test_messages_acks_nacks_and_lookups_are_counted(self):
+        before = {name: self._sample(name) for name in (
+            'employee_consumer_messages_total{kind="single"}',
+            'employee_consumer_acks_total',
+            'employee_consumer_nacks_total',
+            'employee_consumer_db_lookup_seconds_count',
+            'employee_consumer_queue_lag_seconds_count',
+        )}
+
+        self._deliver(json.dumps({'employee_id': self.employee.id}), sent_at=time.time() - 0.2)
+        self._deliver('no-json')
+
+        delta = {name: self._sample(name) - value for name, value in before.items()}
+        self.assertEqual(delta, {
+            'employee_consumer_messages_total{kind="single"}': 1,
+            'employee_consumer_acks_total': 1,
+            'employee_consumer_nacks_total': 1,
+            'employee_consumer_db_lookup_seconds_count': 1,
+            'employee_consumer_queue_lag_seconds_count': 1,
+        })
+
+    def test_metrics_are_served_in_prometheus_format(self):
+        # Puerto 0: el sistema elige uno libre
+        server = start_metrics_server(consumer_metrics.registry, 0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+            content_type = response.headers['Content-Type']
+
+        self.assertTrue(content_type.startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE employee_consumer_db_lookup_seconds histogram', body)
+        self.assertIn('employee_consumer_db_lookup_seconds_bucket{le="+Inf"}', body)
+
+
+class FakeConnection:
+    is_closed = False
+
+    def __init__(self):
+        self.timers = {}
+
+    def add_callback_threadsafe(self, callback):
+        callback()
+
+    def call_later(self, delay, callback):
+        timer_id = len(self.timers) + 1
+        self.timers[timer_id] = callback
+        return timer_id
+
+    def remove_timeout(self, timer_id):
+        self.timers.pop(timer_id, None)
+
+
+class BatchEmployeeValidatorTests(APITestCase):
+
+    def setUp(self):
+        from .rabbitmq_consumer import SimpleEmployeeValidator
+
+        self.employee = Employee.objects.create(email='ana@example.com')
+        self.channel = FakeChannel()
+        self.validator = SimpleEmployeeValidator(
+            legacy_response_queue=False, batch_size=3, batch_window_ms=10
+        )
+        self.validator.channel = self.channel
+        self.validator.connection = FakeConnection()
+
+    def _deliver(self, employee_id, delivery_tag):
+        method = SimpleNamespace(delivery_tag=delivery_tag)
+        properties = SimpleNamespace(reply_to='amq.gen-abc', correlation_id=f'corr-{delivery_tag}')
+        self.validator.batch_callback(self.channel, method, properties,
+                                      json.dumps({'employee_id': employee_id}))
+
+    def test_full_batch_is_resolved_with_one_query_and_one_ack(self):
+        with self.assertNumQueries(1):
+            self._deliver(self.employee.id, 1)
+            self._deliver(999, 2)
+            self._deliver(self.employee.id, 3)
+
+        self.assertEqual([response['valid'] for _, response, _ in self.channel.published],
+                         [True, False, True])
+        self.assertEqual([props.correlation_id for _, _, props in self.channel.published],
+                         ['corr-1', 'corr-2', 'corr-3'])
+        self.assertEqual(self.channel.acked, [(3, True)])
+        self.assertEqual(self.validator.connection.timers, {})
+
+    def test_partial_batch_is_flushed_by_window_timer(self):
+        self._deliver(self.employee.id, 1)
+        self.assertEqual(self.channel.published, [])
+
+        timer = next(iter(self.validator.connection.timers.values()))
+        timer()
+
+        self.assertEqual(len(self.channel.published), 1)
+        self.assertEqual(self.channel.acked, [(1, True)])
+
+    def test_stop_answers_the_pending_batch_before_leaving(self):
+        self._deliver(self.employee.id, 1)
+
+        self.validator.stop()
+
+        self.assertEqual(len(self.channel.published), 1)
+        self.assertEqual(self.channel.acked, [(1, True)])
+        self.assertTrue(self.channel.stopped)
+
+    def test_reconnect_discards_the_state_of_the_dead_connection(self):
+        class DroppingChannel(FakeChannel):
+            def __init__(self, deliveries, error=None):
+                super().__init__()
+                self.deliveries = deliveries
+                self.error = error
+
+            def basic_qos(self, prefetch_count):
+                pass
+
+            def basic_consume(self, queue, on_message_callback, auto_ack):
+                self.callback = on_message_callback
+
+            def queue_declare(self, queue, durable=True, passive=False):
+                return SimpleNamespace(method=SimpleNamespace(message_count=0))
+
+            def start_consuming(self):
+                for employee_id, delivery_tag in self.deliveries:
+                    self.callback(self, SimpleNamespace(delivery_tag=delivery_tag),
+                                  SimpleNamespace(reply_to='amq.gen-abc', correlation_id=f'corr-{delivery_tag}'),
+                                  json.dumps({'employee_id': employee_id}))
+                if self.error:
+                    raise self.error
+
+        channels = [DroppingChannel([(self.employee.id, 1)], error=ConnectionError('connection lost')),
+                    DroppingChannel([(self.employee.id, 1)])]
+        connections_used = []
+
+        def connect():
+            connection = FakeConnection()
+            connection.close = lambda: None
+            self.validator.connection, self.validator.channel = connection, channels[len(connections_used)]
+            connections_used.append(connection)
+            return True
+
+        self.validator.snapshots_enabled = False
+        self.validator.connect = connect
+
+        # Primera conexión: queda un lote parcial sin responder y se cae
+        self.validator.start_consuming()
+        self.assertEqual(channels[0].acked, [])
+
+        self.validator.start_consuming()
+
+        # Segunda conexión: el lote parcial es solo el nuevo y su timer se arma en la nueva conexión
+        flush_timers = [timer for timer in connections_used[1].timers.values()
+                        if timer == self.validator._on_flush_timer]
+        self.assertEqual(len(flush_timers), 1)
+        flush_timers[0]()
+        self.assertEqual(len(channels[1].published), 1)
+        self.assertEqual(channels[1].acked, [(1, True)])
+
+
+class FakeConsumer:
+    def __init__(self, batch_size=None, batch_window_ms=None, snapshots_enabled=None):
+        self.snapshots_enabled = snapshots_enabled
+        self.started = threading.Event()
+        self.stopped = threading.Event()
+
+    def start_consuming(self):
+        self.started.set()
+        self.stopped.wait(5)
+
+    def stop(self):
+        self.stopped.set()
+
+
+def _sleeping_worker(*args):
+    # Worker de prueba: termina con la señal que le reenvía el runner
+    time.sleep(30)
+
+
+class ConsumerRunnerTests(SimpleTestCase):
+
+    @mock.patch('employees.consumer_runner.connections')
+    def test_worker_runs_and_stops_one_consumer_per_thread(self, db_connections):
+        worker = ConsumerWorker(index=0, threads=3, consumer_class=FakeConsumer)
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        while len(worker.consumers) < 3 or not all(c.started.is_set() for c in worker.consumers):
+            time.sleep(0.01)
+
+        worker.stop()
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([c.snapshots_enabled for c in worker.consumers], [None, False, False])
+        # Una por hilo consumidor y otra del hilo principal
+        self.assertEqual(db_connections.close_all.call_count, 4)
+
+    @mock.patch('employees.consumer_runner._run_worker', _sleeping_worker)
+    def test_runner_forwards_sigterm_to_workers(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+        runner = ConsumerRunner(workers=2, shutdown_timeout=5)
+        handlers = []
+
+        def send_sigterm():
+            # Solo cuando el runner ya arrancó los dos workers
+            while len(runner.processes) < 2:
+                time.sleep(0.01)
+            handlers.append(signal.getsignal(signal.SIGTERM))
+            # Lo que hace el manejador instalado, sin señalar al proceso de los tests
+            runner.stop(signal.SIGTERM)
+        threading.Thread(target=send_sigterm, daemon=True).start()
+
+        started = time.monotonic()
+        runner.run()
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(handlers, [runner.stop])
+        self.assertEqual([p.exitcode for p in runner.processes], [-signal.SIGTERM] * 2)
+
+    @mock.patch('employees.consumer_runner._run_worker', _sleeping_worker)
+    def test_sigterm_during_startup_stops_the_started_workers(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+        runner = ConsumerRunner(workers=3, shutdown_timeout=5)
+        start = multiprocessing.Process.start
+
+        def start_then_sigterm(process):
+            # La señal llega justo después de arrancar el primer worker
+            start(process)
+            signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+
+        started = time.monotonic()
+        with mock.patch.object(multiprocessing.Process, 'start', start_then_sigterm):
+            runner.run()
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual([p.exitcode for p in runner.processes], [-signal.SIGTERM])
@@ -1,7 +1,16 @@
 from django.urls import path
-from .views import EmployeeListView, EmployeeDetailView
+from .views import (
+    EmployeeListView,
+    EmployeeBulkView,
+    EmployeeDetailView,
+    EmployeeChangesView,
+    EmployeeResponseCacheStatsView,
+)
 
 urlpatterns = [
     path('employees/', EmployeeListView.as_view(), name='employee-list'),
+    path('employees/bulk/', EmployeeBulkView.as_view(), name='employee-bulk'),
     path('employees/<int:pk>/', EmployeeDetailView.as_view(), name='employee-detail'),
+    path('employees/changes/', EmployeeChangesView.as_view(), name='employee-changes'),
+    path('employees/cache/stats/', EmployeeResponseCacheStatsView.as_view(), name='employee-cache-stats'),
 ]
\ No newline at end of file
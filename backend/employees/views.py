@@ -1,30 +1,83 @@
 # employees/views.py
 import os
+from collections import defaultdict
 
+from celery.result import AsyncResult
 from django.conf import settings
+from django.db import transaction
 from django.http import FileResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 from rest_framework import status
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 
-from employees.models import Employee
-from employees.serializers import EmployeeSerializer
-from employees.swagger_to_pdf import convert_swagger_to_pdf
+from config.celery import app as celery_app
+from config.changefeed import (
+    CHANGE_FEED_PARAMETERS,
+    ChangeFeedFilterSerializer,
+    change_feed_response,
+    read_changes,
+    record_changes,
+)
+from config.pagination import KEYSET_PAGINATION_PARAMETERS, KeysetPagination, paginated_response
+from config.versioning import (
+    bump_version,
+    get_version,
+    is_conditional,
+    list_etag,
+    not_modified,
+    row_etag,
+    set_validators,
+)
+from employees.events import EMPLOYEE_CREATED, EMPLOYEE_DELETED, publish_employee_event
+from employees.models import ChangeLogEntry, Employee, TableVersion
+from employees.parsers import CSVParser, read_csv_rows
+from employees.pdf_cache import current_schema_digest, get_pdf_cache, render_api_pdf
+from employees.response_cache import employee_response_cache
+from employees.serializers import EmployeeBulkSerializer, EmployeeSerializer
+from employees.tasks import generate_api_pdf
+
+
+class EmployeePagination(KeysetPagination):
+    ordering = ('id',)
 
 
 class EmployeeListView(APIView):
     @extend_schema(
         summary="Listar todos los empleados",
-        description="Obtiene una lista de todos los empleados registrados en el sistema",
-        responses={200: EmployeeSerializer(many=True)}
+        description="Obtiene los empleados registrados en el sistema, paginados por cursor "
+                    "en orden de ID. El campo \"next\" contiene la URL de la página siguiente.",
+        parameters=KEYSET_PAGINATION_PARAMETERS,
+        responses={200: paginated_response(EmployeeSerializer, 'PaginatedEmployeeList')}
     )
     def get(self, request):
-        employees = Employee.objects.all()
+        # La versión se lee antes que los datos: nunca se etiquetan datos viejos con una
+        # versión nueva, y la página cacheada es la de esta misma versión
+        etag, last_modified = self.validators(request)
+        if is_conditional(request):
+            # Revalidación: basta la versión de la tabla, sin leer ni serializar empleados
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+
+        data = employee_response_cache.get_list(etag, lambda: self.build_page(request))
+        return set_validators(Response(data), etag, last_modified)
+
+    def validators(self, request):
+        version, last_modified = get_version(TableVersion, Employee._meta.db_table)
+        return list_etag(Employee._meta.db_table, version, request), last_modified
+
+    def build_page(self, request):
+        paginator = EmployeePagination()
+        employees = paginator.paginate_queryset(Employee.objects.all(), request, view=self)
         serializer = EmployeeSerializer(employees, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data).data
 
     @extend_schema(
         summary="Crear nuevo empleado",
@@ -53,10 +106,122 @@ class EmployeeListView(APIView):
     def post(self, request):
         serializer = EmployeeSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            # El empleado y su entrada en el registro de cambios (post_save) se confirman juntos
+            with transaction.atomic():
+                employee = serializer.save()
+                publish_employee_event(EMPLOYEE_CREATED, employee.pk)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class EmployeeBulkView(APIView):
+    parser_classes = [JSONParser, CSVParser, MultiPartParser]
+
+    # Campos que se pueden sobrescribir cuando el email ya existe; en cada fila
+    # solo los que trae (una celda CSV vacía no devuelve el campo a su default)
+    update_fields = ['first_name', 'last_name', 'phone_number', 'position', 'salary', 'hire_date']
+
+    @extend_schema(
+        summary="Importar empleados en lote",
+        description="Crea o actualiza (upsert por email) empleados a partir de una lista JSON, "
+                    "un cuerpo text/csv o un archivo CSV enviado en el campo 'file'. Los emails "
+                    "repetidos dentro del lote se rechazan. Devuelve el resultado de cada fila.",
+        request=EmployeeSerializer(many=True),
+        responses={
+            200: OpenApiTypes.OBJECT,
+            207: OpenApiTypes.OBJECT,
+            400: OpenApiTypes.OBJECT
+        }
+    )
+    def post(self, request):
+        rows = self.get_rows(request)
+        if not isinstance(rows, list):
+            return Response({"error": "Se esperaba una lista de empleados o un archivo CSV"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        max_rows = settings.BULK_EMPLOYEE_MAX_ROWS
+        if len(rows) > max_rows:
+            return Response({"error": f"Máximo {max_rows} empleados por importación"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        results = [None] * len(rows)
+        accepted = {}
+        supplied = {}
+        for index, row in enumerate(rows):
+            serializer = EmployeeBulkSerializer(data=row)
+            if not serializer.is_valid():
+                results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+                continue
+            email = serializer.validated_data['email']
+            if email in accepted:
+                results[index] = {
+                    'index': index,
+                    'status': 'error',
+                    'errors': {'email': [f"Email repetido en el lote (elemento {accepted[email][0]})"]}
+                }
+                continue
+            accepted[email] = (index, Employee(**serializer.validated_data))
+            supplied[email] = tuple(field for field in self.update_fields if field in serializer.validated_data)
+
+        # Un upsert por cada combinación de columnas presentes en las filas
+        groups = defaultdict(list)
+        for email, (_, employee) in accepted.items():
+            groups[supplied[email]].append(employee)
+
+        with transaction.atomic():
+            # Emails que ya existen, leídos (y bloqueados donde la base lo permite)
+            # en la misma transacción que el upsert: un borrado concurrente no
+            # puede colarse entre la lectura y la escritura
+            existing = dict(
+                Employee.objects.select_for_update().filter(email__in=list(accepted)).values_list('email', 'id')
+            )
+            for fields, employees in groups.items():
+                Employee.objects.bulk_create(
+                    employees,
+                    batch_size=500,
+                    update_conflicts=True,
+                    unique_fields=['email'],
+                    update_fields=[*fields, 'updated_at']
+                )
+            # Creado o actualizado según el id que quedó tras el upsert: una fila
+            # nueva (o reinsertada) tiene un id distinto del leído antes
+            upserted = dict(Employee.objects.filter(email__in=list(accepted)).values_list('email', 'id'))
+            created = {email: employee_id for email, employee_id in upserted.items()
+                       if existing.get(email) != employee_id}
+            updated = {email: employee_id for email, employee_id in upserted.items() if email not in created}
+            for employee_id in created.values():
+                publish_employee_event(EMPLOYEE_CREATED, employee_id)
+            # bulk_create no emite post_save: el registro de cambios y la versión se avanzan aquí
+            if accepted:
+                record_changes(ChangeLogEntry, Employee._meta.db_table, list(upserted.values()))
+                bump_version(TableVersion, Employee._meta.db_table)
+
+        for email, (index, _) in accepted.items():
+            if email in created:
+                results[index] = {'index': index, 'status': 'created', 'id': created[email], 'email': email}
+            else:
+                results[index] = {'index': index, 'status': 'updated', 'id': updated[email], 'email': email}
+
+        failed = len(rows) - len(accepted)
+        if not failed:
+            response_status = status.HTTP_200_OK
+        elif accepted:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response({
+            'created': len(created),
+            'updated': len(accepted) - len(created),
+            'failed': failed,
+            'results': results,
+        }, status=response_status)
+
+    def get_rows(self, request):
+        upload = request.FILES.get('file')
+        if upload is not None:
+            return read_csv_rows(upload)
+        return request.data
+
+
 class EmployeeDetailView(APIView):
     @extend_schema(
         summary="Obtener empleado específico",
@@ -75,13 +240,27 @@ class EmployeeDetailView(APIView):
         }
     )
     def get(self, request, pk):
-        try:
-            employee = Employee.objects.get(pk=pk)
-            serializer = EmployeeSerializer(employee)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Employee.DoesNotExist:
+        # Solo se lee updated_at: basta para revalidar y para elegir la entrada de caché
+        updated_at = Employee.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
             return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
 
+        etag = row_etag(Employee._meta.db_table, pk, updated_at)
+        if is_conditional(request):
+            response = not_modified(request, etag, updated_at)
+            if response is not None:
+                return response
+
+        data = employee_response_cache.get_detail(pk, etag, lambda: self.build_detail(pk))
+        if data is None:
+            # Se borró entre las dos lecturas
+            return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
+        return set_validators(Response(data, status=status.HTTP_200_OK), etag, updated_at)
+
+    def build_detail(self, pk):
+        employee = Employee.objects.filter(pk=pk).first()
+        return EmployeeSerializer(employee).data if employee is not None else None
+
     @extend_schema(
         summary="Actualizar empleado",
         description="Actualiza los datos de un empleado existente",
@@ -97,7 +276,8 @@ class EmployeeDetailView(APIView):
             employee = Employee.objects.get(pk=pk)
             serializer = EmployeeSerializer(employee, data=request.data)
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    serializer.save()
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Employee.DoesNotExist:
@@ -123,34 +303,163 @@ class EmployeeDetailView(APIView):
         try:
             employee = Employee.objects.get(pk=pk)
             employee.delete()
+            publish_employee_event(EMPLOYEE_DELETED, pk)
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Employee.DoesNotExist:
             return Response({"error": "Employee not found"}, status=status.HTTP_404_NOT_FOUND)
 
 
+class EmployeeChangesView(APIView):
+
+    @extend_schema(
+        summary="Cambios de empleados desde un token",
+        description="Altas, modificaciones y bajas (tombstones) posteriores al token `since`, en orden. "
+                    "El cliente guarda `next_since` y repite la llamada mientras `has_more` sea true; "
+                    "con since=0 recibe todos los empleados.",
+        parameters=CHANGE_FEED_PARAMETERS,
+        responses={
+            200: change_feed_response(EmployeeSerializer, 'EmployeeChanges'),
+            400: OpenApiTypes.OBJECT
+        }
+    )
+    def get(self, request):
+        filters = ChangeFeedFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = read_changes(ChangeLogEntry, Employee.objects.all(), EmployeeSerializer,
+                               **filters.validated_data)
+        return Response(changes, status=status.HTTP_200_OK)
+
+
+class EmployeeResponseCacheStatsView(APIView):
+
+    @extend_schema(
+        summary="Estadísticas de la caché de empleados",
+        description="Aciertos, fallos, ratio de aciertos e invalidaciones de la caché de respuestas "
+                    "del listado y detalle de empleados en este proceso.",
+        responses={200: OpenApiTypes.OBJECT}
+    )
+    def get(self, request):
+        return Response(employee_response_cache.stats(), status=status.HTTP_200_OK)
+
+
+def api_pdf_response(path, digest):
+    pdf_file = open(path, 'rb')
+    response = FileResponse(pdf_file, content_type='application/pdf')
+    response['Content-Disposition'] = 'attachment; filename="api_documentation.pdf"'
+    response['ETag'] = f'"{digest}"'
+    # Del archivo ya abierto: aunque otra versión lo borre, la fecha es la de lo que se sirve
+    response['Last-Modified'] = http_date(os.fstat(pdf_file.fileno()).st_mtime)
+    return response
+
+
 class SwaggerPDFView(APIView):
     """
     Vista para generar y descargar documentación PDF de la API
     """
 
     def get(self, request):
-        # Ruta al archivo Swagger generado por drf-spectacular
-        swagger_file = os.path.join(settings.BASE_DIR, 'schema.yml')
-        output_file = os.path.join(settings.MEDIA_ROOT, 'api_documentation.pdf')
+        try:
+            digest = current_schema_digest()
+        except OSError as e:
+            print(f"❌ Error leyendo el schema: {e}")
+            return Response(
+                {"error": "Error generando documentación PDF"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
 
-        # Generar PDF
-        success = convert_swagger_to_pdf(swagger_file, output_file)
+        # El PDF solo cambia cuando cambia el schema: su hash es el ETag
+        cached_path = get_pdf_cache().get(digest)
+        try:
+            last_modified = int(os.path.getmtime(cached_path)) if cached_path else None
+        except OSError:
+            # Se borró tras comprobarlo (p. ej. al cambiar el schema): como si no estuviera en caché
+            last_modified = None
+
+        not_modified = get_conditional_response(request, etag=f'"{digest}"', last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        # Generar PDF (solo si esta versión del schema no está en caché)
+        output_file = render_api_pdf(digest)
 
-        if success:
+        if output_file:
             # Servir el archivo PDF
-            response = FileResponse(
-                open(output_file, 'rb'),
-                content_type='application/pdf'
-            )
-            response['Content-Disposition'] = 'attachment; filename="api_documentation.pdf"'
-            return response
+            return api_pdf_response(output_file, digest)
         else:
             return Response(
                 {"error": "Error generando documentación PDF"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+class SwaggerPDFJobView(APIView):
+    """
+    Encola la generación del PDF en Celery para no ocupar un worker web
+    """
+
+    @extend_schema(
+        summary="Encolar generación del PDF de la API",
+        description="Lanza una tarea Celery que genera (o reutiliza de la caché) el PDF de la "
+                    "documentación. Devuelve el ID de la tarea y la URL para consultar su estado.",
+        request=None,
+        responses={202: OpenApiTypes.OBJECT}
+    )
+    def post(self, request):
+        task = generate_api_pdf.delay()
+        return Response({
+            'task_id': task.id,
+            'status': task.status,
+            'status_url': request.build_absolute_uri(
+                reverse('api-docs-pdf-job-status', kwargs={'task_id': task.id})
+            ),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class SwaggerPDFJobStatusView(APIView):
+
+    @extend_schema(
+        summary="Estado de la generación del PDF",
+        description="Estado de la tarea (PENDING, STARTED, SUCCESS, FAILURE) y, cuando termina, "
+                    "la URL de descarga.",
+        responses={200: OpenApiTypes.OBJECT}
+    )
+    def get(self, request, task_id):
+        result = AsyncResult(task_id, app=celery_app)
+        data = {'task_id': task_id, 'status': result.status}
+
+        if result.successful():
+            data['download_url'] = request.build_absolute_uri(
+                reverse('api-docs-pdf-job-download', kwargs={'task_id': task_id})
+            )
+        elif result.failed():
+            data['error'] = str(result.result)
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class SwaggerPDFJobDownloadView(APIView):
+
+    @extend_schema(
+        summary="Descargar el PDF generado por una tarea",
+        responses={
+            200: OpenApiTypes.BINARY,
+            404: OpenApiTypes.OBJECT,
+            409: OpenApiTypes.OBJECT
+        }
+    )
+    def get(self, request, task_id):
+        result = AsyncResult(task_id, app=celery_app)
+        if not result.successful():
+            return Response(
+                {"error": "El PDF todavía no está listo", "status": result.status},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        digest = result.result['digest']
+        path = get_pdf_cache().get(digest)
+        if path is None:
+            # La versión fue reemplazada por un schema más nuevo
+            return Response({"error": "El PDF ya no está disponible"}, status=status.HTTP_404_NOT_FOUND)
+        return api_pdf_response(path, digest)
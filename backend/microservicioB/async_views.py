@@ -0,0 +1,80 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+
+from config.versioning import aget_version, list_etag, not_modified, set_validators
+from microservicioB.models import AttendanceRecord, TableVersion
+from microservicioB.serializer import AttendanceSerializer
+from microservicioB.validation import avalidate_employee
+from microservicioB.views import AttendancePagination
+
+# Vistas asíncronas para despliegues ASGI (uvicorn/daphne sobre config.asgi).
+# DRF no soporta vistas async, así que son vistas de Django con los mismos
+# serializers y el mismo formato de respuesta que AttendanceView y
+# AttendanceListView. La validación RPC espera en un future del event loop,
+# por lo que un solo proceso atiende miles de validaciones en vuelo sin
+# bloquear un hilo por petición.
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAttendanceView(View):
+
+    async def post(self, request):
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": "JSON inválido"}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({"error": "Se esperaba un objeto JSON"}, status=400)
+
+        if not await self.validate_employee(data.get('employee_id')):
+            return JsonResponse({"error": "Empleado no válido o no existe"}, status=400)
+
+        serializer = AttendanceSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        # Registro y resumen diario en una transacción (el ORM asíncrono no las tiene)
+        record = await sync_to_async(serializer.save)()
+        return JsonResponse(AttendanceSerializer(record).data, status=201)
+
+    async def validate_employee(self, employee_id):
+
+        try:
+            return await avalidate_employee(employee_id)
+
+        except TimeoutError:
+            print("⏰ Timeout en validación RabbitMQ")
+            return False
+
+        except Exception as e:
+            print(f"❌ Error en validación RabbitMQ: {e}")
+            return False
+
+
+class AsyncAttendanceListView(View):
+
+    async def get(self, request):
+        version, last_modified = await aget_version(TableVersion, AttendanceRecord._meta.db_table)
+        etag = list_etag(AttendanceRecord._meta.db_table, version, request)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        paginator = AttendancePagination()
+        try:
+            records = await paginator.apaginate_queryset(AttendanceRecord.objects.all(), Request(request))
+        except NotFound as e:
+            return JsonResponse({"detail": str(e.detail)}, status=404)
+
+        serializer = AttendanceSerializer(records, many=True)
+        return set_validators(JsonResponse({
+            'next': paginator.get_next_link(),
+            'results': serializer.data,
+        }), etag, last_modified)
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class EmployeeIdCache:
+    """
+    Caché local de existencia de empleados con TTL, límite LRU y caché negativa.
+
+    Las entradas positivas viven `ttl` segundos y las negativas `negative_ttl`
+    (más corto: un empleado recién creado no debe quedar rechazado mucho tiempo).
+    Los eventos de alta/baja del microservicio A invalidan la entrada afectada.
+    """
+
+    def __init__(self, max_size=10000, ttl=300, negative_ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Se incrementa con cada invalidación: un resultado RPC obtenido antes de
+        # un evento de alta/baja no debe volver a la caché
+        self.epoch = 0
+
+    def get(self, employee_id):
+        """Devuelve True/False si hay una entrada vigente, None si no la hay."""
+        with self._lock:
+            entry = self._entries.get(employee_id)
+            if entry is not None:
+                valid, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(employee_id)
+                    self.hits += 1
+                    return valid
+                del self._entries[employee_id]
+            self.misses += 1
+            return None
+
+    def set(self, employee_id, valid, epoch=None):
+        ttl = self.ttl if valid else self.negative_ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return
+            self._entries[employee_id] = (valid, time.monotonic() + ttl)
+            self._entries.move_to_end(employee_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, employee_id):
+        with self._lock:
+            self.epoch += 1
+            if self._entries.pop(employee_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.epoch += 1
+            self._entries.clear()
+
+    def handle_event(self, event):
+        """Aplica un evento {'event': 'created'|'deleted', 'employee_id': id}."""
+        employee_id = event.get('employee_id')
+        if employee_id is not None:
+            self.invalidate(int(employee_id))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+def _build_cache():
+    config = getattr(settings, 'EMPLOYEE_ID_CACHE', {})
+    return EmployeeIdCache(
+        max_size=config.get('MAX_SIZE', 10000),
+        ttl=config.get('TTL', 300),
+        negative_ttl=config.get('NEGATIVE_TTL', 30),
+    )
+
+
+employee_cache = _build_cache()
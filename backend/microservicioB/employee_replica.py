@@ -0,0 +1,129 @@
+import base64
+import threading
+import zlib
+from collections import deque
+
+from config.transport import SNAPSHOT_ENCODING
+
+
+class EmployeeIdReplica:
+    """
+    Réplica en memoria del conjunto de IDs de empleados del microservicio A.
+
+    Se carga con snapshots (bitmap comprimido) y se mantiene al día con los
+    deltas de alta/baja que ya se publican en employee_events. Cada publicador
+    numera sus deltas (source, seq); un hueco en la secuencia, una reconexión o
+    un snapshot pendiente dejan la réplica "no lista" y la validación vuelve a
+    la caché/RPC hasta que llega un snapshot nuevo.
+
+    Como snapshots y deltas viajan por colas distintas, cada snapshot indica la
+    última secuencia que ya incluye de cada publicador (`seqs`); al aplicarlo se
+    reaplican en orden los deltas recientes posteriores a esas secuencias.
+    """
+
+    def __init__(self, recent_deltas=10000):
+        self.request_snapshot = None
+        self._lock = threading.Lock()
+        self._bitmap = bytearray()
+        self._count = 0
+        self._ready = False
+        self._last_seq = {}
+        self._recent = deque(maxlen=recent_deltas)
+        self.snapshots = 0
+        self.deltas = 0
+        self.resyncs = 0
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def contains(self, employee_id):
+        """True/False en O(1) si la réplica está sincronizada; None si no lo está."""
+        if not self._ready:
+            return None
+        index = employee_id >> 3
+        bitmap = self._bitmap
+        if employee_id < 0 or index >= len(bitmap):
+            return False
+        return bool(bitmap[index] & (1 << (employee_id & 7)))
+
+    def apply_snapshot(self, message):
+        if message.get('encoding') != SNAPSHOT_ENCODING:
+            raise ValueError(f"Codificación de snapshot no soportada: {message.get('encoding')}")
+        bitmap = bytearray(zlib.decompress(base64.b64decode(message['bitmap'])))
+
+        with self._lock:
+            self._bitmap = bitmap
+            self._count = message.get('count', 0)
+            seqs = message.get('seqs') or {}
+            for delta in self._recent:
+                source, seq = delta.get('source'), delta.get('seq')
+                # Sin (source, seq) no se puede saber si el snapshot ya lo incluye
+                if source is None or seq is None or seq > seqs.get(source, 0):
+                    self._apply(delta)
+            self._ready = True
+            self.snapshots += 1
+
+    def apply_delta(self, message):
+        """Aplica un evento {'event', 'employee_id', 'source', 'seq'} de employee_events."""
+        resync = False
+        with self._lock:
+            self._recent.append(message)
+            self.deltas += 1
+
+            source, seq = message.get('source'), message.get('seq')
+            if source is not None and seq is not None:
+                last_seq = self._last_seq.get(source)
+                self._last_seq[source] = seq
+                if last_seq is not None and seq != last_seq + 1:
+                    # Se perdieron deltas de este publicador
+                    resync = self._ready
+                    self._ready = False
+
+            self._apply(message)
+
+        if resync:
+            self.resync()
+
+    def reset(self):
+        """La conexión se (re)estableció o se perdió: hace falta un snapshot nuevo."""
+        with self._lock:
+            self._ready = False
+        self.resync()
+
+    def resync(self):
+        self.resyncs += 1
+        if self.request_snapshot is not None:
+            self.request_snapshot()
+
+    def _apply(self, delta):
+        employee_id = delta.get('employee_id')
+        if employee_id is None:
+            return
+        employee_id = int(employee_id)
+        index, mask = employee_id >> 3, 1 << (employee_id & 7)
+
+        if delta.get('event') == 'created':
+            if index >= len(self._bitmap):
+                self._bitmap.extend(bytes(index - len(self._bitmap) + 1))
+            if not self._bitmap[index] & mask:
+                self._bitmap[index] |= mask
+                self._count += 1
+        elif delta.get('event') == 'deleted':
+            if index < len(self._bitmap) and self._bitmap[index] & mask:
+                self._bitmap[index] &= ~mask
+                self._count -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ready': self._ready,
+                'count': self._count,
+                'bitmap_bytes': len(self._bitmap),
+                'snapshots': self.snapshots,
+                'deltas': self.deltas,
+                'resyncs': self.resyncs,
+            }
+
+
+employee_replica = EmployeeIdReplica()
@@ -0,0 +1,51 @@
+import csv
+import json
+
+EXPORT_FIELDS = ('id', 'employee_id', 'date', 'time', 'type', 'created_at')
+
+# Filas por fragmento enviado al cliente: evita una escritura por registro
+ROWS_PER_CHUNK = 500
+# Filas que el cursor de la base de datos trae en cada viaje
+DB_CHUNK_SIZE = 2000
+
+
+class _LineBuffer:
+    """Objeto tipo archivo para csv.writer que devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset):
+    for row in queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=DB_CHUNK_SIZE):
+        yield [value.isoformat() if hasattr(value, 'isoformat') else value for value in row]
+
+
+def _chunked(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def iter_ndjson(queryset):
+    return _chunked(
+        json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + '\n'
+        for row in _rows(queryset)
+    )
+
+
+def iter_csv(queryset):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(EXPORT_FIELDS)
+    yield from _chunked(writer.writerow(row) for row in _rows(queryset))
+
+
+EXPORT_FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+    'csv': (iter_csv, 'text/csv'),
+}
@@ -0,0 +1,65 @@
+import csv
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from microservicioB.worked_hours import compute_worked_hours, daily_rows, totals_by_employee
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Fecha inválida: {value} (use YYYY-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'Calcula las horas trabajadas, horas extra y días sin salida de un rango de fechas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', type=_parse_date, required=True, help='Fecha inicial (inclusive)')
+        parser.add_argument('--end-date', type=_parse_date, required=True, help='Fecha final (inclusive)')
+        parser.add_argument('--employee-id', type=int, help='Calcular solo un empleado')
+        parser.add_argument(
+            '--daily-minutes',
+            type=int,
+            help='Jornada diaria en minutos; por defecto WORKED_HOURS["DAILY_MINUTES"]'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Archivo CSV de resultados (por defecto, salida estándar)'
+        )
+        parser.add_argument(
+            '--by-day',
+            action='store_true',
+            help='Una fila por empleado y día en lugar de totales por empleado'
+        )
+
+    def handle(self, *args, **options):
+        start_date, end_date = options['start_date'], options['end_date']
+        if start_date > end_date:
+            raise CommandError('--start-date no puede ser posterior a --end-date')
+
+        started = time.perf_counter()
+        days = compute_worked_hours(start_date, end_date, options['employee_id'], options['daily_minutes'])
+        rows = daily_rows(days) if options['by_day'] else totals_by_employee(days)
+        elapsed = time.perf_counter() - started
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as f:
+                self._write_csv(f, rows)
+        else:
+            self._write_csv(self.stdout, rows)
+
+        self.stderr.write(
+            self.style.SUCCESS(f'✅ {int(days["punch_count"].sum())} marcaciones, {len(rows)} filas en {elapsed:.2f}s')
+        )
+
+    def _write_csv(self, output, rows):
+        if not rows:
+            return
+        writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('microservicioB', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='attendancerecord',
+            options={'ordering': ['-date', '-time', 'id']},
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('microservicioB', '0002_attendancerecord_keyset_ordering'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['-date', '-time', 'id'], name='attendance_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['employee_id', '-date', '-time', 'id'], name='attendance_emp_date_time_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('microservicioB', '0003_attendancerecord_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employee_id', models.IntegerField()),
+                ('date', models.DateField()),
+                ('first_entry', models.TimeField(blank=True, null=True)),
+                ('last_exit', models.TimeField(blank=True, null=True)),
+                ('punch_count', models.PositiveIntegerField(default=0)),
+                ('worked_minutes', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-date', 'employee_id', 'id'],
+                'indexes': [models.Index(fields=['-date', 'employee_id', 'id'], name='attendance_summary_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyattendancesummary',
+            constraint=models.UniqueConstraint(fields=('employee_id', 'date'), name='attendance_summary_emp_date_uniq'),
+        ),
+    ]
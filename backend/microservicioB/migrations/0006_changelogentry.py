@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+def seed_change_log(apps, schema_editor):
+    # Las filas existentes entran en el log como altas: una sincronización
+    # desde since=0 devuelve la tabla completa
+    model = apps.get_model('microservicioB', 'AttendanceRecord')
+    entry = apps.get_model('microservicioB', 'ChangeLogEntry')
+    database = schema_editor.connection.alias
+    row_ids = model.objects.using(database).order_by('pk').values_list('pk', flat=True)
+    entry.objects.using(database).bulk_create(
+        (entry(table=model._meta.db_table, row_id=row_id) for row_id in row_ids.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('microservicioB', '0005_tableversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('table', models.CharField(max_length=100)),
+                ('row_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['table', 'id'], name='microserviciob_changelog_tid')],
+            },
+        ),
+        migrations.RunPython(seed_change_log, migrations.RunPython.noop),
+    ]
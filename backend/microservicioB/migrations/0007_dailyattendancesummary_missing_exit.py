@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_missing_exit(apps, schema_editor):
+    # La última marcación del día (por hora y, en empates, por id) es una entrada
+    record = apps.get_model('microservicioB', 'AttendanceRecord')
+    summary = apps.get_model('microservicioB', 'DailyAttendanceSummary')
+    database = schema_editor.connection.alias
+    last_type = Subquery(
+        record.objects.using(database)
+        .filter(employee_id=OuterRef('employee_id'), date=OuterRef('date'))
+        .order_by('-time', '-id')
+        .values('type')[:1]
+    )
+    (summary.objects.using(database)
+     .annotate(last_type=last_type)
+     .filter(last_type='entry')
+     .update(missing_exit=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('microservicioB', '0006_changelogentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyattendancesummary',
+            name='missing_exit',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_missing_exit, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,9 @@
 from django.db import models
 from django.utils.timezone import now
 
+from config.changefeed import AbstractChangeLogEntry
+from config.versioning import AbstractTableVersion
+
 class AttendanceRecord(models.Model):
     ATTENDANCE_TYPES = [
         ('entry', 'Entrada'),
@@ -15,8 +18,52 @@ class AttendanceRecord(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['-date', '-time']
+        # 'id' desempata registros con la misma fecha y hora (orden total para keyset)
+        ordering = ['-date', '-time', 'id']
+        # Mismo orden que Meta.ordering para que SQLite recorra el índice sin ordenar
+        indexes = [
+            models.Index(fields=['-date', '-time', 'id'], name='attendance_date_time_idx'),
+            models.Index(fields=['employee_id', '-date', '-time', 'id'], name='attendance_emp_date_time_idx'),
+        ]
+
+
+    def __str__(self):
+        return f"{self.get_type_display()} - Empleado {self.employee_id} - {self.date} {self.time}"
+
+class DailyAttendanceSummary(models.Model):
+    """
+    Resumen de asistencia por empleado y día. Se recalcula en cada escritura de
+    AttendanceRecord (microservicioB/summary.py) para que los reportes lean
+    una fila por empleado y día en lugar de todas las marcaciones.
+    """
+
+    employee_id = models.IntegerField()
+    date = models.DateField()
+    first_entry = models.TimeField(null=True, blank=True)
+    last_exit = models.TimeField(null=True, blank=True)
+    punch_count = models.PositiveIntegerField(default=0)
+    # Suma de los intervalos entrada -> salida del día
+    worked_minutes = models.PositiveIntegerField(default=0)
+    # El día terminó con una entrada sin salida
+    missing_exit = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        ordering = ['-date', 'employee_id', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['employee_id', 'date'], name='attendance_summary_emp_date_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['-date', 'employee_id', 'id'], name='attendance_summary_date_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.get_type_display()} - Empleado {self.employee_id} - {self.date} {self.time}"
\ No newline at end of file
+        return f"Empleado {self.employee_id} - {self.date}: {self.worked_minutes} min"
+
+
+class TableVersion(AbstractTableVersion):
+    """Versión de las tablas del microservicio B (ETag de los listados)."""
+
+
+class ChangeLogEntry(AbstractChangeLogEntry):
+    """Registro de cambios de las asistencias (GET /attendance/changes/?since=)."""
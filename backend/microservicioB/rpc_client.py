@@ -0,0 +1,407 @@
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+import pika
+from django.conf import settings
+
+from config.transport import (
+    AMQP,
+    EMPLOYEE_EVENTS_EXCHANGE,
+    EMPLOYEE_SNAPSHOTS_EXCHANGE,
+    INPROCESS,
+    SNAPSHOT_REQUEST_QUEUE,
+    PendingReply,
+    get_inprocess_broker,
+    get_transport_backend,
+)
+
+from microservicioB.employee_cache import employee_cache
+from microservicioB.employee_replica import employee_replica
+
+REQUEST_QUEUE = 'validate_employee_request'
+
+
+class ValidationClient:
+    """
+    Operaciones de validación comunes a todos los transportes; cada cliente
+    implementa `call` y `acall` (mensaje JSON -> respuesta JSON).
+    """
+
+    backend = None
+
+    def validate(self, employee_id, timeout=None):
+        response = self.call({'employee_id': employee_id}, timeout=timeout)
+        return bool(response and response.get('valid', False))
+
+    def validate_many(self, employee_ids, timeout=None):
+        """Valida varios empleados en un solo viaje; devuelve el conjunto de IDs válidos."""
+        response = self.call({'employee_ids': list(employee_ids)}, timeout=timeout)
+        return self._valid_ids(response)
+
+    async def avalidate(self, employee_id, timeout=None):
+        response = await self.acall({'employee_id': employee_id}, timeout=timeout)
+        return bool(response and response.get('valid', False))
+
+    async def avalidate_many(self, employee_ids, timeout=None):
+        response = await self.acall({'employee_ids': list(employee_ids)}, timeout=timeout)
+        return self._valid_ids(response)
+
+    def _valid_ids(self, response):
+        if not response or 'valid_ids' not in response:
+            raise ConnectionError((response or {}).get('message', 'Respuesta de validación inválida'))
+        return set(response['valid_ids'])
+
+
+class EmployeeValidationClient(ValidationClient):
+    """
+    Cliente RPC AMQP persistente para validar empleados en el microservicio A.
+
+    Mantiene una sola conexión y una sola cola de respuesta exclusiva por proceso.
+    Un hilo de E/S es el único dueño de la conexión (pika no es thread-safe) y las
+    peticiones concurrentes se multiplexan por correlation_id.
+    """
+
+    backend = AMQP
+
+    def __init__(self, host='localhost', port=5672, username='guest', password='guest',
+                 timeout=5, retry_interval=2):
+        self.parameters = pika.ConnectionParameters(
+            host=host,
+            port=port,
+            credentials=pika.PlainCredentials(username, password),
+            heartbeat=60,
+        )
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.pid = os.getpid()
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._connection = None
+        self._channel = None
+        self._callback_queue = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._closing = False
+        self._last_error = None
+        self._subscriptions = []
+
+    # ------------------------------------------------------------------
+    # API pública (cualquier hilo)
+    # ------------------------------------------------------------------
+    def call(self, message, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        self._ensure_running(timeout)
+
+        correlation_id = str(uuid.uuid4())
+        pending = PendingReply()
+        with self._lock:
+            self._pending[correlation_id] = pending
+
+        try:
+            self._submit(correlation_id, message, timeout)
+            if not pending.event.wait(timeout):
+                raise TimeoutError(f"Sin respuesta de validación en {timeout}s")
+            if pending.error is not None:
+                raise pending.error
+            return pending.response
+        finally:
+            with self._lock:
+                self._pending.pop(correlation_id, None)
+
+    # ------------------------------------------------------------------
+    # API asyncio (vistas ASGI): la espera no ocupa un hilo por petición
+    # ------------------------------------------------------------------
+    async def acall(self, message, timeout=None):
+        """
+        Igual que `call`, pero espera la respuesta en un future del loop actual.
+
+        La misma conexión y el mismo hilo de E/S atienden a las peticiones
+        síncronas y asíncronas; el hilo de E/S resuelve el future con
+        call_soon_threadsafe cuando llega la respuesta.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        if self._ready.is_set():
+            self._ensure_running(timeout)
+        else:
+            # Solo la primera petición (o durante una reconexión) espera a la conexión
+            await loop.run_in_executor(None, self._ensure_running, timeout)
+
+        correlation_id = str(uuid.uuid4())
+        pending = PendingReply(loop.create_future())
+        with self._lock:
+            self._pending[correlation_id] = pending
+
+        try:
+            self._submit(correlation_id, message, timeout)
+            try:
+                return await asyncio.wait_for(pending.future, timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Sin respuesta de validación en {timeout}s")
+        finally:
+            with self._lock:
+                self._pending.pop(correlation_id, None)
+
+    def _submit(self, correlation_id, message, timeout):
+        connection = self._connection
+        if connection is None:
+            raise ConnectionError("Conexión con RabbitMQ no disponible")
+        connection.add_callback_threadsafe(
+            functools.partial(self._publish, correlation_id, json.dumps(message), timeout)
+        )
+
+    def subscribe(self, exchange, on_message, on_reset=None):
+        """
+        Suscribe la conexión persistente a un exchange fanout. `on_message` recibe
+        cada mensaje JSON en el hilo de E/S; `on_reset` se invoca al (re)conectar
+        y al perder la conexión, cuando pudieron perderse mensajes.
+        """
+        self._subscriptions.append((exchange, on_message, on_reset))
+
+    def send(self, routing_key, message, expiration=None):
+        """Publica un mensaje sin esperar respuesta; se descarta si no hay conexión."""
+        connection = self._connection
+        if connection is None:
+            return False
+        try:
+            connection.add_callback_threadsafe(
+                functools.partial(self._send, routing_key, json.dumps(message), expiration)
+            )
+        except Exception:
+            return False
+        return True
+
+    def close(self):
+        self._closing = True
+        connection = self._connection
+        if connection is not None and connection.is_open:
+            try:
+                connection.add_callback_threadsafe(lambda: None)
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=self.retry_interval + 1)
+
+    # ------------------------------------------------------------------
+    # Hilo de E/S
+    # ------------------------------------------------------------------
+    def _ensure_running(self, timeout):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._closing = False
+                self._thread = threading.Thread(
+                    target=self._run, name='employee-validation-rpc', daemon=True
+                )
+                self._thread.start()
+
+        if self._ready.is_set():
+            return
+        # Solo se espera mientras la conexión está en curso; si el último intento
+        # falló se responde de inmediato en lugar de bloquear cada petición.
+        if self._last_error is None and self._ready.wait(timeout):
+            return
+        raise ConnectionError(f"RabbitMQ no disponible: {self._last_error}")
+
+    def _run(self):
+        while not self._closing:
+            try:
+                self._connect()
+                self._last_error = None
+                self._ready.set()
+                while not self._closing:
+                    self._connection.process_data_events(time_limit=1)
+            except Exception as e:
+                self._last_error = e
+                print(f"❌ Conexión RPC de validación perdida: {e}")
+            finally:
+                self._ready.clear()
+                self._fail_pending(ConnectionError("Conexión con RabbitMQ perdida"))
+                self._reset_subscriptions()
+                self._disconnect()
+
+            if not self._closing:
+                time.sleep(self.retry_interval)
+
+    def _connect(self):
+        self._connection = pika.BlockingConnection(self.parameters)
+        self._channel = self._connection.channel()
+
+        self._channel.queue_declare(queue=REQUEST_QUEUE, durable=True)
+
+        result = self._channel.queue_declare(queue='', exclusive=True)
+        self._callback_queue = result.method.queue
+        self._channel.basic_consume(
+            queue=self._callback_queue,
+            on_message_callback=self._on_response,
+            auto_ack=True
+        )
+
+        if self._subscriptions:
+            self._channel.queue_declare(queue=SNAPSHOT_REQUEST_QUEUE, durable=True)
+        for exchange, on_message, on_reset in self._subscriptions:
+            self._channel.exchange_declare(exchange=exchange, exchange_type='fanout', durable=True)
+            queue = self._channel.queue_declare(queue='', exclusive=True).method.queue
+            self._channel.queue_bind(queue=queue, exchange=exchange)
+            self._channel.basic_consume(
+                queue=queue,
+                on_message_callback=functools.partial(self._on_event, on_message),
+                auto_ack=True
+            )
+        self._reset_subscriptions()
+
+    def _disconnect(self):
+        connection, self._connection, self._channel = self._connection, None, None
+        if connection is not None and connection.is_open:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def _publish(self, correlation_id, body, timeout):
+        # Mensaje no persistente y con expiración: una petición que nadie atiende
+        # antes del timeout ya no le sirve a ningún cliente.
+        self._channel.basic_publish(
+            exchange='',
+            routing_key=REQUEST_QUEUE,
+            body=body,
+            properties=pika.BasicProperties(
+                reply_to=self._callback_queue,
+                correlation_id=correlation_id,
+                expiration=str(int(timeout * 1000)),
+                # Hora de envío: el consumidor mide con ella la espera en la cola
+                headers={'sent_at': time.time()},
+            )
+        )
+
+    def _send(self, routing_key, body, expiration):
+        if self._channel is None:
+            return
+        self._channel.basic_publish(
+            exchange='',
+            routing_key=routing_key,
+            body=body,
+            properties=pika.BasicProperties(expiration=expiration)
+        )
+
+    def _on_response(self, ch, method, props, body):
+        with self._lock:
+            pending = self._pending.get(props.correlation_id)
+        if pending is None:
+            # Respuesta tardía de una petición que ya expiró
+            return
+        try:
+            pending.resolve(response=json.loads(body))
+        except ValueError as e:
+            pending.resolve(error=e)
+
+    def _on_event(self, on_message, ch, method, props, body):
+        try:
+            on_message(json.loads(body))
+        except Exception as e:
+            print(f"❌ Error procesando evento de {method.exchange}: {e}")
+
+    def _reset_subscriptions(self):
+        for _, _, on_reset in self._subscriptions:
+            if on_reset is not None:
+                on_reset()
+
+    def _fail_pending(self, error):
+        with self._lock:
+            pending_replies = list(self._pending.values())
+        for pending in pending_replies:
+            pending.resolve(error=error)
+
+
+class InProcessValidationClient(ValidationClient):
+    """
+    Cliente de validación sobre el broker en memoria (VALIDATION_TRANSPORT
+    'inprocess'): mismo protocolo JSON y mismas suscripciones que el cliente
+    AMQP, sin RabbitMQ. Pensado para desarrollo, tests y benchmarks.
+    """
+
+    backend = INPROCESS
+
+    def __init__(self, broker, timeout=5):
+        self.broker = broker
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._subscriptions = []
+        self._started = False
+
+    def call(self, message, timeout=None):
+        self._start()
+        return self.broker.request(REQUEST_QUEUE, message, self.timeout if timeout is None else timeout)
+
+    async def acall(self, message, timeout=None):
+        self._start()
+        return await self.broker.arequest(REQUEST_QUEUE, message, self.timeout if timeout is None else timeout)
+
+    def subscribe(self, exchange, on_message, on_reset=None):
+        self._subscriptions.append((exchange, on_message, on_reset))
+        self.broker.subscribe(exchange, on_message)
+
+    def send(self, routing_key, message, expiration=None):
+        return self.broker.send(routing_key, message)
+
+    def close(self):
+        pass
+
+    def _start(self):
+        # Equivale a la primera conexión del cliente AMQP: los suscriptores
+        # (p. ej. la réplica de IDs) piden su estado inicial
+        if self._started:
+            return
+        self._started = True
+        for _, _, on_reset in self._subscriptions:
+            if on_reset is not None:
+                on_reset()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_validation_client():
+    """Devuelve el cliente de validación del proceso actual (se recrea tras un fork)."""
+    global _client
+    backend = get_transport_backend()
+    with _client_lock:
+        if _client is None or _client.pid != os.getpid() or _client.backend != backend:
+            config = settings.RABBITMQ
+            timeout = float(config.get('RPC_TIMEOUT', 5))
+            if backend == INPROCESS:
+                _client = InProcessValidationClient(get_inprocess_broker(), timeout=timeout)
+            else:
+                _client = EmployeeValidationClient(
+                    host=config['HOST'],
+                    port=int(config['PORT']),
+                    username=config['USER'],
+                    password=config['PASSWORD'],
+                    timeout=timeout,
+                )
+            _client.subscribe(
+                EMPLOYEE_EVENTS_EXCHANGE,
+                employee_cache.handle_event,
+                on_reset=employee_cache.clear
+            )
+            if getattr(settings, 'EMPLOYEE_ID_REPLICA', {}).get('ENABLED', True):
+                _subscribe_replica(_client)
+        return _client
+
+
+def _subscribe_replica(client):
+    client.subscribe(EMPLOYEE_EVENTS_EXCHANGE, employee_replica.apply_delta)
+    client.subscribe(
+        EMPLOYEE_SNAPSHOTS_EXCHANGE,
+        employee_replica.apply_snapshot,
+        on_reset=employee_replica.reset
+    )
+    employee_replica.request_snapshot = functools.partial(
+        client.send, SNAPSHOT_REQUEST_QUEUE, {'type': 'snapshot_request'}, expiration='30000'
+    )
@@ -1,5 +1,10 @@
+import re
+from datetime import date
+
+from django.db import router, transaction
 from rest_framework import serializers
-from .models import AttendanceRecord
+from .models import AttendanceRecord, DailyAttendanceSummary
+from .worked_hours import get_config as get_worked_hours_config
 class AttendanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = AttendanceRecord
@@ -8,4 +13,90 @@ class AttendanceSerializer(serializers.ModelSerializer):
     def validate_employee_id(self, value):
         if value <= 0:
             raise serializers.ValidationError("El ID del empleado debe ser positivo")
-        return value
\ No newline at end of file
+        return value
+
+    def create(self, validated_data):
+        # El registro, su resumen diario y su entrada en el registro de cambios
+        # (post_save) se confirman juntos
+        with transaction.atomic(using=router.db_for_write(AttendanceRecord)):
+            return super().create(validated_data)
+
+
+class DailyAttendanceSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailyAttendanceSummary
+        fields = ['id', 'employee_id', 'date', 'first_entry', 'last_exit', 'punch_count', 'worked_minutes',
+                  'missing_exit']
+
+
+class MonthlyAttendanceSummarySerializer(serializers.Serializer):
+    employee_id = serializers.IntegerField()
+    days_worked = serializers.IntegerField()
+    punch_count = serializers.IntegerField()
+    worked_minutes = serializers.IntegerField()
+    first_day = serializers.DateField()
+    last_day = serializers.DateField()
+
+
+class MonthlySummaryFilterSerializer(serializers.Serializer):
+    month = serializers.CharField(help_text='Mes en formato YYYY-MM')
+    employee_id = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_month(self, value):
+        match = re.fullmatch(r'(\d{4})-(\d{2})', value)
+        if not match or not 1 <= int(match.group(2)) <= 12:
+            raise serializers.ValidationError("Formato de mes inválido, use YYYY-MM")
+        return date(int(match.group(1)), int(match.group(2)), 1)
+
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        month = data['month']
+        next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        # Rango en lugar de __year/__month para que la consulta use el índice por fecha
+        queryset = queryset.filter(date__gte=month, date__lt=next_month)
+        if 'employee_id' in data:
+            queryset = queryset.filter(employee_id=data['employee_id'])
+        return queryset
+
+
+class AttendanceExportFilterSerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    employee_id = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        start, end = attrs.get('start_date'), attrs.get('end_date')
+        if start and end and start > end:
+            raise serializers.ValidationError("start_date no puede ser posterior a end_date")
+        return attrs
+
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        if 'start_date' in data:
+            queryset = queryset.filter(date__gte=data['start_date'])
+        if 'end_date' in data:
+            queryset = queryset.filter(date__lte=data['end_date'])
+        if 'employee_id' in data:
+            queryset = queryset.filter(employee_id=data['employee_id'])
+        return queryset
+
+
+class WorkedHoursFilterSerializer(AttendanceExportFilterSerializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        max_days = get_worked_hours_config()['MAX_RANGE_DAYS']
+        if (attrs['end_date'] - attrs['start_date']).days + 1 > max_days:
+            raise serializers.ValidationError(f"El rango no puede superar {max_days} días")
+        return attrs
+
+
+class WorkedHoursSerializer(serializers.Serializer):
+    employee_id = serializers.IntegerField()
+    days_worked = serializers.IntegerField()
+    punch_count = serializers.IntegerField()
+    worked_minutes = serializers.IntegerField()
+    overtime_minutes = serializers.IntegerField()
+    missing_exit_days = serializers.IntegerField()
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from config.changefeed import record_changes
+from config.versioning import bump_version
+from microservicioB.models import AttendanceRecord, ChangeLogEntry, TableVersion
+from microservicioB.summary import refresh_daily_summaries
+
+
+@receiver(pre_save, sender=AttendanceRecord, dispatch_uid='attendance_summary_previous_day')
+def remember_attendance_day(sender, instance, **kwargs):
+    # Una modificación puede mover la marcación de día o de empleado: el resumen
+    # del par anterior también se recalcula
+    if instance.pk is not None:
+        instance._previous_day = (
+            AttendanceRecord.objects.using(kwargs.get('using'))
+            .filter(pk=instance.pk).values_list('employee_id', 'date').first()
+        )
+
+
+# Cualquier save()/delete() de un registro (vistas, admin, shell) recalcula el
+# resumen diario de su empleado y día, queda en el registro de cambios y avanza
+# la versión de la tabla; bulk_create y update() no emiten señales y lo hace
+# quien los llama. Como en employees/signals.py, save() debe correr dentro de
+# transaction.atomic() (AttendanceSerializer.create)
+@receiver(post_save, sender=AttendanceRecord, dispatch_uid='attendance_change_log_save')
+@receiver(post_delete, sender=AttendanceRecord, dispatch_uid='attendance_change_log_delete')
+def record_attendance_change(sender, instance, signal, **kwargs):
+    days = [(instance.employee_id, instance.date)]
+    previous_day = getattr(instance, '_previous_day', None)
+    if previous_day is not None:
+        days.append(previous_day)
+    refresh_daily_summaries(days)
+    record_changes(ChangeLogEntry, AttendanceRecord._meta.db_table, [instance.pk], deleted=signal is post_delete)
+    bump_version(TableVersion, AttendanceRecord._meta.db_table)
@@ -0,0 +1,149 @@
+import operator
+from collections import defaultdict
+from functools import reduce
+from itertools import groupby
+
+from django.db import router, transaction
+from django.db.models import Q
+
+from microservicioB.models import AttendanceRecord, DailyAttendanceSummary
+
+SUMMARY_FIELDS = ('first_entry', 'last_exit', 'punch_count', 'worked_minutes', 'missing_exit', 'updated_at')
+
+# Claves (employee_id, date) recalculadas por consulta; con una fecha distinta
+# por clave son dos parámetros por clave, por debajo del límite de 999 de SQLite
+REFRESH_CHUNK_SIZE = 450
+
+_date_field = AttendanceRecord._meta.get_field('date')
+
+
+def summarize_day(punches):
+    """
+    Resumen de las marcaciones de un empleado en un día, en orden cronológico
+    como tuplas (time, type). Cada entrada abre un intervalo que cierra la
+    siguiente salida; las entradas repetidas con un intervalo abierto y las
+    salidas sin entrada previa no suman minutos. Si el día termina con un
+    intervalo abierto falta la salida.
+    """
+    first_entry = last_exit = opened = None
+    punch_count = 0
+    worked_seconds = 0
+    for punch_time, punch_type in punches:
+        punch_count += 1
+        if punch_type == 'entry':
+            if first_entry is None:
+                first_entry = punch_time
+            if opened is None:
+                opened = punch_time
+        elif punch_type == 'exit':
+            last_exit = punch_time
+            if opened is not None:
+                worked_seconds += _seconds(punch_time) - _seconds(opened)
+                opened = None
+    return {
+        'first_entry': first_entry,
+        'last_exit': last_exit,
+        'punch_count': punch_count,
+        'worked_minutes': worked_seconds // 60,
+        'missing_exit': opened is not None,
+    }
+
+
+def refresh_daily_summaries(keys):
+    """
+    Recalcula los resúmenes de los pares (employee_id, date) afectados por una
+    escritura. Solo se leen las marcaciones de esos días (índice por empleado),
+    así que el coste depende del lote escrito y no del tamaño de la tabla.
+    """
+    keys = sorted({(int(employee_id), _date_field.to_python(day)) for employee_id, day in keys})
+    database = router.db_for_write(DailyAttendanceSummary)
+    with transaction.atomic(using=database):
+        for start in range(0, len(keys), REFRESH_CHUNK_SIZE):
+            _refresh_chunk(keys[start:start + REFRESH_CHUNK_SIZE], database)
+
+
+def rebuild_daily_summaries(start_date=None, end_date=None, employee_id=None, batch_size=2000):
+    """
+    Reconstruye los resúmenes desde las marcaciones (backfill o reparación).
+    Recorre las marcaciones en streaming y escribe por lotes; devuelve el
+    número de resúmenes escritos.
+    """
+    punches = AttendanceRecord.objects.all()
+    summaries = DailyAttendanceSummary.objects.all()
+    if start_date is not None:
+        punches, summaries = punches.filter(date__gte=start_date), summaries.filter(date__gte=start_date)
+    if end_date is not None:
+        punches, summaries = punches.filter(date__lte=end_date), summaries.filter(date__lte=end_date)
+    if employee_id is not None:
+        punches, summaries = punches.filter(employee_id=employee_id), summaries.filter(employee_id=employee_id)
+
+    rows = (
+        punches.order_by('employee_id', 'date', 'time', 'id')
+        .values_list('employee_id', 'date', 'time', 'type')
+        .iterator(chunk_size=batch_size)
+    )
+    database = router.db_for_write(DailyAttendanceSummary)
+    written = 0
+    with transaction.atomic(using=database):
+        summaries.delete()
+        batch = []
+        for (employee, day), day_rows in groupby(rows, key=lambda row: (row[0], row[1])):
+            batch.append(_build_summary(employee, day, [(row[2], row[3]) for row in day_rows]))
+            if len(batch) >= batch_size:
+                written += len(_save(batch, database))
+                batch = []
+        if batch:
+            written += len(_save(batch, database))
+    return written
+
+
+def _punches_for(keys, database):
+    """
+    Marcaciones de exactamente los pares (employee_id, date) indicados: una
+    condición por fecha con sus empleados, en lugar del producto cruzado de
+    todos los empleados por todas las fechas del lote.
+    """
+    employees_by_day = defaultdict(set)
+    for employee, day in keys:
+        employees_by_day[day].add(employee)
+    condition = reduce(operator.or_, (
+        Q(date=day, employee_id__in=employees) for day, employees in employees_by_day.items()
+    ))
+    return AttendanceRecord.objects.using(database).filter(condition)
+
+
+def _refresh_chunk(keys, database):
+    punches = {}
+    rows = (
+        _punches_for(keys, database)
+        .order_by('employee_id', 'date', 'time', 'id')
+        .values_list('employee_id', 'date', 'time', 'type')
+    )
+    for employee, day, punch_time, punch_type in rows:
+        punches.setdefault((employee, day), []).append((punch_time, punch_type))
+
+    summaries = [_build_summary(employee, day, punches[(employee, day)])
+                 for employee, day in keys if (employee, day) in punches]
+    _save(summaries, database)
+
+    # Días que se quedaron sin marcaciones
+    for employee, day in keys:
+        if (employee, day) not in punches:
+            DailyAttendanceSummary.objects.using(database).filter(employee_id=employee, date=day).delete()
+
+
+def _build_summary(employee_id, day, punches):
+    return DailyAttendanceSummary(employee_id=employee_id, date=day, **summarize_day(punches))
+
+
+def _save(summaries, database):
+    return DailyAttendanceSummary.objects.using(database).bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['employee_id', 'date'],
+        update_fields=SUMMARY_FIELDS,
+    )
+
+
+def _seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
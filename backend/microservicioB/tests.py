@@ -1,3 +1,961 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import queue
+import threading
+from datetime import date, time
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from config import transport
+from config.transport import (
+    EMPLOYEE_EVENTS_EXCHANGE, EMPLOYEE_SNAPSHOTS_EXCHANGE, SNAPSHOT_REQUEST_QUEUE, InProcessBroker,
+)
+from employees.events import InProcessEventPublisher
+from employees.models import Employee
+from employees.rabbitmq_consumer import serve_in_process
+from employees.snapshot import EventPositions, build_snapshot
+
+from . import rpc_client
+from .employee_cache import EmployeeIdCache, employee_cache
+from .employee_replica import EmployeeIdReplica, employee_replica
+from .models import AttendanceRecord, DailyAttendanceSummary
+from .rpc_client import REQUEST_QUEUE, EmployeeValidationClient, InProcessValidationClient, PendingReply
+from .serializer import AttendanceSerializer
+from .summary import _punches_for, rebuild_daily_summaries, refresh_daily_summaries, summarize_day
+from .views import AttendancePagination
+from .worked_hours import compute_worked_hours, pair_punches, totals_by_employee
+
+
+class EmployeeValidationClientTests(SimpleTestCase):
+
+    def setUp(self):
+        self.client_rpc = EmployeeValidationClient(timeout=1)
+
+    def _register(self, correlation_id):
+        pending = PendingReply()
+        self.client_rpc._pending[correlation_id] = pending
+        return pending
+
+    def test_responses_are_routed_by_correlation_id(self):
+        first = self._register('a')
+        second = self._register('b')
+
+        self.client_rpc._on_response(None, None, SimpleNamespace(correlation_id='b'),
+                                     json.dumps({'valid': False}))
+        self.client_rpc._on_response(None, None, SimpleNamespace(correlation_id='a'),
+                                     json.dumps({'valid': True}))
+
+        self.assertTrue(first.event.is_set())
+        self.assertEqual(first.response, {'valid': True})
+        self.assertEqual(second.response, {'valid': False})
+
+    def test_late_response_is_ignored(self):
+        self.client_rpc._on_response(None, None, SimpleNamespace(correlation_id='expired'),
+                                     json.dumps({'valid': True}))
+        self.assertEqual(self.client_rpc._pending, {})
+
+    def test_connection_loss_wakes_waiters(self):
+        pending = self._register('a')
+        waiter = threading.Thread(target=pending.event.wait, args=(5,))
+        waiter.start()
+
+        self.client_rpc._fail_pending(ConnectionError('caída'))
+        waiter.join(1)
+
+        self.assertFalse(waiter.is_alive())
+        self.assertIsInstance(pending.error, ConnectionError)
+
+
+    def _serve_from_fake_io_thread(self):
+        """Simula el hilo de E/S: publica y responde cada petición desde otro hilo."""
+        client = self.client_rpc
+        client._thread = mock.Mock(**{'is_alive.return_value': True})
+        client._ready.set()
+        callbacks = queue.Queue()
+        client._connection = SimpleNamespace(add_callback_threadsafe=callbacks.put)
+
+        def reply(correlation_id, body, timeout):
+            employee_id = json.loads(body)['employee_id']
+            client._on_response(None, None, SimpleNamespace(correlation_id=correlation_id),
+                                json.dumps({'valid': employee_id % 2 == 0}))
+        client._publish = reply
+
+        def io_loop():
+            while (callback := callbacks.get()) is not None:
+                callback()
+        io_thread = threading.Thread(target=io_loop, daemon=True)
+        io_thread.start()
+        self.addCleanup(io_thread.join, 1)
+        self.addCleanup(callbacks.put, None)
+
+    def test_concurrent_async_calls_are_resolved_by_the_io_thread(self):
+        self._serve_from_fake_io_thread()
+
+        async def validate_all():
+            return await asyncio.gather(*(self.client_rpc.avalidate(i) for i in range(1, 2001)))
+
+        threads_before = threading.active_count()
+        results = asyncio.run(validate_all())
+
+        self.assertEqual(results, [i % 2 == 0 for i in range(1, 2001)])
+        self.assertEqual(self.client_rpc._pending, {})
+        self.assertLessEqual(threading.active_count(), threads_before)
+
+    def test_async_call_times_out(self):
+        self._serve_from_fake_io_thread()
+        self.client_rpc._publish = lambda *args: None
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(self.client_rpc.avalidate(1, timeout=0.05))
+        self.assertEqual(self.client_rpc._pending, {})
+
+    def test_connection_loss_fails_async_waiters(self):
+        self._serve_from_fake_io_thread()
+        self.client_rpc._publish = lambda *args: self.client_rpc._fail_pending(ConnectionError('caída'))
+
+        with self.assertRaises(ConnectionError):
+            asyncio.run(self.client_rpc.avalidate(1))
+
+
+class InProcessTransportTests(TestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def setUp(self):
+        self.employees = [Employee.objects.create(email=f't{i}@example.com') for i in range(3)]
+        self.broker = InProcessBroker()
+        serve_in_process(self.broker)
+        self.client_rpc = InProcessValidationClient(self.broker, timeout=1)
+
+    def test_validates_with_the_real_validator(self):
+        missing = self.employees[-1].id + 1000
+
+        self.assertTrue(self.client_rpc.validate(self.employees[0].id))
+        self.assertFalse(self.client_rpc.validate(missing))
+        self.assertEqual(self.client_rpc.validate_many([e.id for e in self.employees] + [missing]),
+                         {e.id for e in self.employees})
+
+    def test_thousands_of_validations_without_a_broker(self):
+        ids = [self.employees[i % 3].id if i % 2 else 10 ** 6 + i for i in range(2000)]
+
+        results = [self.client_rpc.validate(employee_id) for employee_id in ids]
+
+        self.assertEqual(results, [i % 2 == 1 for i in range(2000)])
+
+    async def test_async_validation(self):
+        results = await self.client_rpc.avalidate_many([self.employees[0].id, 10 ** 6])
+        self.assertEqual(results, {self.employees[0].id})
+
+    def test_worker_threads_answer_concurrent_requests(self):
+        broker = InProcessBroker(workers=2)
+        self.addCleanup(broker.close)
+        broker.serve(REQUEST_QUEUE, lambda message: {'valid': message['employee_id'] % 2 == 0})
+        client = InProcessValidationClient(broker)
+
+        async def validate_all():
+            return await asyncio.gather(*(client.avalidate(i) for i in range(500)))
+
+        self.assertEqual(asyncio.run(validate_all()), [i % 2 == 0 for i in range(500)])
+        self.assertEqual([client.validate(i) for i in range(10)], [i % 2 == 0 for i in range(10)])
+
+    def test_unserved_queue_raises_connection_error(self):
+        client = InProcessValidationClient(InProcessBroker())
+        with self.assertRaises(ConnectionError):
+            client.validate(1)
+
+    def test_events_and_snapshots_reach_the_replica(self):
+        replica = EmployeeIdReplica()
+        self.client_rpc.subscribe(EMPLOYEE_EVENTS_EXCHANGE, replica.apply_delta)
+        self.client_rpc.subscribe(EMPLOYEE_SNAPSHOTS_EXCHANGE, replica.apply_snapshot, on_reset=replica.reset)
+        replica.request_snapshot = lambda: self.client_rpc.send(SNAPSHOT_REQUEST_QUEUE, {'type': 'snapshot_request'})
+
+        # La primera llamada equivale a conectar: la réplica pide su snapshot
+        self.client_rpc.validate(self.employees[0].id)
+        InProcessEventPublisher(self.broker).publish('created', 5000)
+
+        self.assertTrue(replica.ready)
+        self.assertTrue(all(replica.contains(e.id) for e in self.employees))
+        self.assertTrue(replica.contains(5000))
+
+    def test_in_process_snapshots_carry_the_event_positions(self):
+        snapshots = []
+        self.client_rpc.subscribe(EMPLOYEE_SNAPSHOTS_EXCHANGE, snapshots.append)
+        publisher = InProcessEventPublisher(self.broker)
+        publisher.publish('created', 5000)
+
+        self.client_rpc.send(SNAPSHOT_REQUEST_QUEUE, {'type': 'snapshot_request'})
+
+        self.assertEqual(snapshots[-1]['seqs'], {publisher.source: 1})
+
+    def test_backend_is_selected_by_settings(self):
+        self.addCleanup(setattr, rpc_client, '_client', rpc_client._client)
+        self.addCleanup(setattr, employee_replica, 'request_snapshot', employee_replica.request_snapshot)
+        self.addCleanup(setattr, transport, '_broker', transport._broker)
+        self.addCleanup(employee_cache.clear)
+
+        with self.settings(VALIDATION_TRANSPORT=dict(settings.VALIDATION_TRANSPORT, BACKEND='inprocess')):
+            client = rpc_client.get_validation_client()
+            self.assertIsInstance(client, InProcessValidationClient)
+            self.assertTrue(client.validate(self.employees[0].id))
+        with self.settings(VALIDATION_TRANSPORT=dict(settings.VALIDATION_TRANSPORT, BACKEND='amqp')):
+            self.assertIsInstance(rpc_client.get_validation_client(), EmployeeValidationClient)
+
+
+class EmployeeIdCacheTests(SimpleTestCase):
+
+    def test_hit_and_miss_counters(self):
+        cache = EmployeeIdCache()
+        self.assertIsNone(cache.get(1))
+        cache.set(1, True)
+        self.assertTrue(cache.get(1))
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_entries_expire_with_their_ttl(self):
+        cache = EmployeeIdCache(ttl=60, negative_ttl=5)
+        with mock.patch('microservicioB.employee_cache.time.monotonic', return_value=100):
+            cache.set(1, True)
+            cache.set(2, False)
+        with mock.patch('microservicioB.employee_cache.time.monotonic', return_value=110):
+            self.assertTrue(cache.get(1))
+            self.assertIsNone(cache.get(2))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = EmployeeIdCache(max_size=2)
+        cache.set(1, True)
+        cache.set(2, True)
+        cache.get(1)
+        cache.set(3, True)
+
+        self.assertIsNone(cache.get(2))
+        self.assertTrue(cache.get(1))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_employee_events_invalidate_entries(self):
+        cache = EmployeeIdCache()
+        cache.set(7, False)
+        cache.handle_event({'event': 'created', 'employee_id': 7})
+        self.assertIsNone(cache.get(7))
+
+    def test_result_fetched_before_invalidation_is_discarded(self):
+        cache = EmployeeIdCache()
+        epoch = cache.epoch
+        cache.handle_event({'event': 'deleted', 'employee_id': 7})
+        cache.set(7, True, epoch=epoch)
+        self.assertIsNone(cache.get(7))
+
+
+class EmployeeIdReplicaTests(APITestCase):
+
+    def setUp(self):
+        self.employees = [Employee.objects.create(email=f'e{i}@example.com') for i in range(3)]
+        self.replica = EmployeeIdReplica()
+        self.replica.request_snapshot = mock.Mock()
+
+    def _delta(self, event, employee_id, seq, source='web-1'):
+        return {'event': event, 'employee_id': employee_id, 'source': source, 'seq': seq}
+
+    def test_snapshot_answers_membership(self):
+        self.assertIsNone(self.replica.contains(self.employees[0].id))
+
+        self.replica.apply_snapshot(build_snapshot())
+
+        self.assertTrue(all(self.replica.contains(e.id) for e in self.employees))
+        self.assertFalse(self.replica.contains(self.employees[-1].id + 1000))
+        self.assertEqual(self.replica.stats()['count'], 3)
+
+    def test_deltas_update_the_bitmap(self):
+        self.replica.apply_snapshot(build_snapshot())
+        self.replica.apply_delta(self._delta('deleted', self.employees[0].id, 1))
+        self.replica.apply_delta(self._delta('created', 5000, 2))
+
+        self.assertFalse(self.replica.contains(self.employees[0].id))
+        self.assertTrue(self.replica.contains(5000))
+
+    def test_sequence_gap_requests_resync(self):
+        self.replica.apply_snapshot(build_snapshot())
+        self.replica.apply_delta(self._delta('created', 5000, 1))
+        self.replica.apply_delta(self._delta('created', 5001, 3))
+
+        self.assertFalse(self.replica.ready)
+        self.replica.request_snapshot.assert_called_once()
+
+    def test_recent_deltas_are_replayed_over_an_older_snapshot(self):
+        snapshot = build_snapshot()
+        self.replica.apply_delta(self._delta('deleted', self.employees[0].id, 1))
+        self.replica.apply_snapshot(snapshot)
+
+        self.assertFalse(self.replica.contains(self.employees[0].id))
+
+    def test_deltas_covered_by_the_snapshot_are_not_replayed(self):
+        positions = EventPositions()
+        created = self._delta('created', 5000, 1)
+        self.replica.apply_delta(created)
+        positions.observe(created)
+        # El alta se deshizo antes de generar el snapshot, que ya no la incluye
+        snapshot = build_snapshot(positions)
+        self.replica.apply_snapshot(snapshot)
+
+        self.assertEqual(snapshot['seqs'], {'web-1': 1})
+        self.assertFalse(self.replica.contains(5000))
+
+
+class AttendanceViewTests(APITestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def setUp(self):
+        employee_cache.clear()
+        employee_replica.reset()
+        self.data = {'employee_id': 1, 'type': 'entry', 'date': '2024-01-15', 'time': '08:00:00'}
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    def test_create_attendance_for_valid_employee(self, get_client):
+        get_client.return_value.validate.return_value = True
+
+        response = self.client.post(reverse('attendance-create'), self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(AttendanceRecord.objects.count(), 1)
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    def test_broker_unavailable_rejects_attendance(self, get_client):
+        get_client.return_value.validate.side_effect = ConnectionError('RabbitMQ no disponible')
+
+        response = self.client.post(reverse('attendance-create'), self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(AttendanceRecord.objects.count(), 0)
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    def test_repeated_punches_skip_the_broker(self, get_client):
+        get_client.return_value.validate.return_value = True
+
+        self.client.post(reverse('attendance-create'), self.data, format='json')
+        self.client.post(reverse('attendance-create'), dict(self.data, type='exit'), format='json')
+
+        self.assertEqual(get_client.return_value.validate.call_count, 1)
+        self.assertEqual(AttendanceRecord.objects.count(), 2)
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    def test_broker_failures_are_not_cached(self, get_client):
+        get_client.return_value.validate.side_effect = TimeoutError()
+        self.client.post(reverse('attendance-create'), self.data, format='json')
+
+        self.assertIsNone(employee_cache.get(1))
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    def test_synced_replica_answers_without_rpc(self, get_client):
+        employee = Employee.objects.create(email='ana@example.com')
+        employee_replica.apply_snapshot(build_snapshot())
+        self.addCleanup(employee_replica.reset)
+
+        response = self.client.post(reverse('attendance-create'),
+                                    dict(self.data, employee_id=employee.id), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        get_client.return_value.validate.assert_not_called()
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    def test_id_missing_from_the_replica_is_confirmed_by_rpc(self, get_client):
+        get_client.return_value.validate.return_value = True
+        employee_replica.apply_snapshot(build_snapshot())
+        self.addCleanup(employee_replica.reset)
+
+        response = self.client.post(reverse('attendance-create'),
+                                    dict(self.data, employee_id=5000), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        get_client.return_value.validate.assert_called_once_with(5000)
+
+
+class AsyncAttendanceViewTests(TestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def setUp(self):
+        employee_cache.clear()
+        employee_replica.reset()
+        self.data = {'employee_id': 1, 'type': 'entry', 'date': '2024-01-15', 'time': '08:00:00'}
+
+    def _async_client(self, get_client, valid=True):
+        async def avalidate(employee_id):
+            if isinstance(valid, Exception):
+                raise valid
+            return valid
+        get_client.return_value.avalidate.side_effect = avalidate
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    async def test_create_attendance_for_valid_employee(self, get_client):
+        self._async_client(get_client)
+
+        response = await self.async_client.post(reverse('attendance-async-create'), self.data,
+                                                content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['employee_id'], 1)
+        self.assertEqual(await AttendanceRecord.objects.acount(), 1)
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    async def test_broker_unavailable_rejects_attendance(self, get_client):
+        self._async_client(get_client, valid=ConnectionError('RabbitMQ no disponible'))
+
+        response = await self.async_client.post(reverse('attendance-async-create'), self.data,
+                                                content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(await AttendanceRecord.objects.acount(), 0)
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    async def test_invalid_payload_is_rejected(self, get_client):
+        self._async_client(get_client)
+
+        response = await self.async_client.post(reverse('attendance-async-create'),
+                                                dict(self.data, type='lunch'),
+                                                content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('type', response.json())
+
+    async def test_list_pages_match_the_sync_view(self):
+        for day in range(1, 4):
+            await AttendanceRecord.objects.acreate(employee_id=1, type='entry',
+                                                   date=f'2024-01-0{day}', time='08:00:00')
+
+        pages, next_url = [], reverse('attendance-async-list') + '?page_size=2'
+        while next_url:
+            body = (await self.async_client.get(next_url)).json()
+            pages.append([record['id'] for record in body['results']])
+            next_url = body['next']
+
+        ordered_ids = [pk async for pk in AttendanceRecord.objects.values_list('id', flat=True)]
+        self.assertEqual([len(page) for page in pages], [2, 1])
+        self.assertEqual(sum(pages, []), ordered_ids)
+
+    async def test_invalid_cursor_returns_404(self):
+        response = await self.async_client.get(reverse('attendance-async-list') + '?cursor=xyz')
+        self.assertEqual(response.status_code, 404)
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def setUp(self):
+        employee_cache.clear()
+        employee_replica.reset()
+        self.data = {'employee_id': 1, 'type': 'entry', 'date': '2024-01-15', 'time': '08:00:00'}
+
+    def _server_timing(self, response):
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    def test_attendance_reports_db_and_rabbitmq_time(self, get_client):
+        get_client.return_value.validate.side_effect = lambda employee_id: threading.Event().wait(0.02) or True
+
+        response = self.client.post(reverse('attendance-create'), self.data, content_type='application/json')
+
+        timing = self._server_timing(response)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('db-microservicioB_db', timing)
+        self.assertNotIn('db-default', timing)
+        self.assertGreaterEqual(float(timing['rabbitmq']['dur']), 20)
+        self.assertGreaterEqual(float(timing['app']['dur']), float(timing['rabbitmq']['dur']))
+
+    def test_employee_list_reports_queries_on_the_default_alias(self):
+        response = self.client.get(reverse('employee-list'))
+
+        timing = self._server_timing(response)
+        # Versión de la tabla (validadores del ETag) + página del listado
+        self.assertEqual(timing['db-default']['desc'], '"2 queries"')
+        self.assertNotIn('rabbitmq', timing)
+
+    @mock.patch('microservicioB.validation.get_validation_client')
+    async def test_async_view_queries_are_attributed_to_the_request(self, get_client):
+        async def avalidate(employee_id):
+            return True
+        get_client.return_value.avalidate.side_effect = avalidate
+
+        response = await self.async_client.post(reverse('attendance-async-create'), self.data,
+                                                content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('db-microservicioB_db', self._server_timing(response))
+
+    def test_metrics_endpoint_exposes_per_route_histograms(self):
+        self.client.get(reverse('attendance-list'))
+
+        body = self.client.get(reverse('api-metrics')).content.decode()
+
+        self.assertIn('http_request_duration_seconds_count{route="attendance/list/",method="GET",status="200"}',
+                      body)
+        self.assertIn('http_db_queries_total{route="attendance/list/",alias="microservicioB_db"}', body)
+
+    def test_metrics_endpoint_is_limited_to_the_allowed_networks(self):
+        url = reverse('api-metrics')
+
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='203.0.113.7').status_code, status.HTTP_403_FORBIDDEN)
+        with self.settings(METRICS_ALLOWED_NETWORKS=['10.0.0.0/8']):
+            self.assertEqual(self.client.get(url, REMOTE_ADDR='10.1.2.3').status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AttendanceListViewTests(APITestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def test_cursor_pages_follow_date_time_id_order(self):
+        for day, hour in [(1, 8), (2, 8), (2, 8), (2, 17), (3, 9)]:
+            AttendanceRecord.objects.create(employee_id=1, type='entry',
+                                            date=f'2024-01-0{day}', time=f'{hour:02d}:00:00')
+        url = reverse('attendance-list')
+
+        pages, next_url = [], url + '?page_size=2'
+        while next_url:
+            response = self.client.get(next_url)
+            pages.append(response.data['results'])
+            next_url = response.data['next']
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        ids = [record['id'] for page in pages for record in page]
+        self.assertEqual(ids, list(AttendanceRecord.objects.values_list('id', flat=True)))
+
+
+    def test_revalidation_returns_304_until_a_new_record(self):
+        AttendanceRecord.objects.create(employee_id=1, type='entry', date='2024-01-01', time='08:00:00')
+        url = reverse('attendance-list')
+        first = self.client.get(url)
+        self.assertTrue(first['ETag'])
+
+        with self.assertNumQueries(1, using='microservicioB_db'):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'], data={'page_size': 1}).status_code,
+                         status.HTTP_200_OK)
+
+        serializer = AttendanceSerializer(data={'employee_id': 1, 'type': 'exit',
+                                                'date': '2024-01-01', 'time': '17:00:00'})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+    async def test_async_list_revalidation(self):
+        await AttendanceRecord.objects.acreate(employee_id=1, type='entry', date='2024-01-01', time='08:00:00')
+        url = reverse('attendance-async-list')
+        first = await self.async_client.get(url)
+
+        response = await self.async_client.get(url, headers={'If-None-Match': first['ETag']})
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class AttendanceChangesTests(APITestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def _sync(self, since=0):
+        response = self.client.get(reverse('attendance-changes'), {'since': since})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_created_and_deleted_records(self):
+        record = AttendanceRecord.objects.create(employee_id=1, type='entry', date='2024-01-01', time='08:00:00')
+        since = self._sync()['next_since']
+
+        with mock.patch('microservicioB.views.validate_employees', return_value={1}):
+            self.client.post(reverse('attendance-bulk'), [
+                {'employee_id': 1, 'type': 'exit', 'date': '2024-01-01', 'time': '17:00:00'},
+            ], format='json')
+        deleted_id = record.pk
+        record.delete()
+
+        results = self._sync(since)['results']
+        self.assertEqual([c['op'] for c in results], ['upsert', 'delete'])
+        self.assertEqual(results[0]['data']['type'], 'exit')
+        self.assertEqual(results[1]['id'], deleted_id)
+
+    def test_list_page_carries_the_token_to_sync_from(self):
+        AttendanceRecord.objects.create(employee_id=1, type='entry', date='2024-01-01', time='08:00:00')
+        page = self.client.get(reverse('attendance-list')).data
+
+        record = AttendanceRecord.objects.create(employee_id=1, type='exit', date='2024-01-01', time='17:00:00')
+
+        results = self._sync(page['changes_since'])['results']
+        self.assertEqual([(c['op'], c['id']) for c in results], [('upsert', record.pk)])
+
+class AttendanceExportViewTests(APITestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def setUp(self):
+        AttendanceRecord.objects.create(employee_id=1, type='entry', date='2024-01-01', time='08:00:00')
+        AttendanceRecord.objects.create(employee_id=1, type='exit', date='2024-01-02', time='17:00:00')
+        AttendanceRecord.objects.create(employee_id=2, type='entry', date='2024-01-02', time='09:00:00')
+
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export_streams_filtered_rows(self):
+        response = self.client.get(reverse('attendance-export-ndjson'),
+                                   {'employee_id': 1, 'start_date': '2024-01-02'})
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['type'], 'exit')
+        self.assertEqual(rows[0]['date'], '2024-01-02')
+
+    def test_csv_export_has_header_and_all_rows(self):
+        response = self.client.get(reverse('attendance-export-csv'))
+
+        lines = self._content(response).splitlines()
+        self.assertEqual(lines[0], 'id,employee_id,date,time,type,created_at')
+        self.assertEqual(len(lines), 4)
+
+    def test_invalid_date_range_is_rejected(self):
+        response = self.client.get(reverse('attendance-export-csv'),
+                                   {'start_date': '2024-02-01', 'end_date': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AttendanceQueryPlanTests(TestCase):
+    """Los listados, consultas por empleado y por rango usan los índices compuestos."""
+    databases = {'default', 'microservicioB_db'}
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertNotIn('SCAN microservicioB_attendancerecord\n', plan + '\n')
+
+    def test_list_is_read_in_index_order(self):
+        self.assertUsesIndex(AttendanceRecord.objects.all()[:100], 'attendance_date_time_idx')
+
+    def test_keyset_page_uses_index(self):
+        paginator = AttendancePagination()
+        position = [date(2024, 1, 15), time(8, 0), 10]
+        queryset = AttendanceRecord.objects.filter(paginator.position_filter(position))[:100]
+        self.assertUsesIndex(queryset, 'attendance_date_time_idx')
+
+    def test_date_range_uses_index(self):
+        queryset = AttendanceRecord.objects.filter(date__range=('2024-01-01', '2024-01-31'))
+        self.assertUsesIndex(queryset, 'attendance_date_time_idx')
+
+    def test_employee_history_uses_index(self):
+        queryset = AttendanceRecord.objects.filter(employee_id=1)
+        self.assertUsesIndex(queryset, 'attendance_emp_date_time_idx')
+
+    def test_employee_date_range_uses_index(self):
+        queryset = AttendanceRecord.objects.filter(
+            employee_id=1, date__range=('2024-01-01', '2024-01-31')
+        )
+        self.assertUsesIndex(queryset, 'attendance_emp_date_time_idx')
+
+
+class AttendanceBulkViewTests(APITestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def setUp(self):
+        employee_cache.clear()
+        employee_replica.reset()
+        patcher = mock.patch('microservicioB.validation.get_validation_client')
+        self.rpc = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.rpc.validate_many.return_value = {1, 2}
+
+    def _punch(self, employee_id, kind='entry'):
+        return {'employee_id': employee_id, 'type': kind, 'date': '2024-01-15', 'time': '08:00:00'}
+
+    def test_all_employees_are_validated_in_one_round_trip(self):
+        items = [self._punch(1), self._punch(2), self._punch(1, 'exit'), self._punch(2, 'exit')]
+
+        response = self.client.post(reverse('attendance-bulk'), items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 4)
+        self.assertEqual(AttendanceRecord.objects.count(), 4)
+        self.rpc.validate_many.assert_called_once()
+        self.assertEqual(sorted(self.rpc.validate_many.call_args[0][0]), [1, 2])
+
+    def test_per_item_results_report_rejections(self):
+        items = [self._punch(1), self._punch(99), {'employee_id': 1, 'type': 'lunch'}]
+
+        response = self.client.post(reverse('attendance-bulk'), items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in response.data['results']], ['created', 'error', 'error'])
+        self.assertIn('employee_id', response.data['results'][1]['errors'])
+        self.assertIn('type', response.data['results'][2]['errors'])
+        self.assertEqual(AttendanceRecord.objects.count(), 1)
+
+    def test_ndjson_body_is_accepted(self):
+        body = '\n'.join(json.dumps(self._punch(employee_id)) for employee_id in (1, 2)) + '\n'
+
+        response = self.client.post(reverse('attendance-bulk'), body,
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(AttendanceRecord.objects.count(), 2)
+
+    def test_validation_outage_writes_nothing(self):
+        self.rpc.validate_many.side_effect = TimeoutError()
+
+        response = self.client.post(reverse('attendance-bulk'), [self._punch(1)], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(AttendanceRecord.objects.count(), 0)
+
+
+class DailyAttendanceSummaryTests(APITestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def setUp(self):
+        employee_cache.clear()
+        employee_replica.reset()
+        patcher = mock.patch('microservicioB.validation.get_validation_client')
+        self.rpc = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.rpc.validate.return_value = True
+        self.rpc.validate_many.return_value = {1, 2}
+
+    def _punch(self, employee_id, kind, punch_time, day='2024-01-15'):
+        return {'employee_id': employee_id, 'type': kind, 'date': day, 'time': punch_time}
+
+    def test_pairs_entries_with_the_next_exit(self):
+        punches = [(time(8), 'entry'), (time(8, 5), 'entry'), (time(12), 'exit'),
+                   (time(12, 10), 'exit'), (time(13), 'entry'), (time(17, 30, 59), 'exit')]
+
+        self.assertEqual(summarize_day(punches), {
+            'first_entry': time(8), 'last_exit': time(17, 30, 59),
+            'punch_count': 6, 'worked_minutes': 8 * 60 + 30, 'missing_exit': False,
+        })
+
+    def test_refresh_reads_only_the_changed_employee_days(self):
+        # bulk_create no emite señales: ningún resumen existe antes del refresco
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(employee_id=employee_id, type='entry', date=day, time=time(8))
+            for employee_id, day in ((1, date(2024, 1, 15)), (2, date(2024, 1, 16)),
+                                     (1, date(2024, 1, 16)), (2, date(2024, 1, 15)))
+        ])
+        keys = [(1, date(2024, 1, 15)), (2, date(2024, 1, 16))]
+
+        read = _punches_for(keys, 'microservicioB_db').values_list('employee_id', 'date')
+        self.assertCountEqual(read, keys)
+
+        refresh_daily_summaries(keys)
+        self.assertCountEqual(DailyAttendanceSummary.objects.values_list('employee_id', 'date'), keys)
+
+    def test_single_writes_update_the_summary(self):
+        for kind, punch_time in (('exit', '17:00:00'), ('entry', '09:00:00')):
+            response = self.client.post(reverse('attendance-create'), self._punch(1, kind, punch_time),
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        summary = DailyAttendanceSummary.objects.get(employee_id=1, date=date(2024, 1, 15))
+        self.assertEqual((summary.first_entry, summary.last_exit), (time(9), time(17)))
+        self.assertEqual((summary.punch_count, summary.worked_minutes), (2, 480))
+
+    def test_saves_and_deletes_outside_the_api_update_the_summary(self):
+        record = AttendanceRecord.objects.create(employee_id=1, type='entry', date=date(2024, 1, 15), time=time(8))
+        self.assertEqual(DailyAttendanceSummary.objects.get(employee_id=1).first_entry, time(8))
+
+        record.date = date(2024, 1, 16)
+        record.save()
+        self.assertEqual(list(DailyAttendanceSummary.objects.values_list('date', flat=True)), [date(2024, 1, 16)])
+
+        record.delete()
+        self.assertFalse(DailyAttendanceSummary.objects.exists())
+
+    async def test_async_writes_update_the_summary(self):
+        self.rpc.avalidate = mock.AsyncMock(return_value=True)
+
+        response = await self.async_client.post(reverse('attendance-async-create'),
+                                                self._punch(1, 'entry', '08:00:00'),
+                                                content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        summary = await DailyAttendanceSummary.objects.aget(employee_id=1)
+        self.assertEqual(summary.punch_count, 1)
+
+    def test_bulk_writes_update_one_summary_per_employee_and_day(self):
+        items = [self._punch(1, 'entry', '08:00:00'), self._punch(2, 'entry', '09:00:00'),
+                 self._punch(1, 'exit', '12:00:00'), self._punch(1, 'entry', '08:00:00', '2024-01-16'),
+                 self._punch(99, 'entry', '08:00:00')]
+
+        self.client.post(reverse('attendance-bulk'), items, format='json')
+
+        summaries = {(s.employee_id, str(s.date)): s for s in DailyAttendanceSummary.objects.all()}
+        self.assertEqual(set(summaries), {(1, '2024-01-15'), (2, '2024-01-15'), (1, '2024-01-16')})
+        self.assertEqual(summaries[(1, '2024-01-15')].worked_minutes, 240)
+        self.assertEqual(summaries[(2, '2024-01-15')].last_exit, None)
+
+    def test_rebuild_command_matches_incremental_summaries(self):
+        items = [self._punch(employee_id, kind, punch_time, f'2024-01-{day:02d}')
+                 for employee_id in (1, 2) for day in (1, 2, 3)
+                 for kind, punch_time in (('entry', '08:00:00'), ('exit', '16:45:00'))]
+        self.client.post(reverse('attendance-bulk'), items, format='json')
+        fields = ('employee_id', 'date', 'first_entry', 'last_exit', 'punch_count', 'worked_minutes')
+        incremental = list(DailyAttendanceSummary.objects.order_by('employee_id', 'date').values_list(*fields))
+        DailyAttendanceSummary.objects.all().delete()
+
+        call_command('rebuild_attendance_summary', batch_size=2, stdout=io.StringIO())
+
+        rebuilt = list(DailyAttendanceSummary.objects.order_by('employee_id', 'date').values_list(*fields))
+        self.assertEqual(rebuilt, incremental)
+        self.assertEqual(len(rebuilt), 6)
+
+    def test_rebuild_is_limited_to_the_requested_range(self):
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(employee_id=1, type='entry', date=date(2024, 1, day), time=time(8))
+            for day in (1, 2)
+        ])
+
+        written = rebuild_daily_summaries(start_date=date(2024, 1, 2))
+
+        self.assertEqual(written, 1)
+        self.assertEqual(list(DailyAttendanceSummary.objects.values_list('date', flat=True)), [date(2024, 1, 2)])
+
+    def test_daily_and_monthly_reports(self):
+        items = [self._punch(employee_id, kind, punch_time, day)
+                 for employee_id in (1, 2) for day in ('2024-01-30', '2024-01-31', '2024-02-01')
+                 for kind, punch_time in (('entry', '08:00:00'), ('exit', '10:00:00'))]
+        self.client.post(reverse('attendance-bulk'), items, format='json')
+
+        daily = self.client.get(reverse('attendance-summary-daily'),
+                                {'start_date': '2024-01-31', 'employee_id': 2}).data
+        self.assertEqual([(r['date'], r['worked_minutes']) for r in daily['results']],
+                         [('2024-02-01', 120), ('2024-01-31', 120)])
+
+        monthly = self.client.get(reverse('attendance-summary-monthly'), {'month': '2024-01'}).data
+        self.assertEqual([(r['employee_id'], r['days_worked'], r['worked_minutes'], r['punch_count'])
+                          for r in monthly['results']], [(1, 2, 240, 4), (2, 2, 240, 4)])
+
+    def test_invalid_month_is_rejected(self):
+        response = self.client.get(reverse('attendance-summary-monthly'), {'month': '2024-13'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class WorkedHoursTests(APITestCase):
+    databases = {'default', 'microservicioB_db'}
+
+    def _punches(self, employee_id, day, *punches):
+        return [AttendanceRecord(employee_id=employee_id, date=day, time=punch_time, type=kind)
+                for kind, punch_time in punches]
+
+    def test_same_second_punches_agree_with_the_daily_summary(self):
+        day = date(2024, 1, 15)
+        for kind, punch_time in (('exit', '08:00:00'), ('entry', '08:00:00'), ('exit', '12:00:00')):
+            AttendanceRecord.objects.create(employee_id=1, date=day, time=punch_time, type=kind)
+        refresh_daily_summaries([(1, day)])
+
+        days = compute_worked_hours(day, day)
+
+        summary = DailyAttendanceSummary.objects.get(employee_id=1, date=day)
+        self.assertEqual(summary.worked_minutes, 240)
+        self.assertEqual(days['worked_minutes'].tolist(), [summary.worked_minutes])
+
+    def test_pairing_matches_the_daily_summary_rule(self):
+        rng = np.random.default_rng(7)
+        count = 5000
+        employee_id = rng.integers(1, 20, count)
+        day = rng.integers(0, 5, count)
+        seconds = rng.permutation(86400)[:count]
+        is_entry = rng.random(count) < 0.5
+
+        days = pair_punches(employee_id, day, seconds, is_entry, daily_minutes=60)
+
+        expected = {}
+        for index in np.lexsort((seconds, day, employee_id)):
+            punch_time = time(seconds[index] // 3600, seconds[index] // 60 % 60, seconds[index] % 60)
+            expected.setdefault((employee_id[index], day[index]), []).append(
+                (punch_time, 'entry' if is_entry[index] else 'exit'))
+        self.assertEqual(len(days['employee_id']), len(expected))
+        for index, key in enumerate(zip(days['employee_id'], days['day'])):
+            punches = expected[key]
+            summary = summarize_day(punches)
+            self.assertEqual(days['worked_minutes'][index], summary['worked_minutes'])
+            self.assertEqual(days['overtime_minutes'][index], max(summary['worked_minutes'] - 60, 0))
+            self.assertEqual(days['punch_count'][index], len(punches))
+            self.assertEqual(days['missing_exit'][index], punches[-1][1] == 'entry')
+            self.assertEqual(days['missing_exit'][index], summary['missing_exit'])
+
+    def test_empty_range(self):
+        days = compute_worked_hours(date(2024, 1, 1), date(2024, 1, 31))
+        self.assertEqual(totals_by_employee(days), [])
+
+    def _create(self, records):
+        # Como la ingesta masiva: bulk_create y refresco de los resúmenes afectados
+        AttendanceRecord.objects.bulk_create(records)
+        refresh_daily_summaries((record.employee_id, record.date) for record in records)
+
+    def test_endpoint_reports_overtime_and_missing_exits(self):
+        self._create(
+            self._punches(1, date(2024, 1, 15), ('entry', time(8)), ('exit', time(17, 30)))
+            + self._punches(1, date(2024, 1, 16), ('entry', time(8)), ('exit', time(12)), ('entry', time(13)))
+            + self._punches(2, date(2024, 1, 15), ('exit', time(9)), ('entry', time(10)), ('exit', time(11)))
+            + self._punches(2, date(2024, 2, 1), ('entry', time(8)), ('exit', time(18)))
+        )
+
+        # Solo la agregación sobre los resúmenes diarios
+        with self.assertNumQueries(1, using='microservicioB_db'):
+            response = self.client.get(reverse('attendance-worked-hours'),
+                                       {'start_date': '2024-01-01', 'end_date': '2024-01-31'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'employee_id': 1, 'days_worked': 2, 'punch_count': 5, 'worked_minutes': 810,
+             'overtime_minutes': 90, 'missing_exit_days': 1},
+            {'employee_id': 2, 'days_worked': 1, 'punch_count': 3, 'worked_minutes': 60,
+             'overtime_minutes': 0, 'missing_exit_days': 0},
+        ])
+
+    def test_endpoint_totals_match_the_command_engine(self):
+        rng = np.random.default_rng(11)
+        records = [
+            AttendanceRecord(employee_id=int(employee_id), date=date(2024, 1, int(day)),
+                             time=time(int(second) // 3600, int(second) // 60 % 60, int(second) % 60),
+                             type='entry' if is_entry else 'exit')
+            for employee_id, day, second, is_entry in zip(
+                rng.integers(1, 6, 400), rng.integers(1, 8, 400), rng.permutation(86400)[:400], rng.random(400) < 0.5)
+        ]
+        self._create(records)
+
+        response = self.client.get(reverse('attendance-worked-hours'),
+                                   {'start_date': '2024-01-01', 'end_date': '2024-01-31'})
+
+        engine = totals_by_employee(compute_worked_hours(date(2024, 1, 1), date(2024, 1, 31)))
+        self.assertEqual(response.data['results'], engine)
+
+    def test_endpoint_requires_a_bounded_range(self):
+        url = reverse('attendance-worked-hours')
+
+        self.assertEqual(self.client.get(url, {'start_date': '2024-01-01'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        with self.settings(WORKED_HOURS={'MAX_RANGE_DAYS': 31}):
+            response = self.client.get(url, {'start_date': '2024-01-01', 'end_date': '2024-02-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command_writes_daily_rows(self):
+        AttendanceRecord.objects.bulk_create(
+            self._punches(3, date(2024, 3, 1), ('entry', time(9)), ('exit', time(18)))
+        )
+        output = io.StringIO()
+
+        call_command('worked_hours', start_date='2024-03-01', end_date='2024-03-31', by_day=True,
+                     daily_minutes=480, stdout=output, stderr=io.StringIO())
+
+        self.assertEqual(output.getvalue().splitlines(), [
+            'employee_id,date,punch_count,worked_minutes,overtime_minutes,missing_exit',
+            '3,2024-03-01,2,540,60,False',
+        ])
@@ -0,0 +1,79 @@
+from config.timing import track_validation
+from config.transport import as_employee_id
+from microservicioB.employee_cache import employee_cache
+from microservicioB.employee_replica import employee_replica
+from microservicioB.rpc_client import get_validation_client
+
+
+def _lookup(key):
+    """Respuesta local para `key` (réplica y caché) o None si hace falta el RPC."""
+    if key is None:
+        return None
+    # Solo un acierto de la réplica es definitivo: un ausente puede ser un
+    # alta cuyo delta aún no llegó, así que se confirma en la caché o por RPC
+    if employee_replica.contains(key):
+        return True
+    return employee_cache.get(key)
+
+
+def _store(key, valid, epoch):
+    if key is not None:
+        employee_cache.set(key, valid, epoch=epoch)
+
+
+def validate_employee(employee_id):
+    """
+    Comprueba que el empleado exista: primero en la réplica de IDs (solo si lo
+    contiene), luego en la caché local y, si ninguna responde, mediante RPC al
+    microservicio A. Propaga TimeoutError o ConnectionError si el broker no
+    responde; esos fallos no se cachean.
+    """
+    key = as_employee_id(employee_id)
+    epoch = employee_cache.epoch
+    answer = _lookup(key)
+    if answer is not None:
+        return answer
+
+    with track_validation():
+        valid = get_validation_client().validate(employee_id)
+    _store(key, valid, epoch)
+    return valid
+
+
+async def avalidate_employee(employee_id):
+    """Versión asyncio de `validate_employee` para las vistas ASGI."""
+    key = as_employee_id(employee_id)
+    epoch = employee_cache.epoch
+    answer = _lookup(key)
+    if answer is not None:
+        return answer
+
+    with track_validation():
+        valid = await get_validation_client().avalidate(employee_id)
+    _store(key, valid, epoch)
+    return valid
+
+
+def validate_employees(employee_ids):
+    """
+    Devuelve el conjunto de IDs válidos de la lista. Los que no están en la
+    réplica ni resuelve la caché se validan juntos en una sola petición RPC.
+    """
+    keys = {as_employee_id(employee_id) for employee_id in employee_ids} - {None}
+    epoch = employee_cache.epoch
+    valid, unknown = set(), []
+
+    for key in keys:
+        answer = _lookup(key)
+        if answer is None:
+            unknown.append(key)
+        elif answer:
+            valid.add(key)
+
+    if unknown:
+        with track_validation():
+            remote_valid = get_validation_client().validate_many(unknown)
+        for key in unknown:
+            _store(key, key in remote_valid, epoch)
+        valid |= remote_valid
+    return valid
@@ -1,13 +1,40 @@
-import json
-import uuid
-import pika
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.http import StreamingHttpResponse
+from rest_framework.parsers import JSONParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 from drf_spectacular.openapi import OpenApiTypes
-from .models import AttendanceRecord
-from microservicioB.serializer import AttendanceSerializer
+from config.changefeed import (
+    CHANGE_FEED_PARAMETERS,
+    ChangeFeedFilterSerializer,
+    change_feed_response,
+    current_seq,
+    read_changes,
+    record_changes,
+)
+from config.pagination import KEYSET_PAGINATION_PARAMETERS, KeysetPagination, paginated_response
+from config.versioning import bump_version, get_version, list_etag, not_modified, set_validators
+from .models import AttendanceRecord, ChangeLogEntry, DailyAttendanceSummary, TableVersion
+from microservicioB.serializer import (
+    AttendanceSerializer,
+    AttendanceExportFilterSerializer,
+    DailyAttendanceSummarySerializer,
+    MonthlyAttendanceSummarySerializer,
+    MonthlySummaryFilterSerializer,
+    WorkedHoursFilterSerializer,
+    WorkedHoursSerializer,
+)
+from microservicioB.export import EXPORT_FORMATS
+from microservicioB.employee_cache import employee_cache
+from microservicioB.employee_replica import employee_replica
+from microservicioB.parsers import NDJSONParser
+from microservicioB.summary import refresh_daily_summaries
+from microservicioB.worked_hours import summary_totals
+from microservicioB.validation import validate_employee, validate_employees
 
 class AttendanceView(APIView):
 
@@ -52,73 +79,337 @@ class AttendanceView(APIView):
     def validate_employee(self, employee_id):
 
         try:
-            connection = pika.BlockingConnection(
-                pika.ConnectionParameters('localhost')
-            )
-            channel = connection.channel()
+            # Caché local primero; si no hay entrada, RPC por la conexión persistente
+            return validate_employee(employee_id)
 
+        except TimeoutError:
+            print("⏰ Timeout en validación RabbitMQ")
+            return False
 
-            channel.queue_declare(queue='validate_employee_request', durable=True)
-            channel.queue_declare(queue='validate_employee_response', durable=True)
+        except Exception as e:
+            print(f"❌ Error en validación RabbitMQ: {e}")
+            return False
 
 
-            result = channel.queue_declare(queue='', exclusive=True)
-            callback_queue = result.method.queue
-            correlation_id = str(uuid.uuid4())
-            message = {'employee_id': employee_id}
+class AttendanceBulkView(APIView):
+    parser_classes = [JSONParser, NDJSONParser]
 
-            channel.basic_publish(
-                exchange='',
-                routing_key='validate_employee_request',
-                body=json.dumps(message),
-                properties=pika.BasicProperties(
-                    reply_to=callback_queue,
-                    correlation_id=correlation_id,
-                    delivery_mode=2,
-                )
+    @extend_schema(
+        summary="Registrar asistencias en lote",
+        description="Recibe una lista JSON (o un cuerpo NDJSON) de registros de asistencia. "
+                    "Valida todos los empleados distintos en un solo viaje al microservicio A y "
+                    "guarda los registros válidos en una sola transacción. Devuelve el resultado "
+                    "de cada elemento en el mismo orden en que se recibió.",
+        request=AttendanceSerializer(many=True),
+        responses={
+            201: OpenApiResponse(description="Todos los registros fueron creados"),
+            207: OpenApiResponse(description="Algunos registros fueron rechazados"),
+            400: OpenApiResponse(description="Ningún registro fue válido o el cuerpo no es una lista"),
+            503: OpenApiResponse(description="No se pudo validar a los empleados"),
+        },
+        tags=['Asistencias']
+    )
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"error": "Se esperaba una lista de registros de asistencia"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            response = None
-
-            def on_response(ch, method, props, body):
-                nonlocal response
-                if props.correlation_id == correlation_id:
-                    response = json.loads(body)
-                    connection.close()
-
-            channel.basic_consume(
-                queue=callback_queue,
-                on_message_callback=on_response,
-                auto_ack=True
+        max_items = settings.BULK_ATTENDANCE_MAX_ITEMS
+        if len(items) > max_items:
+            return Response(
+                {"error": f"Máximo {max_items} registros por petición"},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-            # Esperar con timeout
-            connection.process_data_events(time_limit=5)  # 5 segundos timeout
-
-            if response:
-                return response.get('valid', False)
+        results = [None] * len(items)
+        candidates = []
+        for index, item in enumerate(items):
+            serializer = AttendanceSerializer(data=item)
+            if serializer.is_valid():
+                candidates.append((index, serializer.validated_data))
             else:
-                print("⏰ Timeout en validación RabbitMQ")
-                return False
+                results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
 
+        try:
+            valid_ids = validate_employees({data['employee_id'] for _, data in candidates})
         except Exception as e:
             print(f"❌ Error en validación RabbitMQ: {e}")
-            return False
+            return Response(
+                {"error": "No se pudo validar a los empleados, intente nuevamente"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        pending = []
+        for index, data in candidates:
+            if data['employee_id'] in valid_ids:
+                pending.append((index, AttendanceRecord(**data)))
+            else:
+                results[index] = {
+                    'index': index,
+                    'status': 'error',
+                    'errors': {'employee_id': ['Empleado no válido o no existe']}
+                }
+
+        with transaction.atomic(using=router.db_for_write(AttendanceRecord)):
+            created = AttendanceRecord.objects.bulk_create([record for _, record in pending], batch_size=500)
+            refresh_daily_summaries((record.employee_id, record.date) for record in created)
+            if created:
+                # bulk_create no emite post_save
+                record_changes(ChangeLogEntry, AttendanceRecord._meta.db_table, [record.pk for record in created])
+                bump_version(TableVersion, AttendanceRecord._meta.db_table)
+
+        for (index, _), record in zip(pending, created):
+            results[index] = {'index': index, 'status': 'created', 'id': record.pk}
+
+        failed = len(items) - len(created)
+        if not failed:
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(
+            {'created': len(created), 'failed': failed, 'results': results},
+            status=response_status
+        )
+
+
+class AttendancePagination(KeysetPagination):
+    ordering = tuple(AttendanceRecord._meta.ordering)
 
 
 class AttendanceListView(APIView):
 
     @extend_schema(
         summary="Listar registros de asistencia",
-        description="Obtiene una lista de todos los registros de asistencia en el sistema.",
+        description="Obtiene los registros de asistencia del más reciente al más antiguo, "
+                    "paginados por cursor. El campo \"next\" contiene la URL de la página siguiente "
+                    "y \"changes_since\" el token de attendance/changes/ desde el que mantener al día "
+                    "la página sin volver a pedirla.",
+        parameters=KEYSET_PAGINATION_PARAMETERS,
         responses={
             200: OpenApiResponse(
-                response=AttendanceSerializer(many=True),
-                description="Lista de registros de asistencia"
+                response=paginated_response(AttendanceSerializer, 'PaginatedAttendanceList',
+                                            {'changes_since': serializers.IntegerField()}),
+                description="Página de registros de asistencia"
             ),
         },
         tags=['Asistencias']
     )
     def get(self, request):
-        records = AttendanceRecord.objects.all()
+        # Validadores a partir de la versión de la tabla, leída antes que la página
+        version, last_modified = get_version(TableVersion, AttendanceRecord._meta.db_table)
+        etag = list_etag(AttendanceRecord._meta.db_table, version, request)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        # Token del log leído antes que la página: los cambios posteriores se reaplican, no se pierden
+        changes_since = current_seq(ChangeLogEntry, AttendanceRecord._meta.db_table)
+        paginator = AttendancePagination()
+        records = paginator.paginate_queryset(AttendanceRecord.objects.all(), request, view=self)
         serializer = AttendanceSerializer(records, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        response = paginator.get_paginated_response(serializer.data)
+        response.data['changes_since'] = changes_since
+        return set_validators(response, etag, last_modified)
+
+
+class AttendanceChangesView(APIView):
+
+    @extend_schema(
+        summary="Cambios de asistencias desde un token",
+        description="Registros creados, modificados y eliminados (tombstones) posteriores al token `since`, "
+                    "en orden. El cliente guarda `next_since` y repite la llamada mientras `has_more` sea "
+                    "true; con since=0 recibe todos los registros.",
+        parameters=CHANGE_FEED_PARAMETERS,
+        responses={
+            200: change_feed_response(AttendanceSerializer, 'AttendanceChanges'),
+            400: OpenApiResponse(description="Token inválido"),
+        },
+        tags=['Asistencias']
+    )
+    def get(self, request):
+        filters = ChangeFeedFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = read_changes(ChangeLogEntry, AttendanceRecord.objects.all(), AttendanceSerializer,
+                               **filters.validated_data)
+        return Response(changes, status=status.HTTP_200_OK)
+
+
+class AttendanceExportView(APIView):
+
+    @extend_schema(
+        summary="Exportar registros de asistencia",
+        description="Descarga en streaming (NDJSON o CSV) los registros de asistencia, opcionalmente "
+                    "filtrados por rango de fechas y empleado. La memoria usada no depende del número de filas.",
+        parameters=[
+            OpenApiParameter(name='start_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY,
+                             description='Fecha inicial (inclusive)'),
+            OpenApiParameter(name='end_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY,
+                             description='Fecha final (inclusive)'),
+            OpenApiParameter(name='employee_id', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                             description='ID del empleado'),
+        ],
+        responses={
+            200: OpenApiResponse(response=OpenApiTypes.BINARY, description="Archivo NDJSON o CSV"),
+            400: OpenApiResponse(description="Filtros inválidos"),
+        },
+        tags=['Asistencias']
+    )
+    def get(self, request, export_format):
+        filters = AttendanceExportFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        records = filters.filter_queryset(AttendanceRecord.objects.all())
+        generate, content_type = EXPORT_FORMATS[export_format]
+
+        response = StreamingHttpResponse(generate(records), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="attendance_export.{export_format}"'
+        return response
+
+
+class DailySummaryPagination(KeysetPagination):
+    ordering = tuple(DailyAttendanceSummary._meta.ordering)
+
+
+class DailyAttendanceSummaryView(APIView):
+
+    @extend_schema(
+        summary="Resumen diario de asistencia",
+        description="Primera entrada, última salida, número de marcaciones y minutos trabajados por "
+                    "empleado y día, del día más reciente al más antiguo y paginados por cursor. "
+                    "Se lee de la tabla de resúmenes, sin recorrer las marcaciones.",
+        parameters=[
+            OpenApiParameter(name='start_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY,
+                             description='Fecha inicial (inclusive)'),
+            OpenApiParameter(name='end_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY,
+                             description='Fecha final (inclusive)'),
+            OpenApiParameter(name='employee_id', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                             description='ID del empleado'),
+            *KEYSET_PAGINATION_PARAMETERS,
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=paginated_response(DailyAttendanceSummarySerializer, 'PaginatedDailyAttendanceSummaryList'),
+                description="Página de resúmenes diarios"
+            ),
+            400: OpenApiResponse(description="Filtros inválidos"),
+        },
+        tags=['Asistencias']
+    )
+    def get(self, request):
+        filters = AttendanceExportFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = DailySummaryPagination()
+        summaries = paginator.paginate_queryset(
+            filters.filter_queryset(DailyAttendanceSummary.objects.all()), request, view=self
+        )
+        serializer = DailyAttendanceSummarySerializer(summaries, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class MonthlyAttendanceSummaryView(APIView):
+
+    @extend_schema(
+        summary="Resumen mensual de asistencia",
+        description="Días con marcaciones, marcaciones y minutos trabajados por empleado en un mes, "
+                    "agregados sobre los resúmenes diarios.",
+        parameters=[
+            OpenApiParameter(name='month', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+                             required=True, description='Mes en formato YYYY-MM'),
+            OpenApiParameter(name='employee_id', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                             description='ID del empleado'),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=MonthlyAttendanceSummarySerializer(many=True),
+                description="Resumen del mes por empleado"
+            ),
+            400: OpenApiResponse(description="Mes o filtros inválidos"),
+        },
+        tags=['Asistencias']
+    )
+    def get(self, request):
+        filters = MonthlySummaryFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = (
+            filters.filter_queryset(DailyAttendanceSummary.objects.all())
+            .values('employee_id')
+            .annotate(
+                days_worked=Count('id'),
+                punch_count=Sum('punch_count'),
+                worked_minutes=Sum('worked_minutes'),
+                first_day=Min('date'),
+                last_day=Max('date'),
+            )
+            .order_by('employee_id')
+        )
+        return Response({
+            'month': request.query_params['month'],
+            'results': MonthlyAttendanceSummarySerializer(rows, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class WorkedHoursView(APIView):
+
+    @extend_schema(
+        summary="Horas trabajadas por empleado",
+        description="Devuelve por empleado, a partir del resumen diario de asistencia, los días con "
+                    "marcaciones, minutos trabajados, horas extra sobre la jornada configurada y días "
+                    "que terminaron sin salida. El comando worked_hours calcula lo mismo desde las "
+                    "marcaciones, sin límite de rango.",
+        parameters=[
+            OpenApiParameter(name='start_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY,
+                             required=True, description='Fecha inicial (inclusive)'),
+            OpenApiParameter(name='end_date', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY,
+                             required=True, description='Fecha final (inclusive)'),
+            OpenApiParameter(name='employee_id', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                             description='ID del empleado'),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=WorkedHoursSerializer(many=True),
+                description="Horas trabajadas por empleado"
+            ),
+            400: OpenApiResponse(description="Rango o filtros inválidos"),
+        },
+        tags=['Asistencias']
+    )
+    def get(self, request):
+        filters = WorkedHoursFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = filters.validated_data
+        totals = summary_totals(data['start_date'], data['end_date'], data.get('employee_id'))
+        return Response({
+            'start_date': data['start_date'],
+            'end_date': data['end_date'],
+            'results': WorkedHoursSerializer(totals, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class EmployeeCacheStatsView(APIView):
+
+    @extend_schema(
+        summary="Estadísticas de la caché de empleados",
+        description="Aciertos, fallos y tamaño de la caché local de validación de empleados, "
+                    "y estado de la réplica de IDs del microservicio A.",
+        responses={200: OpenApiTypes.OBJECT},
+        tags=['Asistencias']
+    )
+    def get(self, request):
+        return Response({
+            'cache': employee_cache.stats(),
+            'replica': employee_replica.stats(),
+        }, status=status.HTTP_200_OK)
@@ -1,6 +1,35 @@
 
 const API_EMPLOYEES = 'http://localhost:8000/api/employees/';
 const API_ATTENDANCE = 'http://localhost:8000/';
+
+// Copias locales que se mantienen al día con los endpoints de cambios (?since=):
+// tras la primera carga solo viajan las filas creadas, modificadas o eliminadas
+const employeesStore = { since: 0, rows: new Map() };
+// Asistencias: solo los registros más recientes; la copia parte de la primera
+// página de attendance/list/ y del token que la acompaña, no de toda la tabla
+const ATTENDANCE_VIEW_SIZE = 100;
+const attendanceStore = { since: null, rows: new Map() };
+
+async function syncChanges(url, store) {
+    let hasMore = true;
+    while (hasMore) {
+        const response = await fetch(`${url}?since=${store.since}`);
+        if (!response.ok) {
+            throw new Error(`Error ${response.status}`);
+        }
+        const changes = await response.json();
+        changes.results.forEach(change => {
+            if (change.op === 'delete') {
+                store.deleted = store.rows.delete(change.id) || store.deleted;
+            } else {
+                store.rows.set(change.id, change.data);
+            }
+        });
+        store.since = changes.next_since;
+        hasMore = changes.has_more;
+    }
+    return Array.from(store.rows.values());
+}
 // Mostrar mnesjaes de error
 function showMessage(message, type = 'success', elementId = 'message') {
     const messageDiv = document.getElementById(elementId);
@@ -356,14 +385,45 @@ async function registerAttendance(type) {
     }
 }
 
+async function loadAttendancePage() {
+    const response = await fetch(`${API_ATTENDANCE}attendance/list/?page_size=${ATTENDANCE_VIEW_SIZE}`);
+    if (!response.ok) {
+        throw new Error(`Error ${response.status}`);
+    }
+    const page = await response.json();
+    attendanceStore.rows = new Map(page.results.map(record => [record.id, record]));
+    attendanceStore.since = page.changes_since;
+    attendanceStore.deleted = false;
+}
+
+// Los registros más recientes, en el mismo orden que attendance/list/
+async function syncAttendance() {
+    if (attendanceStore.since === null) {
+        await loadAttendancePage();
+    } else {
+        await syncChanges(`${API_ATTENDANCE}attendance/changes/`, attendanceStore);
+        // Una baja dentro de la ventana deja hueco para registros que no están en la copia
+        if (attendanceStore.deleted && attendanceStore.rows.size < ATTENDANCE_VIEW_SIZE) {
+            await loadAttendancePage();
+        }
+    }
+    const records = Array.from(attendanceStore.rows.values())
+        .sort((a, b) => b.date.localeCompare(a.date) || b.time.localeCompare(a.time) || a.id - b.id)
+        .slice(0, ATTENDANCE_VIEW_SIZE);
+    // Lo que queda fuera de la ventana no se vuelve a mostrar: la copia no crece
+    attendanceStore.rows = new Map(records.map(record => [record.id, record]));
+    attendanceStore.deleted = false;
+    return records;
+}
+
 async function loadAttendanceRecords() {
     try {
-        const response = await fetch(`${API_ATTENDANCE}attendance/list/`);
-        if (!response.ok) {
-            throw new Error(`Error ${response.status}: No se pudieron cargar las asistencias`);
+        let records;
+        try {
+            records = await syncAttendance();
+        } catch (error) {
+            throw new Error(`${error.message}: No se pudieron cargar las asistencias`);
         }
-
-        const records = await response.json();
         const tbody = document.getElementById('attendanceBody');
 
         tbody.innerHTML = '';
@@ -394,12 +454,13 @@ async function loadAttendanceRecords() {
 // ========== MICROSERVICIO A - EMPLEADOS ==========
 async function loadEmployees() {
     try {
-        const response = await fetch(API_EMPLOYEES);
-        if (!response.ok) {
-            throw new Error(`Error ${response.status}: No se pudieron cargar los empleados`);
+        let employees;
+        try {
+            employees = (await syncChanges(`${API_EMPLOYEES}changes/`, employeesStore))
+                .sort((a, b) => a.id - b.id);
+        } catch (error) {
+            throw new Error(`${error.message}: No se pudieron cargar los empleados`);
         }
-
-        const employees = await response.json();
         const tbody = document.getElementById('employeesBody');
 
         tbody.innerHTML = '';